@@ -0,0 +1,4 @@
+"""Benchmarks for `fungebra` operators, combinators and pipelines.
+
+Run with `python -m benchmarks`, see `python -m benchmarks --help`.
+"""
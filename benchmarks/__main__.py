@@ -0,0 +1,137 @@
+"""Run the benchmark suite, writing machine-readable results as JSON.
+
+For example:
+```
+python -m benchmarks --output results.json
+python -m benchmarks --compare results.json --threshold 1.2
+```
+"""
+import argparse
+from datetime import datetime, timezone
+import json
+import platform
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+import fungebra
+from fungebra import Function
+
+from benchmarks.cases import CASES, Case
+
+
+NODES_PER_SAMPLE = 1000
+
+
+def time_call(func: Callable, args: tuple, repeat: int) -> float:
+    """Return the best time per call of `func(*args)`, in nanoseconds."""
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number * 1e9
+
+
+def allocated_bytes(build: Callable) -> float:
+    """Return the memory retained by one result of `build`, in bytes."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        results = [build() for _ in range(NODES_PER_SAMPLE)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del results
+    return (after - before) / NODES_PER_SAMPLE
+
+
+def run_case(case: Case, repeat: int) -> Dict[str, Any]:
+    func = case.build()
+    expected = case.baseline(*case.args)
+    if func(*case.args) != expected:
+        raise AssertionError(f"{case.name} does not match its baseline")
+    result = {
+        "group": case.group,
+        "name": case.name,
+        "call_ns": time_call(func, case.args, repeat),
+        "baseline_ns": time_call(case.baseline, case.args, repeat),
+        "construct_ns": time_call(case.build, (), repeat),
+        "node_bytes": allocated_bytes(case.build),
+        "compiled_ns": None,
+    }
+    result["overhead"] = result["call_ns"] / result["baseline_ns"]
+    if isinstance(func, Function):
+        compiled = func.compile()
+        if compiled(*case.args) == expected:
+            result["compiled_ns"] = time_call(compiled, case.args, repeat)
+    return result
+
+
+def compare(
+    results: List[Dict[str, Any]], previous: Dict[str, Any], threshold: float
+) -> List[str]:
+    """Return descriptions of cases slower than before by `threshold`."""
+    before = {
+        (result["group"], result["name"]): result
+        for result in previous["results"]
+    }
+    regressions = []
+    for result in results:
+        old = before.get((result["group"], result["name"]))
+        if old and result["call_ns"] > old["call_ns"] * threshold:
+            regressions.append(
+                f"{result['group']}/{result['name']}: "
+                f"{old['call_ns']:.0f}ns -> {result['call_ns']:.0f}ns"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--output", help="file to write JSON results to")
+    parser.add_argument("--filter", default="", help="only run matching cases")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compare", help="previous JSON results to check")
+    parser.add_argument("--threshold", type=float, default=1.2)
+    options = parser.parse_args(argv)
+
+    results = []
+    for case in CASES:
+        if options.filter in f"{case.group}/{case.name}":
+            result = run_case(case, options.repeat)
+            results.append(result)
+            print(
+                f"{case.group:>10} {case.name:<32} "
+                f"{result['call_ns']:>10.0f}ns "
+                f"x{result['overhead']:<6.2f} "
+                f"build {result['construct_ns']:>8.0f}ns "
+                f"{result['node_bytes']:>7.0f}B",
+                file=sys.stderr,
+            )
+
+    report = {
+        "fungebra": fungebra.__version__,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+    if options.compare:
+        with open(options.compare) as previous:
+            regressions = compare(
+                results, json.load(previous), options.threshold
+            )
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+"""Benchmark cases, each pairing a `fungebra` expression with plain Python.
+
+Each case has a `build` callable constructing the expression, so that
+construction cost can be measured, a `baseline` callable which is the
+hand-written equivalent, and `args` passed to both.
+"""
+from collections import namedtuple
+from functools import partial, reduce
+from itertools import chain, islice, takewhile
+import json
+import operator as _operator
+from typing import Callable, List
+
+from fungebra import Args, F, identity, operator as op, pipeline
+from fungebra.functions import (
+    attrgetter,
+    caller,
+    collect,
+    constantly,
+    duxt,
+    equals,
+    expand,
+    filtering,
+    fnot,
+    greater,
+    iffy,
+    into,
+    is_,
+    itemgetter,
+    juxt,
+    less,
+    mapping,
+    methodcaller,
+    raiser,
+    read_jsonl,
+    suppress,
+    taker,
+    taking,
+)
+
+
+Case = namedtuple("Case", ["group", "name", "build", "baseline", "args"])
+
+
+CASES: List[Case] = []
+
+
+def case(group: str, name: str, baseline: Callable, *args):
+    """Register the decorated expression builder as a benchmark case."""
+
+    def _register(build: Callable) -> Callable:
+        CASES.append(Case(group, name, build, baseline, args))
+        return build
+
+    return _register
+
+
+def increment(number):
+    return number + 1
+
+
+def double(number):
+    return number * 2
+
+
+def even(number):
+    return not number % 2
+
+
+NUMBERS = list(range(100))
+RECORD = {"age": 3, "name": "C", "tags": ["a", "b"]}
+RECORDS = {
+    "hits": [
+        {"age": age, "name": name}
+        for age, name in zip(range(100), "BACDEFGHIJ" * 10)
+    ]
+}
+Point = namedtuple("Point", ["x", "y"])
+JSON_LINES = "\n".join(map(json.dumps, RECORDS["hits"])).encode()
+
+
+# Operators
+
+
+case("operator", "wrap", increment, 1)(lambda: F(increment))
+case("operator", "+", lambda x: double(increment(x)), 1)(
+    lambda: F(double) + increment
+)
+case("operator", "|", lambda x: double(increment(x)), 1)(
+    lambda: F(increment) | double
+)
+case("operator", "**", lambda x: double(increment(x)), 1)(
+    lambda: F(increment) ** double
+)
+case("operator", "<<", lambda: _operator.sub(3, 1))(
+    lambda: F(_operator.sub) << (3, 1)
+)
+case("operator", ">>", lambda x: _operator.sub(x, 1), 3)(
+    lambda: F(_operator.sub) >> (1,)
+)
+case("operator", "<< kwargs", lambda x: sorted(x, key=_operator.neg), NUMBERS)(
+    lambda: F(sorted) << {"key": _operator.neg}
+)
+case("operator", "Args |", lambda: sorted(NUMBERS, key=_operator.neg))(
+    lambda: partial(_operator.or_, Args(NUMBERS, key=_operator.neg), F(sorted))
+)
+case("operator", "unary -", lambda x: list(map(increment, x)), NUMBERS)(
+    lambda: -F(increment) | list
+)
+case("operator", "-", lambda x: list(map(increment, sorted(x))), NUMBERS)(
+    lambda: F(sorted) - increment | list
+)
+case("operator", "<", lambda x: list(filter(even, sorted(x))), NUMBERS)(
+    lambda: (F(sorted) < even) | list
+)
+case(
+    "operator", "<=", lambda x: list(filter(even, map(increment, x))), NUMBERS
+)(lambda: (F(increment) <= even) | list)
+case("operator", ">", lambda x: reduce(_operator.add, sorted(x)), NUMBERS)(
+    lambda: F(sorted) > _operator.add
+)
+case(
+    "operator", ">=", lambda x: reduce(_operator.add, map(double, x)), NUMBERS
+)(lambda: F(double) >= _operator.add)
+case("operator", "collect", lambda x: sum((x,)), 1)(lambda: F(sum).collect)
+case("operator", "expand", lambda x: max(*x), (1, 3, 2))(lambda: F(max).expand)
+case("operator", "decorate", increment, 1)(
+    lambda: F(increment).decorate(identity.compose)
+)
+case("operator", "pipeline", lambda x: str(double(increment(x))), 1)(
+    lambda: pipeline(increment, double, str)
+)
+case("operator", "chain of 20", lambda x: x + 20, 0)(
+    lambda: pipeline(*[increment] * 20)
+)
+
+
+# Combinators
+
+
+case("functions", "collect", lambda x: sum((1, x)), 2)(
+    lambda: collect(sum).partial(1)
+)
+case("functions", "expand", lambda x: list(chain(*x)), [[1], [2]])(
+    lambda: expand(chain) | list
+)
+case("functions", "caller", lambda f: f(2), abs)(lambda: caller(2))
+case("functions", "constantly", lambda _: True, 1)(lambda: constantly(True))
+case("functions", "juxt", lambda x: [str(x), double(x)], 2)(
+    lambda: juxt(str, double) | list
+)
+case("functions", "duxt", lambda x: {"s": str(x), "d": double(x)}, 2)(
+    lambda: duxt(s=str, d=double) | dict
+)
+case("functions", "is_", lambda x: x is None, None)(lambda: is_(None))
+case("functions", "equals", lambda x: x == 2, 2)(lambda: equals(2))
+case("functions", "less", lambda x: x < 2, 1)(lambda: less(2))
+case("functions", "greater", lambda x: x > 2, 1)(lambda: greater(2))
+case("functions", "fnot", lambda x: not x < 2, 1)(lambda: fnot(less(2)))
+case("functions", "itemgetter", lambda x: x["age"], RECORD)(
+    lambda: itemgetter("age")
+)
+case("functions", "itemgetter default", lambda x: x.get("no", 0), RECORD)(
+    lambda: itemgetter("no", 0)
+)
+case("functions", "attrgetter", lambda x: x.x, Point(1, 2))(
+    lambda: attrgetter("x")
+)
+case(
+    "functions", "attrgetter default", lambda x: getattr(x, "z", 0), Point(1, 2)
+)(lambda: attrgetter("z", 0))
+case("functions", "methodcaller", lambda x: x.split("2"), "123")(
+    lambda: methodcaller("split", "2")
+)
+case(
+    "functions",
+    "taker",
+    lambda x: list(takewhile(lambda n: n < 50, x)),
+    NUMBERS,
+)(lambda: taker(less(50)) | list)
+case("functions", "iffy", lambda x: 0 if x < 0 else x, -1)(
+    lambda: iffy(less(0), constantly(0))
+)
+case("functions", "suppress", lambda x: None, 1)(
+    lambda: suppress(ValueError)(raiser(ValueError))
+)
+
+
+# Pipelines
+
+
+def _old_items_sort_by_name_desc(data):
+    return sorted(
+        (item for item in data["hits"] if not item["age"] < 2),
+        key=lambda item: -ord(item["name"]),
+    )
+
+
+@case(
+    "pipeline",
+    "get_old_items_sort_by_name_desc",
+    _old_items_sort_by_name_desc,
+    RECORDS,
+)
+def _build_old_items_sort_by_name_desc():
+    greater_or_equal = less | fnot
+    return (
+        itemgetter("hits")
+        .filter(itemgetter("age") | greater_or_equal(2))
+        .pipe(F(sorted) << {"key": itemgetter("name") | ord | op.neg})
+        .pipe(list)
+    )
+
+
+@case("pipeline", "truncate_below", lambda x: [max(n, 0) for n in x], NUMBERS)
+def _build_truncate_below():
+    return (caller(0).map([less, constantly]) | iffy.expand).lmap
+
+
+@case(
+    "pipeline",
+    "map filter reduce",
+    lambda x: sum(n for n in (increment(m) for m in x) if even(n)),
+    NUMBERS,
+)
+def _build_map_filter_reduce():
+    return F(increment).map.filter(even).reduce(_operator.add)
+
+
+@case(
+    "pipeline",
+    "transduce map filter take",
+    lambda x: list(islice((n for n in map(increment, x) if even(n)), 20)),
+    NUMBERS,
+)
+def _build_transduce_map_filter_take():
+    return into(list, mapping(increment) + filtering(even) + taking(20))
+
+
+def _divide_hundred_skipping_zero(items):
+    results = []
+    for item in items:
+        try:
+            results.append(100 // item)
+        except ZeroDivisionError:
+            pass
+    return results
+
+
+@case("pipeline", "safe map skip", _divide_hundred_skipping_zero, NUMBERS)
+def _build_safe_map_skip():
+    divide = F(_operator.floordiv) << (100,)
+    return divide.safe_map("skip", ZeroDivisionError) | list
+
+
+@case(
+    "pipeline",
+    "read_jsonl filter",
+    lambda x: [
+        record
+        for record in map(json.loads, x.splitlines())
+        if record["age"] > 50
+    ],
+    JSON_LINES,
+)
+def _build_read_jsonl_filter():
+    return (read_jsonl() < (itemgetter("age") | greater(50))) | list
@@ -1,6 +1,6 @@
 from collections.abc import Mapping
 from functools import partial, reduce, update_wrapper
-import operator
+import operator as _operator
 from types import ModuleType
 from typing import Any, Callable, Iterable, Union
 
@@ -8,6 +8,9 @@ from fungebra.functions import iffy
 from fungebra.helpers import ModuleWrapper
 from fungebra.model import Function, Args, identity, pipeline
 
+# Imported for their registration with `fungebra.model`.
+from fungebra import aio as _aio, lazy as _lazy
+
 
 __version__ = "0.0.0"
 
@@ -22,4 +25,4 @@ I = identity  # pylint: disable=invalid-name
 
 # This is a wrapped module for re-export.
 # pylint: disable=invalid-name
-operator = ModuleWrapper(operator, iffy(callable, F))
+operator = ModuleWrapper(_operator, iffy(callable, F))
@@ -0,0 +1,278 @@
+"""Asynchronous `Function` expressions over coroutine functions.
+
+Composing a `Function` with a coroutine function, or with another
+asynchronous expression, produces an `AsyncFunction`. Calling it returns
+an awaitable, and each stage is awaited before its result is passed on,
+so synchronous and asynchronous stages may be mixed freely.
+
+Asynchronous `map` and `filter` run their function concurrently over the
+elements, with at most `CONCURRENCY` calls in flight at once, and return
+lists. `ajuxt` and `aduxt` run their branches concurrently.
+
+For example:
+```
+async def fetch(url): ...
+
+fetch_all = F(fetch).map | len
+await fetch_all(urls)
+enrich = ajuxt(fetch_user, fetch_orders) | tuple
+user, orders = await enrich(user_id)
+```
+"""
+import asyncio
+from functools import partial
+from inspect import isawaitable
+from typing import Any, Awaitable, Callable, Iterable, List, Optional, Tuple
+
+from fungebra.helpers import Structural, WrappedAttribute, reference
+from fungebra.model import EXTENSIONS, Function
+from fungebra.nodes import ASYNC_NODES, Compose, Node, _identity, unwrap
+
+
+CONCURRENCY = 64
+
+
+class AsyncCompose(Structural):
+    """Flat composition of functions, awaiting the result of each stage."""
+
+    __slots__ = ("stages", "_first", "_rest")
+
+    stages: Tuple[Callable, ...]
+
+    def __init__(self, *functions: Callable):
+        stages: List[Callable] = []
+        for function in map(unwrap, reversed(functions)):
+            if isinstance(function, (Compose, AsyncCompose)):
+                stages.extend(function.stages)
+            else:
+                stages.append(function)
+        self.stages = tuple(stages)
+        self._first = stages[0] if stages else _identity
+        self._rest = tuple(stages[1:])
+
+    async def __call__(self, *args, **kwargs):
+        result = self._first(*args, **kwargs)
+        if isawaitable(result):
+            result = await result
+        for stage in self._rest:
+            result = stage(result)
+            if isawaitable(result):
+                result = await result
+        return result
+
+    def __repr__(self):
+        return f"AsyncCompose({', '.join(map(repr, reversed(self.stages)))})"
+
+    def __reduce__(self):
+        return AsyncCompose, tuple(map(reference, reversed(self.stages)))
+
+
+class AsyncNode(Node):
+    """Base class for asynchronous nodes with bounded concurrency."""
+
+    __slots__ = ("concurrency",)
+
+    def __init__(self, func: Callable, concurrency: Optional[int] = None):
+        super().__init__(func)
+        if concurrency is not None and concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency or CONCURRENCY
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}({self.func!r}, "
+            f"concurrency={self.concurrency!r})"
+        )
+
+    def __reduce__(self):
+        return type(self), (reference(self.func), self.concurrency)
+
+
+class AsyncMap(AsyncNode):
+    """Concurrently map a function over one or more iterables."""
+
+    __slots__ = ()
+
+    async def __call__(self, *iterables: Iterable) -> List:
+        items = [await _items(iterable) for iterable in iterables]
+        return await _bounded_map(self.func, zip(*items), self.concurrency)
+
+
+class AsyncFilter(AsyncNode):
+    """Concurrently check a predicate over an iterable."""
+
+    __slots__ = ()
+
+    async def __call__(self, iterable: Iterable) -> List:
+        items = list(await _items(iterable))
+        checks = await _bounded_map(
+            self.func, ((item,) for item in items), self.concurrency
+        )
+        return [item for item, check in zip(items, checks) if check]
+
+
+class AsyncReduce(Node):
+    """Left-fold an iterable with a binary function, awaiting each step."""
+
+    __slots__ = ()
+
+    async def __call__(self, iterable: Iterable, *initial):
+        items = iter(await _items(iterable))
+        if initial:
+            (result,) = initial
+        else:
+            try:
+                result = next(items)
+            except StopIteration:
+                raise TypeError(
+                    "reduce() of empty iterable with no initial value"
+                ) from None
+        for item in items:
+            result = await _resolve(self.func(result, item))
+        return result
+
+
+class AJuxt(Structural):
+    """Callable concurrently gathering the results of several functions."""
+
+    __slots__ = ("functions",)
+
+    def __init__(self, *functions: Callable):
+        self.functions = tuple(map(unwrap, functions))
+
+    async def __call__(self, arg) -> List:
+        return await asyncio.gather(
+            *(_resolve(function(arg)) for function in self.functions)
+        )
+
+    def __repr__(self):
+        return f"AJuxt({', '.join(map(repr, self.functions))})"
+
+    def __reduce__(self):
+        return AJuxt, tuple(map(reference, self.functions))
+
+
+class ADuxt(Structural):
+    """Callable concurrently gathering named results of several functions."""
+
+    __slots__ = ("functions",)
+
+    def __init__(self, **named_functions: Callable):
+        self.functions = {
+            name: unwrap(function)
+            for name, function in named_functions.items()
+        }
+
+    async def __call__(self, arg) -> List[tuple]:
+        results = await asyncio.gather(
+            *(_resolve(function(arg)) for function in self.functions.values())
+        )
+        return list(zip(self.functions, results))
+
+    def __repr__(self):
+        arguments = (f"{name}={fn!r}" for name, fn in self.functions.items())
+        return f"ADuxt({', '.join(arguments)})"
+
+    def __reduce__(self):
+        functions = {
+            name: reference(fn) for name, fn in self.functions.items()
+        }
+        return partial(ADuxt, **functions), ()
+
+
+ASYNC_NODES.update(
+    (AsyncCompose, AsyncMap, AsyncFilter, AsyncReduce, AJuxt, ADuxt)
+)
+
+
+class AsyncFunction(Function):
+    """Function returning awaitables, with asynchronous composition methods."""
+
+    __slots__ = ()
+
+    __doc__ = WrappedAttribute("__doc__", __doc__)
+
+    asynchronous = True
+
+    Compose = AsyncCompose
+    Map = AsyncMap
+    Filter = AsyncFilter
+    Reduce = AsyncReduce
+
+    def __repr__(self):
+        return f"AsyncFunction({self.func!r})"
+
+    def amap(self, concurrency: Optional[int] = None):
+        """Map concurrently, with at most `concurrency` calls in flight."""
+        return AsyncFunction.wrap(AsyncMap(self._func, concurrency))
+
+    def afilter(self, concurrency: Optional[int] = None):
+        """Filter concurrently, with at most `concurrency` calls in flight."""
+        return AsyncFunction.wrap(AsyncFilter(self._func, concurrency))
+
+
+EXTENSIONS["AsyncFunction"] = AsyncFunction
+
+
+@Function
+def ajuxt(*functions: Callable) -> AsyncFunction:
+    """Asynchronous `juxt`, gathering the results of functions concurrently.
+
+    For example:
+    ```
+    user, orders = await ajuxt(fetch_user, fetch_orders)(user_id)
+    ```
+    """
+    return AsyncFunction.wrap(AJuxt(*functions))
+
+
+@Function
+def aduxt(**named_functions: Callable) -> AsyncFunction:
+    """Asynchronous `duxt`, gathering named results of functions concurrently.
+
+    For example:
+    ```
+    profile = aduxt(user=fetch_user, orders=fetch_orders) | dict
+    await profile(user_id) == {"user": ..., "orders": [...]}
+    ```
+    """
+    return AsyncFunction.wrap(ADuxt(**named_functions))
+
+
+async def _resolve(result: Any) -> Any:
+    if isawaitable(result):
+        return await result
+    return result
+
+
+async def _items(iterable: Iterable) -> Iterable:
+    if hasattr(iterable, "__aiter__"):
+        return [item async for item in iterable]
+    return iterable
+
+
+async def _release(semaphore: asyncio.Semaphore, result: Awaitable) -> Any:
+    try:
+        return await _resolve(result)
+    finally:
+        semaphore.release()
+
+
+async def _bounded_map(
+    func: Callable, arguments: Iterable[tuple], concurrency: int
+) -> List:
+    semaphore = asyncio.Semaphore(concurrency)
+    tasks = []
+    try:
+        for args in arguments:
+            await semaphore.acquire()
+            try:
+                result = func(*args)
+            except BaseException:
+                semaphore.release()
+                raise
+            tasks.append(asyncio.ensure_future(_release(semaphore, result)))
+        return list(await asyncio.gather(*tasks))
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,86 @@
+"""Batched execution of `Function` pipelines over streams of items.
+
+A batched pipeline maps a function over an iterable like `map`, but takes
+items in chunks of a fixed size and passes each chunk through the stages
+of the function together. Stages marked with `batchwise` receive the
+whole chunk as a list, so that functions such as bulk inserts pay their
+per-call overhead once per chunk, while other stages are applied to each
+item of the chunk in turn.
+
+Chunks are taken lazily with `itertools.islice`, so unbounded iterators
+are processed in constant memory.
+
+For example:
+```
+load = (F(parse_row) | batchwise(insert_rows) | itemgetter("id")).batched(500)
+ids = load(open("rows.csv"))
+```
+"""
+from typing import Callable, Iterable, Iterator, List, Tuple
+
+from fungebra.helpers import Structural, reference
+from fungebra.nodes import Compose, Node, unwrap
+from fungebra.parallel import chunks
+
+
+class Batchwise(Node):
+    """Function applied to whole chunks of items by batched pipelines."""
+
+    __slots__ = ()
+
+    def __call__(self, chunk: List) -> Iterable:
+        return self.func(chunk)
+
+
+class Batched(Structural):
+    """Map a function over an iterable, passing items through in chunks."""
+
+    __slots__ = ("func", "size", "_steps")
+
+    def __init__(self, func: Callable, size: int):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.func = unwrap(func)
+        self.size = size
+        self._steps = tuple(_steps(self.func))
+
+    def __call__(self, iterable: Iterable) -> Iterator:
+        return _run(self._steps, chunks(iterable, self.size))
+
+    def __repr__(self):
+        return f"Batched({self.func!r}, {self.size!r})"
+
+    def __reduce__(self):
+        return Batched, (reference(self.func), self.size)
+
+
+def _steps(func: Callable) -> Iterator[Tuple[bool, Callable]]:
+    """Group the stages of a function into per-chunk and per-item steps."""
+    stages = func.stages if isinstance(func, Compose) else (func,)
+    run: List[Callable] = []
+    for stage in stages:
+        if isinstance(stage, Batchwise):
+            if run:
+                yield False, _compose(run)
+                run = []
+            yield True, stage.func
+        else:
+            run.append(stage)
+    if run:
+        yield False, _compose(run)
+
+
+def _compose(stages: List[Callable]) -> Callable:
+    return stages[0] if len(stages) == 1 else Compose(*reversed(stages))
+
+
+def _run(steps: Tuple[Tuple[bool, Callable], ...], batches: Iterator[List]):
+    for chunk in batches:
+        for batchwise, func in steps:
+            if batchwise:
+                chunk = func(chunk)
+                if not isinstance(chunk, list):
+                    chunk = list(chunk)
+            else:
+                chunk = [func(item) for item in chunk]
+        yield from chunk
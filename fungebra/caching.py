@@ -0,0 +1,241 @@
+"""Memoization of `Function`s, see `functions.memoize`.
+
+A memoized function is a node holding the function and a `Cache` of its
+results, keyed by a function of the arguments. The cache is stateful, so
+memoized nodes compare by identity and are left in place by the
+optimiser; pickling one creates an empty cache with the same settings.
+"""
+from collections import OrderedDict
+from functools import partial
+import threading
+from time import monotonic
+from typing import Any, Callable, Hashable, Optional
+
+from fungebra.combinators import NOT_PASSED
+from fungebra.helpers import CacheInfo, constant, reference
+from fungebra.nodes import ASYNC_NODES, unwrap
+
+
+POLICIES = ("lru", "fifo")
+
+
+class Cache:
+    """Results of a function, by key, with hit and miss statistics.
+
+    Entries are evicted beyond `maxsize`, either least recently used or
+    first in first out depending on `policy`, and expire `ttl` seconds
+    after being stored. With `thread_safe`, callers hold `lock` while
+    using the cache.
+    """
+
+    __slots__ = (
+        "maxsize",
+        "ttl",
+        "policy",
+        "lock",
+        "entries",
+        "hits",
+        "misses",
+    )
+
+    def __init__(
+        self,
+        maxsize: Optional[int] = 128,
+        ttl: Optional[float] = None,
+        policy: str = "lru",
+        thread_safe: bool = False,
+    ):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if policy not in POLICIES:
+            raise ValueError(
+                f"Unknown policy {policy!r}, expected one of {list(POLICIES)}"
+            )
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.policy = policy
+        self.lock = threading.RLock() if thread_safe else None
+        self.entries: OrderedDict = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the result stored under `key`, or `NOT_PASSED`."""
+        try:
+            expires, value = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return NOT_PASSED
+        if expires is not None and expires <= monotonic():
+            del self.entries[key]
+            self.misses += 1
+            return NOT_PASSED
+        if self.policy == "lru":
+            self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """Store a result under `key`, evicting the oldest beyond maxsize."""
+        expires = None if self.ttl is None else monotonic() + self.ttl
+        self.entries[key] = (expires, value)
+        if self.policy == "lru":
+            self.entries.move_to_end(key)
+        if self.maxsize is not None and len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def locked(self, method: Callable, *args) -> Any:
+        """Call a method of the cache, holding its lock if any."""
+        if self.lock is None:
+            return method(*args)
+        with self.lock:
+            return method(*args)
+
+    def info(self) -> CacheInfo:
+        """Report statistics for the cached results."""
+        return CacheInfo(self.hits, self.misses, len(self.entries))
+
+    def clear(self):
+        """Clear the cached results and their statistics."""
+        self.locked(self.entries.clear)
+        self.hits = self.misses = 0
+
+    def __repr__(self):
+        return (
+            f"Cache(maxsize={self.maxsize!r}, ttl={self.ttl!r}, "
+            f"policy={self.policy!r})"
+        )
+
+    def __reduce__(self):
+        # Results are not pickled, only the settings of the cache.
+        return (
+            Cache,
+            (self.maxsize, self.ttl, self.policy, self.lock is not None),
+        )
+
+
+class Memoized:
+    """Base class of callables caching the results of a function.
+
+    Results are cached by `key`, a function of the arguments, defaulting
+    to `make_key`.
+    """
+
+    __slots__ = ("function", "cache", "key")
+
+    def __init__(
+        self,
+        function: Callable,
+        cache: Optional[Cache] = None,
+        key: Optional[Callable[..., Hashable]] = None,
+    ):
+        self.function = unwrap(function)
+        self.cache = Cache() if cache is None else cache
+        self.key = make_key if key is None else unwrap(key)
+
+    def cache_info(self) -> CacheInfo:
+        """Report statistics for the cache of results."""
+        return self.cache.info()
+
+    def cache_clear(self):
+        """Clear the cache of results and its statistics."""
+        self.cache.clear()
+
+    def __repr__(self):
+        cache = self.cache
+        return (
+            f"{type(self).__name__}({self.function!r}, "
+            f"maxsize={cache.maxsize!r}, ttl={cache.ttl!r}, "
+            f"policy={cache.policy!r})"
+        )
+
+    def __reduce__(self):
+        return (
+            partial(type(self), cache=self.cache, key=reference(self.key)),
+            (reference(self.function),),
+        )
+
+
+class Memoize(Memoized):
+    """Callable caching the results of a function by a key of its arguments.
+
+    See `Cache` for the eviction and expiry of results.
+    """
+
+    __slots__ = ()
+
+    def __call__(self, *args, **kwargs):
+        key = self.key(*args, **kwargs)
+        cache = self.cache
+        lock = cache.lock
+        if lock is None:
+            value = cache.get(key)
+        else:
+            with lock:
+                value = cache.get(key)
+        if value is not NOT_PASSED:
+            return value
+        value = self.function(*args, **kwargs)
+        if lock is None:
+            cache.put(key, value)
+        else:
+            with lock:
+                cache.put(key, value)
+        return value
+
+
+class AsyncMemoize(Memoized):
+    """Memoize for coroutine functions, caching their awaited results."""
+
+    __slots__ = ()
+
+    async def __call__(self, *args, **kwargs):
+        key = self.key(*args, **kwargs)
+        value = self.cache.locked(self.cache.get, key)
+        if value is NOT_PASSED:
+            value = await self.function(*args, **kwargs)
+            self.cache.locked(self.cache.put, key, value)
+        return value
+
+
+ASYNC_NODES.add(AsyncMemoize)
+
+
+# Separates positional from keyword arguments in keys of memoized calls.
+KEYWORD_MARK = constant("keyword_mark")
+
+
+# Marks keys of calls with unhashable arguments.
+FROZEN_MARK = constant("frozen_mark")
+
+
+def make_key(*args, **kwargs) -> Hashable:
+    """Default key of memoized functions, accepting unhashable arguments.
+
+    Lists, dicts and sets are converted to hashable equivalents, tagged by
+    their type so that, for example, a list and a tuple of the same items
+    are cached separately. Keyword arguments follow a marker, as in
+    `functools.lru_cache`, so that they are never confused with
+    positional arguments.
+    """
+    try:
+        if kwargs:
+            key = (*args, KEYWORD_MARK, frozenset(kwargs.items()))
+        else:
+            key = args
+        hash(key)
+    except TypeError:
+        return FROZEN_MARK, freeze(args), freeze(kwargs)
+    return key
+
+
+def freeze(value: Any) -> Hashable:
+    """Recursively convert lists, dicts and sets into hashable values."""
+    if isinstance(value, dict):
+        return dict, frozenset(
+            (key, freeze(item)) for key, item in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(map(freeze, value))
+    if isinstance(value, (set, frozenset)):
+        return frozenset, frozenset(map(freeze, value))
+    return value
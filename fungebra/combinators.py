@@ -0,0 +1,422 @@
+"""Nodes of the combinators built by `fungebra.functions`.
+
+Each node is a structurally comparable, picklable callable holding the
+unwrapped functions it combines, so that the optimiser, compiler and
+profiler can inspect expressions built from combinators.
+"""
+from collections import abc, namedtuple
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from fungebra.helpers import Structural, constant, reference
+from fungebra.nodes import _identity, unwrap
+
+
+SingleArgCallable = Callable[[Any], Any]
+
+
+NOT_PASSED = constant("not_passed")
+
+
+ERROR_POLICIES = ("skip", "default", "collect")
+
+
+Failure = namedtuple("Failure", ["item", "exception"])
+
+
+class Caller(Structural):
+    """Callable passing stored arguments to the function it is called with."""
+
+    __slots__ = ("args", "kwargs")
+
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self, function: Callable):
+        return function(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        arguments = [
+            *map(repr, self.args),
+            *(f"{key}={value!r}" for key, value in self.kwargs.items()),
+        ]
+        return f"Caller({', '.join(arguments)})"
+
+    def __reduce__(self):
+        return partial(Caller, **self.kwargs), self.args
+
+
+class Juxt(Structural):
+    """Callable lazily yielding the results of several functions."""
+
+    __slots__ = ("functions",)
+
+    def __init__(self, *functions: Callable):
+        self.functions = tuple(map(unwrap, functions))
+
+    def __call__(self, arg):
+        return (function(arg) for function in self.functions)
+
+    def __repr__(self):
+        return f"Juxt({', '.join(map(repr, self.functions))})"
+
+    def __reduce__(self):
+        return Juxt, tuple(map(reference, self.functions))
+
+
+class Duxt(Structural):
+    """Callable lazily yielding named results of several functions."""
+
+    __slots__ = ("functions",)
+
+    def __init__(self, **named_functions: Callable):
+        self.functions = {
+            name: unwrap(function)
+            for name, function in named_functions.items()
+        }
+
+    def __call__(self, arg):
+        return ((name, fn(arg)) for name, fn in self.functions.items())
+
+    def __repr__(self):
+        arguments = (f"{name}={fn!r}" for name, fn in self.functions.items())
+        return f"Duxt({', '.join(arguments)})"
+
+    def __reduce__(self):
+        functions = {
+            name: reference(fn) for name, fn in self.functions.items()
+        }
+        return partial(Duxt, **functions), ()
+
+
+class Shared(Structural):
+    """Callable lazily yielding the results of branches sharing prefixes.
+
+    Each branch is a pair of a function and the index of the prefix it is
+    applied to the result of, or `None` to apply it to the argument. Each
+    prefix is evaluated at most once per call, unless it returns a one-shot
+    iterator, which is consumed by the first branch applied to it. With
+    `names`, pairs of names and results are yielded as by `Duxt`.
+    """
+
+    __slots__ = ("prefixes", "branches", "names")
+
+    def __init__(
+        self,
+        prefixes: Tuple[Callable, ...],
+        branches: Tuple[Tuple[Callable, Optional[int]], ...],
+        names: Optional[Tuple[str, ...]] = None,
+    ):
+        self.prefixes = tuple(map(unwrap, prefixes))
+        self.branches = tuple(
+            (unwrap(function), index) for function, index in branches
+        )
+        self.names = names
+
+    def __call__(self, arg):
+        results = _shared(self.prefixes, self.branches, arg)
+        return results if self.names is None else zip(self.names, results)
+
+    def __repr__(self):
+        return f"Shared({self.prefixes!r}, {self.branches!r}, {self.names!r})"
+
+    def __reduce__(self):
+        return (
+            Shared,
+            (
+                tuple(map(reference, self.prefixes)),
+                tuple((reference(fn), index) for fn, index in self.branches),
+                self.names,
+            ),
+        )
+
+
+def _shared(
+    prefixes: Tuple[Callable, ...],
+    branches: Tuple[Tuple[Callable, Optional[int]], ...],
+    arg: Any,
+) -> Iterator:
+    results: Dict[int, Any] = {}
+    for function, index in branches:
+        if index is None:
+            yield function(arg)
+        elif index in results:
+            yield function(results[index])
+        else:
+            result = prefixes[index](arg)
+            if not isinstance(result, abc.Iterator):
+                results[index] = result
+            yield function(result)
+
+
+class Not(Structural):
+    """Callable negating the result of a function."""
+
+    __slots__ = ("function",)
+
+    def __init__(self, function: Callable):
+        self.function = unwrap(function)
+
+    def __call__(self, *args, **kwargs):
+        return not self.function(*args, **kwargs)
+
+    def __repr__(self):
+        return f"Not({self.function!r})"
+
+    def __reduce__(self):
+        return Not, (reference(self.function),)
+
+
+class Iffy(Structural):
+    """Callable choosing between two functions based on a predicate."""
+
+    __slots__ = ("predicate", "func", "default")
+
+    def __init__(
+        self,
+        predicate: SingleArgCallable,
+        func: SingleArgCallable,
+        default: SingleArgCallable = _identity,
+    ):
+        self.predicate = unwrap(predicate)
+        self.func = unwrap(func)
+        self.default = unwrap(default)
+
+    def __call__(self, arg):
+        if self.predicate(arg):
+            return self.func(arg)
+        return self.default(arg)
+
+    def __repr__(self):
+        return f"Iffy({self.predicate!r}, {self.func!r}, {self.default!r})"
+
+    def __reduce__(self):
+        functions = (self.predicate, self.func, self.default)
+        return Iffy, tuple(map(reference, functions))
+
+
+class ItemGetter(Structural):
+    """Callable getting an item from its argument, or a default."""
+
+    __slots__ = ("key", "default")
+
+    def __init__(self, key: Any, default: Any):
+        self.key = key
+        self.default = default
+
+    def __call__(self, value):
+        return value.get(self.key, self.default)
+
+    def __repr__(self):
+        return f"ItemGetter({self.key!r}, {self.default!r})"
+
+    def __reduce__(self):
+        return ItemGetter, (self.key, self.default)
+
+
+class AttrGetter(Structural):
+    """Callable getting a possibly dotted attribute, or a default."""
+
+    __slots__ = ("attr", "default", "path")
+
+    def __init__(self, attr: str, default: Any):
+        self.attr = attr
+        self.default = default
+        self.path = tuple(attr.split("."))
+
+    def __call__(self, value):
+        for name in self.path:
+            value = getattr(value, name, NOT_PASSED)
+            if value is NOT_PASSED:
+                return self.default
+        return value
+
+    def __repr__(self):
+        return f"AttrGetter({self.attr!r}, {self.default!r})"
+
+    def __reduce__(self):
+        return AttrGetter, (self.attr, self.default)
+
+
+class Raiser(Structural):
+    """Callable raising an exception regardless of the arguments."""
+
+    __slots__ = ("exception_class", "args", "kwargs")
+
+    def __init__(self, exception_class: Type[Exception], *args, **kwargs):
+        self.exception_class = exception_class
+        self.args = args
+        self.kwargs = kwargs
+
+    def __call__(self, *_a, **_kw):
+        raise self.exception_class(*self.args, **self.kwargs)
+
+    def __repr__(self):
+        return f"Raiser({self.exception_class.__name__}, *{self.args!r})"
+
+    def __reduce__(self):
+        return (
+            partial(Raiser, **self.kwargs),
+            (self.exception_class, *self.args),
+        )
+
+
+class Suppress(Structural):
+    """Callable returning a default when a function raises an exception."""
+
+    __slots__ = ("function", "exception_classes", "default")
+
+    def __init__(
+        self,
+        function: Callable,
+        exception_classes: Union[
+            Type[Exception], Tuple[Type[Exception], ...]
+        ],
+        default: Any = None,
+    ):
+        self.function = unwrap(function)
+        self.exception_classes = exception_classes
+        self.default = default
+
+    def __call__(self, *args, **kwargs):
+        try:
+            return self.function(*args, **kwargs)
+        except self.exception_classes:
+            return self.default
+
+    def __repr__(self):
+        return (
+            f"Suppress({self.function!r}, {self.exception_classes!r}, "
+            f"{self.default!r})"
+        )
+
+    def __reduce__(self):
+        return (
+            Suppress,
+            (reference(self.function), self.exception_classes, self.default),
+        )
+
+
+class SafeNode:
+    """Base class for stages handling the errors of each element.
+
+    With the `skip` policy, elements for which the function raises one of
+    `exception_classes` are dropped, and with `default` the function is
+    taken to have returned `default`. Failures are appended to `errors`,
+    if given, as `Failure(item, exception)` pairs; the `collect` policy
+    skips failed elements and requires `errors`.
+    """
+
+    __slots__ = ("func", "policy", "exception_classes", "default", "errors")
+
+    def __init__(
+        self,
+        func: Callable,
+        policy: str = "skip",
+        exception_classes: Union[
+            Type[Exception], Tuple[Type[Exception], ...]
+        ] = Exception,
+        default: Any = None,
+        errors: Optional[List[Failure]] = None,
+    ):
+        if policy not in ERROR_POLICIES:
+            raise ValueError(
+                f"Unknown policy {policy!r}, "
+                f"expected one of {list(ERROR_POLICIES)}"
+            )
+        if policy == "collect" and errors is None:
+            raise ValueError("The collect policy requires errors")
+        self.func = unwrap(func)
+        self.policy = policy
+        self.exception_classes = exception_classes
+        self.default = default
+        self.errors = errors
+
+    def __repr__(self):
+        return (
+            f"{type(self).__name__}({self.func!r}, {self.policy!r}, "
+            f"{self.exception_classes!r}, {self.default!r})"
+        )
+
+    def __reduce__(self):
+        return type(self), (
+            reference(self.func),
+            self.policy,
+            self.exception_classes,
+            self.default,
+            self.errors,
+        )
+
+
+class SafeMap(SafeNode):
+    """Lazily map a function over iterables, handling errors per element."""
+
+    __slots__ = ()
+
+    def __call__(self, *iterables: Iterable) -> Iterator:
+        if len(iterables) == 1:
+            func, items = self.func, iterables[0]
+        else:
+            func, items = partial(_star, self.func), zip(*iterables)
+        return _safe_map(self, func, items)
+
+
+class SafeFilter(SafeNode):
+    """Lazily filter an iterable, handling errors of the predicate."""
+
+    __slots__ = ()
+
+    def __call__(self, iterable: Iterable) -> Iterator:
+        keep = self.policy == "default" and bool(self.default)
+        return _safe_filter(
+            self.func, iterable, self.exception_classes, keep, self.errors
+        )
+
+
+def _star(func: Callable, args: tuple) -> Any:
+    return func(*args)
+
+
+def _safe_map(node: SafeMap, func: Callable, items: Iterable) -> Iterator:
+    exception_classes, default, errors = (
+        node.exception_classes,
+        node.default,
+        node.errors,
+    )
+    skip = node.policy != "default"
+    # A single try block per element, around the whole mapped function.
+    for item in items:
+        try:
+            result = func(item)
+        except exception_classes as exception:
+            if errors is not None:
+                errors.append(Failure(item, exception))
+            if skip:
+                continue
+            result = default
+        yield result
+
+
+def _safe_filter(predicate, items, exception_classes, keep, errors):
+    for item in items:
+        try:
+            if not predicate(item):
+                continue
+        except exception_classes as exception:
+            if errors is not None:
+                errors.append(Failure(item, exception))
+            if not keep:
+                continue
+        yield item
@@ -0,0 +1,494 @@
+"""Compile `Function` expressions into a single specialised Python function.
+
+The compiler walks the nodes built by the `Function` operators, and emits
+the source of one Python function which evaluates the whole expression.
+Partial arguments are inlined, well-known `operator` functions are emitted
+as native operators, and `map`/`filter`/`reduce` stages become generator
+expressions and loops. Anything the compiler does not recognise is called
+as an opaque callable, so compilation never changes behaviour.
+"""
+from functools import partial
+from itertools import count
+from keyword import iskeyword
+import linecache
+import math
+import operator
+from typing import (
+    Any,
+    Callable,
+    ClassVar,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+)
+
+from fungebra.combinators import AttrGetter, Iffy, ItemGetter, Not
+from fungebra.helpers import reference
+from fungebra.nodes import (
+    Collect,
+    Compose,
+    Constantly,
+    Expand,
+    Filter,
+    Map,
+    Reduce,
+    RPartial,
+    _identity,
+    unwrap,
+)
+
+
+BINARY_OPERATORS = {
+    operator.add: "({0} + {1})",
+    operator.sub: "({0} - {1})",
+    operator.mul: "({0} * {1})",
+    operator.truediv: "({0} / {1})",
+    operator.floordiv: "({0} // {1})",
+    operator.mod: "({0} % {1})",
+    operator.pow: "({0} ** {1})",
+    operator.matmul: "({0} @ {1})",
+    operator.lshift: "({0} << {1})",
+    operator.rshift: "({0} >> {1})",
+    operator.and_: "({0} & {1})",
+    operator.or_: "({0} | {1})",
+    operator.xor: "({0} ^ {1})",
+    operator.lt: "({0} < {1})",
+    operator.le: "({0} <= {1})",
+    operator.eq: "({0} == {1})",
+    operator.ne: "({0} != {1})",
+    operator.ge: "({0} >= {1})",
+    operator.gt: "({0} > {1})",
+    operator.is_: "({0} is {1})",
+    operator.is_not: "({0} is not {1})",
+    operator.contains: "({1} in {0})",
+    operator.getitem: "{0}[{1}]",
+}
+
+
+UNARY_OPERATORS = {
+    operator.neg: "(-{0})",
+    operator.pos: "(+{0})",
+    operator.invert: "(~{0})",
+    operator.not_: "(not {0})",
+    operator.truth: "bool({0})",
+    operator.abs: "abs({0})",
+}
+
+
+LITERAL_TYPES = (bool, int, str, bytes, type(None))
+
+
+class Compiler:
+    """Accumulates the namespace and source of a compiled function."""
+
+    def __init__(self):
+        self.namespace: Dict[str, Any] = {}
+        self.lines: List[str] = []
+        self._counter = count()
+
+    def fresh(self, prefix: str) -> str:
+        """Return a new unique variable name."""
+        return f"{prefix}{next(self._counter)}"
+
+    def constant(self, value: Any) -> str:
+        """Return source text evaluating to `value`."""
+        # Exact types only, as subclasses such as enums have their own repr.
+        kind = type(value)
+        if kind in LITERAL_TYPES or (kind is float and math.isfinite(value)):
+            return repr(value)
+        name = self.fresh("_k")
+        self.namespace[name] = value
+        return name
+
+    def emit(self, line: str):
+        self.lines.append(f"    {line}")
+
+    def call(
+        self, func: Callable, args: Sequence[str], extra: Sequence[str] = ()
+    ) -> str:
+        """Return source text calling `func`.
+
+        `args` are expressions for plain positional arguments, and `extra`
+        are any starred or keyword arguments following them.
+        """
+        func = unwrap(func)
+        if func is _identity and len(args) == 1 and not extra:
+            return args[0]
+        handler = HANDLERS.get(type(func))
+        if handler:
+            source = handler(self, func, list(args), list(extra))
+            if source is not None:
+                return source
+        template = None if extra else _operator_template(func, len(args))
+        if template:
+            return template.format(*args)
+        return f"{self.constant(func)}({', '.join([*args, *extra])})"
+
+    def statements(self, func: Callable, arg: str) -> str:
+        """Emit statements evaluating `func` on `arg`, returning the result.
+
+        Runs of `map` and `filter` stages are fused into one generator
+        expression, and a `reduce` stage following them into one loop.
+        """
+        func = unwrap(func)
+        stages = func.stages if isinstance(func, Compose) else (func,)
+        result = arg
+        for stage, run in segments(stages):
+            variable = self.fresh("_v")
+            if isinstance(stage, Reduce):
+                self._reduce_loop(run, stage, result, variable)
+            elif run:
+                self.emit(f"{variable} = {self.stream(run, result)}")
+            else:
+                self.emit(f"{variable} = {self.call(stage, [result])}")
+            result = variable
+        return result
+
+    def stream(self, run: Sequence[Union[Map, Filter]], iterable: str) -> str:
+        """Return a single generator expression for `map`/`filter` steps."""
+        item = self.fresh("_x")
+        clauses = [f"for {item} in {iterable}"]
+        current = item
+        for step in run:
+            if isinstance(step, Map):
+                current = self.call(step.func, [current])
+                continue
+            if not current.isidentifier():
+                value, current = current, self.fresh("_x")
+                clauses.append(f"for {current} in [{value}]")
+            clauses.append(f"if {self.call(step.func, [current])}")
+        return f"({current} {' '.join(clauses)})"
+
+    def _loop_body(self, run: Sequence[Union[Map, Filter]], item: str):
+        lines, current = [], item
+        for step in run:
+            if isinstance(step, Map):
+                value = self.call(step.func, [current])
+                current = self.fresh("_x")
+                lines.append(f"{current} = {value}")
+            else:
+                lines.append(f"if not {self.call(step.func, [current])}:")
+                lines.append("    continue")
+        return lines, current
+
+    def _reduce_loop(self, run, stage: Reduce, iterable: str, variable: str):
+        iterator, item = self.fresh("_it"), self.fresh("_x")
+        body, current = self._loop_body(run, item)
+        self.emit(f"{iterator} = iter({iterable})")
+        self.emit(f"for {item} in {iterator}:")
+        for line in body:
+            self.emit(f"    {line}")
+        self.emit(f"    {variable} = {current}")
+        self.emit("    break")
+        self.emit("else:")
+        self.emit(
+            "    raise TypeError("
+            "'reduce() of empty iterable with no initial value')"
+        )
+        self.emit(f"for {item} in {iterator}:")
+        for line in body:
+            self.emit(f"    {line}")
+        reduction = self.call(stage.func, [variable, current])
+        self.emit(f"    {variable} = {reduction}")
+
+    def build(self, function: Callable) -> "Compiled":
+        """Compile `function` into a specialised Python function."""
+        fallback = self.constant(function)
+        result = self.statements(function, "_a")
+        source = "\n".join(
+            [
+                "def compiled(*args, **kwargs):",
+                "    if len(args) != 1 or kwargs:",
+                f"        return {fallback}(*args, **kwargs)",
+                "    _a, = args",
+                *self.lines,
+                f"    return {result}",
+                "",
+            ]
+        )
+        filename = f"<fungebra-compiled-{id(self)}>"
+        linecache.cache[filename] = (
+            len(source),
+            None,
+            source.splitlines(True),
+            filename,
+        )
+        # pylint: disable=exec-used
+        exec(compile(source, filename, "exec"), self.namespace)
+        return _make_compiled(function, source, self.namespace["compiled"])
+
+
+class Compiled:
+    """A compiled expression, callable with the same semantics as `function`.
+
+    Each instance gets its own subclass with the generated function as
+    `__call__`, so calling a compiled expression adds no extra frame.
+    """
+
+    __slots__ = ("function", "source")
+
+    # Set on each subclass to the generated function.
+    __call__: ClassVar[Callable[..., Any]]
+
+    def __init__(self, function: Callable, source: str):
+        self.function = function
+        self.source = source
+
+    def __repr__(self):
+        return f"Compiled({self.function!r})"
+
+    def __reduce__(self):
+        return compile_function, (reference(self.function),)
+
+
+def _make_compiled(function: Callable, source: str, code: Callable):
+    cls = type(
+        "Compiled",
+        (Compiled,),
+        {"__slots__": (), "__call__": staticmethod(code)},
+    )
+    return cls(function, source)
+
+
+def compile_function(function: Callable) -> Compiled:
+    """Compile a `Function` expression into a single generated function.
+
+    For example:
+    ```
+    compiled = compile_function(itemgetter("age") | fnot(less(3)))
+    compiled({"age": 4}) is True
+    print(compiled.source)
+    ```
+    """
+    return Compiler().build(unwrap(function))
+
+
+def _operator_template(func: Callable, arity: int) -> Optional[str]:
+    try:
+        if arity == 2:
+            return BINARY_OPERATORS.get(func)
+        if arity == 1:
+            return UNARY_OPERATORS.get(func)
+    except TypeError:  # Unhashable callables are never operators.
+        pass
+    return None
+
+
+def _single(args: List[str], extra: List[str]) -> Optional[str]:
+    """Return the only argument, if a node is called with exactly one."""
+    if len(args) == 1 and not extra:
+        return args[0]
+    return None
+
+
+def _identifier(name: str) -> bool:
+    """Return whether `name` may be emitted as an attribute or keyword."""
+    return name.isidentifier() and not iskeyword(name)
+
+
+def _name(args: List[str], extra: List[str]) -> Optional[str]:
+    """Return the only argument, if it may be safely evaluated repeatedly."""
+    arg = _single(args, extra)
+    if arg is not None and arg.isidentifier():
+        return arg
+    return None
+
+
+def segments(stages: Sequence[Callable]):
+    """Group stages into runs of consecutive map and filter steps.
+
+    Yields `(stage, run)` pairs. A run ending in a reduction is yielded with
+    the `Reduce` stage, any other run with its own last step, and all other
+    stages with an empty run.
+    """
+    stages = [*map(unwrap, stages)]
+    run: List[Union[Map, Filter]] = []
+    for index, stage in enumerate(stages):
+        if isinstance(stage, Reduce):
+            yield stage, run
+            run = []
+        elif isinstance(stage, (Map, Filter)):
+            run.append(stage)
+            following = stages[index + 1] if index + 1 < len(stages) else None
+            if not isinstance(following, (Map, Filter, Reduce)):
+                yield stage, run
+                run = []
+        else:
+            yield stage, run
+
+
+def _compile_compose(compiler: Compiler, node: Compose, args, extra):
+    if not node.stages:
+        return _single(args, extra)
+    first, *rest = node.stages
+    source = compiler.call(first, args, extra)
+    for stage, run in segments(rest):
+        if run:
+            source = compiler.stream(run, source)
+        if not run or isinstance(stage, Reduce):
+            source = compiler.call(stage, [source])
+    return source
+
+
+def _compile_partial(compiler: Compiler, node: partial, args, extra):
+    if node.keywords and (
+        any(e.startswith("**") for e in extra)
+        or not all(map(_identifier, node.keywords))
+    ):
+        return None
+    bound = [compiler.constant(arg) for arg in node.args]
+    keywords = _keywords(compiler, node.keywords or {}, extra)
+    return compiler.call(node.func, [*bound, *args], [*extra, *keywords])
+
+
+def _compile_rpartial(compiler: Compiler, node: RPartial, args, extra):
+    if extra or not all(map(_identifier, node.keywords)):
+        return None
+    bound = [compiler.constant(arg) for arg in node.args]
+    keywords = _keywords(compiler, node.keywords, extra)
+    return compiler.call(node.func, [*args, *bound], keywords)
+
+
+def _keywords(
+    compiler: Compiler, keywords: Dict[str, Any], extra: List[str]
+) -> List[str]:
+    """Return bound keyword arguments, less those overridden by `extra`."""
+    overridden = {
+        argument.partition("=")[0]
+        for argument in extra
+        if not argument.startswith("*")
+    }
+    return [
+        f"{key}={compiler.constant(value)}"
+        for key, value in keywords.items()
+        if key not in overridden
+    ]
+
+
+def _reduced(node: Callable) -> Tuple[Callable, tuple]:
+    """Return the constructor and arguments of a reducible callable."""
+    reduced = cast(tuple, node.__reduce__())
+    return reduced[0], reduced[1]
+
+
+def _compile_collect(compiler: Compiler, node: Collect, args, extra):
+    if extra:
+        return None
+    return compiler.call(node.func, [f"({''.join(a + ', ' for a in args)})"])
+
+
+def _compile_expand(compiler: Compiler, node: Expand, args, extra):
+    arg = _single(args, extra)
+    if arg is None:
+        return None
+    return compiler.call(node.func, [], [f"*{arg}"])
+
+
+def _compile_step(compiler: Compiler, node: Union[Map, Filter], args, extra):
+    arg = _single(args, extra)
+    if arg is None:
+        return None
+    return compiler.stream([node], arg)
+
+
+def _compile_constantly(compiler: Compiler, node: Constantly, args, extra):
+    if not all(arg.isidentifier() for arg in [*args, *extra]):
+        return None  # Arguments must still be evaluated for side effects.
+    return compiler.constant(node.const)
+
+
+def _compile_not(compiler: Compiler, node: Not, args, extra):
+    return f"(not {compiler.call(node.function, args, extra)})"
+
+
+def _compile_iffy(compiler: Compiler, node: Iffy, args, extra):
+    arg = _name(args, extra)
+    if arg is None:
+        return None
+    func, predicate, default = (
+        compiler.call(function, [arg])
+        for function in (node.func, node.predicate, node.default)
+    )
+    return f"({func} if {predicate} else {default})"
+
+
+def _compile_itemgetter(compiler: Compiler, node: ItemGetter, args, extra):
+    arg = _single(args, extra)
+    if arg is None:
+        return None
+    key, default = map(compiler.constant, (node.key, node.default))
+    return f"{arg}.get({key}, {default})"
+
+
+def _compile_attrgetter(compiler: Compiler, node: AttrGetter, args, extra):
+    arg = _single(args, extra)
+    if arg is None or len(node.path) > 1:
+        return None
+    attr, default = map(compiler.constant, (node.attr, node.default))
+    return f"getattr({arg}, {attr}, {default})"
+
+
+def _compile_operator_itemgetter(
+    compiler: Compiler, node: operator.itemgetter, args, extra
+):
+    _, keys = _reduced(node)
+    arg = _single(args, extra) if len(keys) == 1 else _name(args, extra)
+    if arg is None:
+        return None
+    items = [f"{arg}[{compiler.constant(key)}]" for key in keys]
+    return items[0] if len(items) == 1 else f"({', '.join(items)})"
+
+
+def _compile_operator_attrgetter(
+    _compiler: Compiler, node: operator.attrgetter, args, extra
+):
+    _, attrs = _reduced(node)
+    arg = _single(args, extra) if len(attrs) == 1 else _name(args, extra)
+    if arg is None or not all(
+        all(map(_identifier, attr.split("."))) for attr in attrs
+    ):
+        return None
+    items = [f"{arg}.{attr}" for attr in attrs]
+    return items[0] if len(items) == 1 else f"({', '.join(items)})"
+
+
+def _compile_operator_methodcaller(
+    compiler: Compiler, node: operator.methodcaller, args, extra
+):
+    constructor, reduced_args = _reduced(node)
+    if isinstance(constructor, partial):
+        # Method callers with keyword arguments reduce to a partial.
+        (name,), call_args = constructor.args, reduced_args
+        kwargs = constructor.keywords
+    else:
+        name, call_args = reduced_args[0], reduced_args[1:]
+        kwargs = {}
+    arg = _single(args, extra)
+    if arg is None or not all(map(_identifier, [name, *kwargs])):
+        return None
+    bound = [compiler.constant(value) for value in call_args]
+    keywords = _keywords(compiler, kwargs, [])
+    return f"{arg}.{name}({', '.join([*bound, *keywords])})"
+
+
+HANDLERS: Dict[type, Callable[..., Optional[str]]] = {
+    Compose: _compile_compose,
+    partial: _compile_partial,
+    RPartial: _compile_rpartial,
+    Collect: _compile_collect,
+    Expand: _compile_expand,
+    Map: _compile_step,
+    Filter: _compile_step,
+    Constantly: _compile_constantly,
+    Not: _compile_not,
+    Iffy: _compile_iffy,
+    ItemGetter: _compile_itemgetter,
+    AttrGetter: _compile_attrgetter,
+    operator.itemgetter: _compile_operator_itemgetter,
+    operator.attrgetter: _compile_operator_attrgetter,
+    operator.methodcaller: _compile_operator_methodcaller,
+}
@@ -1,12 +1,67 @@
+from functools import partial
 from itertools import takewhile
 import operator
-from typing import Any, Callable, Iterable, Iterator, Tuple, Type, Union
-
-from fungebra.helpers import constant
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
+
+from fungebra.batching import Batchwise
+from fungebra.combinators import (
+    NOT_PASSED,
+    AttrGetter,
+    Caller,
+    Duxt,
+    Iffy,
+    ItemGetter,
+    Juxt,
+    Not,
+    Raiser,
+    SingleArgCallable,
+    Suppress,
+)
 from fungebra.model import Function, identity
-
-
-SingleArgCallable = Callable[[Any], Any]
+from fungebra.nodes import Constantly, unwrap
+from fungebra.parallel import ParallelDuxt, ParallelJuxt
+
+# Functions building transducers, sources and sinks live with their nodes,
+# and are re-exported here with the other functions.
+# pylint: disable=unused-import
+from fungebra.streams import (
+    read_jsonl,
+    read_lines,
+    read_records,
+    read_structs,
+    write_jsonl,
+    write_lines,
+    write_records,
+    write_structs,
+)
+from fungebra.transducers import (
+    catting,
+    deduping,
+    distinct,
+    dropping,
+    filtering,
+    into,
+    mapping,
+    partitioning,
+    reduced,
+    taking,
+    taking_while,
+    transduce,
+)
+
+# pylint: enable=unused-import
 
 
 # Function manipulation
@@ -21,7 +76,7 @@ def collect(function: Callable) -> Callable:
     collect(sum).partial(1)(2, 3) == 6
     ```
     """
-    return Function(function).collect
+    return Function.wrap(function).collect
 
 
 @Function
@@ -37,7 +92,7 @@ def expand(function: Callable) -> Callable:
     (itemgetter("foo").map | expand(chain) | list)(data) == [1,2,3,4]
     ```
     """
-    return Function(function).expand
+    return Function.wrap(function).expand
 
 
 @Function
@@ -51,7 +106,7 @@ def caller(*args, **kwargs) -> Callable[[Callable], Any]:
     caller(data).lmap.(checkers) | list == [True, False]
     ```
     """
-    return Function(lambda function: function(*args, **kwargs))
+    return Function.wrap(Caller(*args, **kwargs))
 
 
 @Function
@@ -63,7 +118,7 @@ def constantly(const: Any):
     constantly(True).lmap([1, 2, 3]) == [True, True, True]
     ```
     """
-    return Function(lambda *_a, **_kw: const)
+    return Function.wrap(Constantly(const))
 
 
 @Function
@@ -76,7 +131,7 @@ def juxt(*functions):
     status, headers = get_response_head(response)
     ```
     """
-    return Function(lambda arg: (fn(arg) for fn in functions))
+    return Function.wrap(Juxt(*functions))
 
 
 @Function
@@ -92,11 +147,114 @@ def duxt(**named_functions):
     body = build_response(query)
     ```
     """
-    return Function(
-        lambda arg: ((name, fn(arg)) for name, fn in named_functions.items())
+    return Function.wrap(Duxt(**named_functions))
+
+
+@Function
+def parallel_juxt(
+    *functions: Callable, kind: str = "thread", workers: Optional[int] = None
+):
+    """Function returning results of other functions computed in parallel.
+
+    Branches run on a shared thread or process pool, see
+    `fungebra.parallel`, and results are returned as a list in order. If a
+    branch raises, the branches not yet started are cancelled. Also
+    available as `juxt.parallel`.
+
+    For example:
+    ```
+    lookup = juxt.parallel(fetch_user, fetch_orders, workers=2) | tuple
+    user, orders = lookup(user_id)
+    ```
+    """
+    return Function.wrap(
+        ParallelJuxt(*map(unwrap, functions), kind=kind, workers=workers)
     )
 
 
+@Function
+def parallel_duxt(
+    kind: str = "thread",
+    workers: Optional[int] = None,
+    **named_functions: Callable,
+):
+    """Function returning named results of functions computed in parallel.
+
+    As `parallel_juxt`, with results returned as a list of key-value
+    pairs. Also available as `duxt.parallel`.
+
+    For example:
+    ```
+    build_response = duxt.parallel(
+        total=methodcaller("count"),
+        hits=methodcaller("all")
+    ) | dict | json.dumps
+    ```
+    """
+    functions = {name: unwrap(fn) for name, fn in named_functions.items()}
+    return Function.wrap(ParallelDuxt(kind, workers, **functions))
+
+
+setattr(juxt, "parallel", parallel_juxt)
+setattr(duxt, "parallel", parallel_duxt)
+
+
+@Function
+def batchwise(function: Callable) -> Callable:
+    """Mark a function as accepting a whole chunk of items at once.
+
+    In pipelines run with `Function.batched`, the function is called with
+    a list of items and returns an iterable of results, see
+    `fungebra.batching`. Called directly, it is passed its argument as is.
+
+    For example:
+    ```
+    save = F(validate) | batchwise(insert_rows)
+    save.batched(500)(rows)  # Calls insert_rows once per 500 rows.
+    ```
+    """
+    return Function.wrap(Batchwise(function))
+
+
+@Function
+def memoize(
+    maxsize: Optional[int] = 128,
+    ttl: Optional[float] = None,
+    key: Optional[Callable[..., Hashable]] = None,
+    policy: str = "lru",
+    thread_safe: bool = False,
+) -> Callable[[Callable], Callable]:
+    """Decorate function to cache its results.
+
+    Results are cached by `key`, a function of the arguments, which by
+    default accepts lists and dicts as well as hashable arguments. At most
+    `maxsize` results are kept, evicted by the `"lru"` or `"fifo"` policy,
+    and results expire after `ttl` seconds. With `thread_safe`, the cache
+    may be shared between threads. Statistics are reported by
+    `cache_info()` of the memoized function, and the cache is cleared by
+    its `cache_clear()`. Coroutine functions have their awaited results
+    cached.
+
+    For example:
+    ```
+    lookup = itemgetter("id") | memoize(maxsize=1024)(fetch_user)
+    by_id = memoize(key=itemgetter("id"))(fetch_user_for_record)
+    ```
+    """
+    options = {
+        "maxsize": maxsize,
+        "ttl": ttl,
+        "key": key,
+        "policy": policy,
+        "thread_safe": thread_safe,
+    }
+    return Function.wrap(partial(_memoized, options))
+
+
+def _memoized(options: Dict[str, Any], function: Callable) -> Function:
+    return Function.wrap(function).memoize(**options)
+
+
 # Data comparison functions
 
 
@@ -109,7 +267,7 @@ def is_(value: Any) -> Callable[[Any], bool]:
     is_(2).lmap([1, 2, 3]) == [False, True, False]
     ```
     """
-    return Function(operator.is_).partial(value)
+    return Function.wrap(partial(operator.is_, value))
 
 
 @Function
@@ -121,7 +279,7 @@ def equals(value: Any) -> Callable[[Any], bool]:
     equals(2).lmap([1, 2, 3]) == [False, True, False]
     ```
     """
-    return Function(operator.eq).partial(value)
+    return Function.wrap(partial(operator.eq, value))
 
 
 @Function
@@ -133,7 +291,7 @@ def less(value: Any) -> Callable[[Any], bool]:
     less(2).lmap([1, 2, 3]) == [True, False, False]
     ```
     """
-    return Function(operator.gt).partial(value)
+    return Function.wrap(partial(operator.gt, value))
 
 
 @Function
@@ -145,7 +303,7 @@ def greater(value: Any) -> Callable[[Any], bool]:
     greater(2).lmap([1, 2, 3]) == [False, False, True]
     ```
     """
-    return Function(operator.lt).partial(value)
+    return Function.wrap(partial(operator.lt, value))
 
 
 @Function
@@ -160,54 +318,62 @@ def fnot(function: Callable) -> Callable:
     greater_or_equal_to(2).lmap([1, 2, 3]) == [False, True, True]
     ```
     """
-    return Function(lambda *a, **kw: not function(*a, **kw))
+    return Function.wrap(Not(function))
 
 
 # Data manipulation functions
 
 
 @Function
-def itemgetter(
-    key: Any, default: Any = constant("not_passed")
-) -> Callable[[Any], Any]:
+def itemgetter(key: Any, default: Any = NOT_PASSED) -> Callable[[Any], Any]:
     """Similar to `operator.itemgetter`, but produces `Function`.
 
+    A list of keys gets a tuple of items. Without a default, this is backed
+    by `operator.itemgetter`.
+
     For example:
     ```
     itemgetter("foo")({"foo": "bar"}) == "bar"
     itemgetter("foo")({"bar": "baz"})  # KeyError
     itemgetter("foo", None)({"bar": "baz"}) == None
+    itemgetter(["foo", "bar"], None)({"bar": "baz"}) == (None, "baz")
     ```
     """
-    return Function(
-        iffy(
-            is_(constant("not_passed")),
-            constantly(lambda val: val[key]),
-            constantly(lambda val: val.get(key, default)),
-        )(default)
-    )
+    if isinstance(key, list):
+        if default is NOT_PASSED and len(key) > 1:
+            return Function.wrap(operator.itemgetter(*key))
+        getters = (itemgetter(each, default) for each in key)
+        return juxt(*getters) | tuple
+    if default is NOT_PASSED:
+        return Function.wrap(operator.itemgetter(key))
+    return Function.wrap(ItemGetter(key, default))
 
 
 @Function
 def attrgetter(
-    attr: str, default: Any = constant("not_passed")
+    attr: Union[str, List[str]], default: Any = NOT_PASSED
 ) -> Callable[[Any], Any]:
     """Similar to `operator.attrgetter`, but produces `Function`.
 
+    Attributes may be dotted paths, and a list of attributes gets a tuple.
+    Without a default, this is backed by `operator.attrgetter`.
+
     For example:
     ```
     attrgetter("reduce")(functools) is functools.reduce
     attrgetter("map")(functools)  # AttributeError
     attrgetter("map", None)(functools) == None
+    attrgetter("reduce.__name__")(functools) == "reduce"
     ```
     """
-    return Function(
-        iffy(
-            is_(constant("not_passed")),
-            constantly(lambda val: getattr(val, attr)),
-            constantly(lambda val: getattr(val, attr, default)),
-        )(default)
-    )
+    if isinstance(attr, list):
+        if default is NOT_PASSED and len(attr) > 1:
+            return Function.wrap(operator.attrgetter(*attr))
+        getters = (attrgetter(each, default) for each in attr)
+        return juxt(*getters) | tuple
+    if default is NOT_PASSED:
+        return Function.wrap(operator.attrgetter(attr))
+    return Function.wrap(AttrGetter(attr, default))
 
 
 @Function
@@ -219,7 +385,7 @@ def methodcaller(method: str, *args, **kwargs) -> Callable[[Any], Any]:
     methodcaller("split", "2")("123") == ["1", "3"]
     ```
     """
-    return attrgetter(method) | caller(*args, **kwargs)
+    return Function.wrap(operator.methodcaller(method, *args, **kwargs))
 
 
 @Function
@@ -231,7 +397,7 @@ def taker(predicate: Callable[[Any], Any]) -> Callable[[Iterable], Iterator]:
     (taker(less(3)) | list)(range(6)) == [0, 1, 2]
     ```
     """
-    return Function(takewhile).partial(predicate)
+    return Function.wrap(partial(takewhile, predicate))
 
 
 # Control flow functions
@@ -251,7 +417,7 @@ def iffy(
     truncate_negative.lmap([-1, 2, 4]) == [0, 2, 4]
     ```
     """
-    return Function(lambda arg: func(arg) if predicate(arg) else default(arg))
+    return Function.wrap(Iffy(predicate, func, default))
 
 
 @Function
@@ -265,11 +431,7 @@ def raiser(exception_class: Type[Exception], *args, **kwargs) -> Callable:
     validate(2)  # Raises ValueError
     ```
     """
-
-    def _raise(*_, **__):
-        raise exception_class(*args, **kwargs)
-
-    return _raise
+    return Function.wrap(Raiser(exception_class, *args, **kwargs))
 
 
 @Function
@@ -285,16 +447,8 @@ def suppress(
     suppress(ValueError)(validate).lmap([1, 2, 3]) == [1, None, 3]
     ```
     """
+    return Function.wrap(partial(_suppressed, exception_classes, default))
 
-    @Function
-    def _decorate(function: Callable) -> Callable:
-        @Function
-        def _wrapper(*args, **kwargs):
-            try:
-                return function(*args, **kwargs)
-            except exception_classes:
-                return default
-
-        return _wrapper
 
-    return _decorate
+def _suppressed(exception_classes, default, function: Callable) -> Function:
+    return Function.wrap(Suppress(function, exception_classes, default))
@@ -1,26 +1,263 @@
-from functools import lru_cache
+from collections import namedtuple
+from functools import lru_cache, partial
+import operator
+import sys
 from types import ModuleType
-from typing import Any, Callable
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "currsize"])
 
 
 class ModuleWrapper(ModuleType):
     """Wrap a module, decorating access to contained items.
 
+    Decorated items are cached, so each access of the same attribute
+    returns the same object. With `eager`, every public attribute of the
+    module is decorated up front.
+
     For example:
     ```
     # All callable items in the operator module returned as Functions.
     operator = ModuleWrapper(operator, iffy(callable, Function))
+    operator.add is operator.add
     ```
     """
 
-    def __init__(self, obj: Any, decorate: Callable = lambda _: _):
+    def __init__(
+        self, obj: Any, decorate: Callable = lambda _: _, eager: bool = False
+    ):
         self._wrapped = obj
         self._decorate = decorate
+        self._cache: Dict[str, Any] = {}
+        self._hits = 0
+        self._misses = 0
+        if eager:
+            for attr in dir(obj):
+                if not attr.startswith("_"):
+                    getattr(self, attr)
 
     def __getattr__(self, attr: str) -> Any:
         if attr in self.__dict__:
-            return getattr(self, attr)
-        return self._decorate(getattr(self._wrapped, attr))
+            return self.__dict__[attr]
+        if attr in ("_wrapped", "_decorate", "_cache"):
+            raise AttributeError(attr)
+        try:
+            value = self._cache[attr]
+        except KeyError:
+            self._misses += 1
+            value = self._decorate(getattr(self._wrapped, attr))
+            self._cache[attr] = value
+            return value
+        self._hits += 1
+        return value
+
+    def cache_info(self) -> CacheInfo:
+        """Report statistics for the cache of decorated attributes."""
+        return CacheInfo(self._hits, self._misses, len(self._cache))
+
+    def cache_clear(self):
+        """Clear the cache of decorated attributes and its statistics."""
+        self._cache.clear()
+        self._hits = self._misses = 0
+
+
+class WrappedAttribute:
+    """Descriptor looking up an attribute on the callable an instance wraps.
+
+    Accessed on the class itself, the class's own value is returned.
+
+    For example:
+    ```
+    class Wrapper:
+        __doc__ = WrappedAttribute("__doc__", "Wrapper for a function.")
+    ```
+    """
+
+    def __init__(self, name: str, default: Any = None):
+        self.name = name
+        self.default = default
+
+    def __get__(self, instance: Any, owner: type) -> Any:
+        if instance is None:
+            return self.default
+        return getattr(instance.func, self.name, self.default)
+
+
+def lookup(module: Optional[str], qualname: Optional[str]) -> Any:
+    """Return the object importable by module and qualified name, if any."""
+    found = sys.modules.get(module or "")
+    for name in (qualname or "<locals>").split("."):
+        found = getattr(found, name, None)
+    return found
+
+
+def reference(func: Callable) -> Callable:
+    """Return the global wrapper of a function, if it has been wrapped.
+
+    Decorating a module-level function replaces it in its module, so the
+    function itself can no longer be pickled by name. Nodes pickle their
+    wrapped functions via this, so that the wrapper is pickled instead.
+    """
+    found = lookup(
+        getattr(func, "__module__", None), getattr(func, "__qualname__", None)
+    )
+    if found is not func and getattr(found, "func", None) is func:
+        return found
+    return func
+
+
+# Standard library callables built from arguments they can be reduced to.
+REDUCIBLE_TYPES = frozenset(
+    (operator.attrgetter, operator.itemgetter, operator.methodcaller)
+)
+
+
+MUTABLE_TYPES = frozenset((bytearray, dict, list, set))
+
+
+# Types whose negative zeros equal their zeros, keyed by their repr.
+SIGNED_ZERO_TYPES = frozenset((complex, float))
+
+
+class Structural:
+    """Mixin comparing and hashing nodes by their structure.
+
+    Two nodes are equal when they have the same type and their public
+    slots are structurally equal, so equivalent expressions built
+    separately compare and hash equal. Nodes with mutable or unhashable
+    parts are only equal to themselves.
+    """
+
+    __slots__ = ()
+
+    def _structure(self) -> Hashable:
+        cls: type = type(self)
+        return (cls, *(_field(getattr(self, name)) for name in _fields(cls)))
+
+    def __eq__(self, other):
+        if not isinstance(other, Structural):
+            return NotImplemented
+        if self is other:
+            return True
+        try:
+            return bool(equality_key(self) == equality_key(other))
+        except (TypeError, ValueError):
+            return False
+
+    def __hash__(self):
+        return hash(equality_key(self))
+
+
+def structure(value: Any) -> Any:
+    """Return a key of a value which is equal for structurally equal values.
+
+    Nodes, `functools.partial` objects and the `operator` getters are keyed
+    by their type and arguments, recursively. Other callables are keyed by
+    themselves, and other values by their type and value, so that `1` and
+    `True` are told apart. Floats are keyed by their repr, so that `0.0`
+    and `-0.0` are too. Lists, sets, dicts and bytearrays are keyed by
+    their contents, so that keys are hashable, and marked as mutable.
+
+    For example:
+    ```
+    structure(itemgetter("x") | int) == structure(itemgetter("x") | int)
+    ```
+    """
+    if isinstance(value, Structural):
+        # Nodes define their structure, which only this function reads.
+        return value._structure()  # pylint: disable=protected-access
+    if isinstance(value, partial) or type(value) in REDUCIBLE_TYPES:
+        return _arguments(value)
+    if callable(value):
+        return value
+    cls = type(value)
+    if cls in MUTABLE_TYPES:
+        return (MUTABLE, cls, _contents(value))
+    return (cls, repr(value) if cls in SIGNED_ZERO_TYPES else value)
+
+
+def cache_key(value: Any) -> Optional[Hashable]:
+    """Return the structure of a value, if it can key a cache.
+
+    Values with unhashable or mutable parts cannot, as a cached value
+    built from them would be shared with values which only happened to be
+    equal when they were built.
+    """
+    try:
+        key = structure(value)
+        hash(key)
+    except TypeError:
+        return None
+    return None if _mutable(key) else key
+
+
+def equality_key(value: Any) -> Hashable:
+    """Return a key of a value which is equal only for interchangeable values.
+
+    Values which can key a cache are keyed by their structure. Others,
+    holding mutable or unhashable parts such as lists or arrays, are keyed
+    by their identity, as values equal when compared could differ later,
+    and comparing some of them, such as arrays, raises an error.
+    """
+    key = cache_key(value)
+    return (IDENTICAL, id(value)) if key is None else key
+
+
+def _arguments(value: Any) -> Any:
+    # Partial objects and the operator getters, keyed by their arguments.
+    if isinstance(value, partial):
+        return (
+            type(value),
+            structure(value.func),
+            _item(value.args),
+            _field(value.keywords),
+        )
+    constructor, args = value.__reduce__()[:2]
+    return (structure(constructor), _item(args))
+
+
+def _mutable(key: Any) -> bool:
+    if not isinstance(key, tuple):
+        return False
+    if key and key[0] is MUTABLE:
+        return True
+    return any(map(_mutable, key))
+
+
+def _field(value: Any) -> Any:
+    # Dicts in slots hold keyword arguments or named functions.
+    if isinstance(value, dict):
+        items = tuple((key, _item(item)) for key, item in value.items())
+        return (type(value), items)
+    return _item(value)
+
+
+def _item(value: Any) -> Any:
+    if isinstance(value, tuple):
+        return (type(value), tuple(map(_item, value)))
+    return structure(value)
+
+
+def _contents(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(
+            (structure(key), structure(item)) for key, item in value.items()
+        )
+    if isinstance(value, set):
+        return frozenset(map(structure, value))
+    return tuple(map(structure, value))
+
+
+@lru_cache(maxsize=None)
+def _fields(cls: type) -> Tuple[str, ...]:
+    """Return the names of the public slots of a class and its bases."""
+    return tuple(
+        name
+        for base in reversed(cls.__mro__)
+        for name in getattr(base, "__slots__", ())
+        if not name.startswith("_")
+    )
 
 
 @lru_cache(maxsize=None)
@@ -38,3 +275,11 @@ def constant(name: str) -> object:
     ```
     """
     return type(name, tuple(), dict())()
+
+
+# Marks the keys of mutable values in structures.
+MUTABLE = constant("mutable")
+
+
+# Marks the keys of values compared by identity.
+IDENTICAL = constant("identical")
@@ -0,0 +1,286 @@
+"""Lazily built `Function` expressions.
+
+The operators of a lazy expression only record themselves, in a tree of
+`Lazy` nodes, rather than building `Function` nodes. The expression is
+built and optimised once, on first call or by an explicit `build()`, and
+the result is cached by the structure of the expression. Pipelines put
+together afresh for each request, from the same functions and arguments,
+are therefore built only once, and reused from the cache thereafter.
+
+Built expressions are interned: `intern` returns the same optimised
+instance for all structurally equal expressions, lazy or not, so each
+distinct pipeline is held in memory once.
+
+Consecutive compositions are recorded as a single flat `pipe`, so long
+chains neither nest nor recurse.
+
+For example:
+```
+def handle(request):
+    pipeline = lazy(parse) | validate | F(store) << ("requests",)
+    return pipeline(request.body)  # Built on the first request only.
+```
+"""
+from collections import OrderedDict
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from fungebra.helpers import CacheInfo, Structural, cache_key
+from fungebra.model import EXTENSIONS, Args, Function
+from fungebra.optimize import optimize
+
+
+MAXSIZE = 1024
+
+
+# Operators replayed as attributes, rather than called, when built.
+PROPERTIES = frozenset(("map", "lmap", "collect", "expand"))
+
+
+_CACHE: "OrderedDict[Hashable, Function]" = OrderedDict()
+_STATISTICS = {"hits": 0, "misses": 0}
+_LOCK = threading.Lock()
+
+
+class Lazy(Structural):
+    """Expression recorded by the operator syntax, built on first call.
+
+    `op` is the name of the `Function` operator or method to build the
+    node with, applied to the first of `args` with the rest of `args` and
+    `kwargs`, or `"wrap"` or `"pipe"` for a wrapped callable and a
+    composition of stages in call order respectively.
+    """
+
+    __slots__ = ("op", "args", "kwargs", "_built")
+
+    def __init__(
+        self, op: str, args: Tuple, kwargs: Optional[Dict[str, Any]] = None
+    ):
+        self.op = op
+        self.args = args
+        self.kwargs = kwargs or {}
+        self._built: Optional[Function] = None
+
+    def __call__(self, *args, **kwargs):
+        built = self._built
+        if built is None:
+            built = self.build()
+        return built(*args, **kwargs)
+
+    def build(self) -> Function:
+        """Build and optimise the expression, reusing a cached build."""
+        built = self._built
+        if built is None:
+            key = cache_key(self)
+            built = _lookup(key)
+            if built is None:
+                built = intern(self.materialise())
+                _store(key, built)
+            self._built = built
+        return built
+
+    def materialise(self) -> Function:
+        """Build the recorded expression, without optimising it."""
+        if self._built is not None:
+            return self._built
+        args = [_materialise(arg) for arg in self.args]
+        kwargs = {key: _materialise(arg) for key, arg in self.kwargs.items()}
+        if self.op == "wrap":
+            (func,) = args
+            return func if isinstance(func, Function) else Function.wrap(func)
+        if self.op == "pipe":
+            *stages, last = args
+            return Function.wrap(last).compose(*reversed(stages))
+        target, *rest = args
+        if not isinstance(target, Function):
+            target = Function.wrap(target)
+        if self.op in PROPERTIES:
+            return getattr(target, self.op)
+        return getattr(target, self.op)(*rest, **kwargs)
+
+    def __repr__(self):
+        return f"Lazy({self.op!r}, {self.args!r}, {self.kwargs!r})"
+
+    def __reduce__(self):
+        return Lazy, (self.op, self.args, self.kwargs)
+
+    def _record(self, op: str, *args) -> "Lazy":
+        return Lazy(op, (self, *args))
+
+    def _pipe(self, *functions: Callable) -> "Lazy":
+        stages: List[Any] = []
+        for function in functions:
+            if isinstance(function, Lazy) and function.op == "pipe":
+                stages.extend(function.args)
+            else:
+                stages.append(function)
+        return Lazy("pipe", tuple(stages))
+
+    # Composition, recorded as flat pipes of stages in call order.
+
+    def compose(self, *others: Callable) -> "Lazy":
+        return self._pipe(*reversed(others), self)
+
+    def __add__(self, other: Callable) -> "Lazy":
+        return self._pipe(other, self)
+
+    def __radd__(self, other: Callable) -> "Lazy":
+        return self._pipe(self, other)
+
+    def pipe(self, other: Callable) -> "Lazy":
+        return self._pipe(self, other)
+
+    def __or__(self, other: Callable) -> "Lazy":
+        return self._pipe(self, other)
+
+    def __ror__(self, other: Any) -> Any:
+        if callable(other):
+            return self._pipe(other, self)
+        if isinstance(other, Args):
+            return self(*other.args, **other.kwargs)
+        return self(other)
+
+    def __pow__(self, other: Callable) -> "Lazy":
+        return self._pipe(self, other)
+
+    def __rpow__(self, other: Callable) -> "Lazy":
+        return self._pipe(other, self)
+
+    # Other operators and methods, replayed on the built Function.
+
+    def partial(self, *args, **kwargs) -> "Lazy":
+        return Lazy("partial", (self, *args), kwargs)
+
+    def rpartial(self, *args, **kwargs) -> "Lazy":
+        return Lazy("rpartial", (self, *args), kwargs)
+
+    def __lshift__(self, input_args: Any) -> "Lazy":
+        return Function._as_args(self.partial, input_args)
+
+    def __rshift__(self, input_args: Any) -> "Lazy":
+        return Function._as_args(self.rpartial, input_args)
+
+    @property
+    def map(self) -> "Lazy":
+        return self._record("map")
+
+    @property
+    def lmap(self) -> "Lazy":
+        return self._record("lmap")
+
+    @property
+    def collect(self) -> "Lazy":
+        return self._record("collect")
+
+    @property
+    def expand(self) -> "Lazy":
+        return self._record("expand")
+
+    def __neg__(self) -> "Lazy":
+        return self._record("map")
+
+    def __sub__(self, other: Callable) -> "Lazy":
+        return self._record("__sub__", other)
+
+    def __rsub__(self, other: Callable) -> "Lazy":
+        return self._record("__rsub__", other)
+
+    def filter(self, filter_func: Optional[Callable] = None) -> "Lazy":
+        if filter_func:
+            return self._record("filter", filter_func)
+        return self._record("filter")
+
+    def __lt__(self, other: Callable) -> "Lazy":
+        return self._record("filter", other)
+
+    def __le__(self, other: Callable) -> "Lazy":
+        return self._record("map")._record("filter", other)
+
+    def reduce(self, reduce_func: Optional[Callable] = None) -> "Lazy":
+        if reduce_func:
+            return self._record("reduce", reduce_func)
+        return self._record("reduce")
+
+    def __gt__(self, other: Callable) -> "Lazy":
+        return self._record("reduce", other)
+
+    def __ge__(self, other: Callable) -> "Lazy":
+        return self._record("map")._record("reduce", other)
+
+
+def lazy(func: Callable) -> Lazy:
+    """Return a lazily built expression of a function.
+
+    For example:
+    ```
+    total = lazy(int).map > operator.add
+    total(["1", "2"]) == 3
+    ```
+    """
+    if isinstance(func, Lazy):
+        return func
+    return Lazy("wrap", (func,))
+
+
+def intern(function: Callable) -> Function:
+    """Return the optimised instance of an expression shared by its equals.
+
+    The first expression interned with a given structure is optimised and
+    cached, and structurally equal expressions interned later return that
+    same instance, so identical pipelines built many times are held in
+    memory once. Expressions with mutable or unhashable arguments are
+    optimised without caching.
+
+    For example:
+    ```
+    intern(itemgetter("a") | less(3)) is intern(itemgetter("a") | less(3))
+    ```
+    """
+    key = cache_key(function)
+    built = _lookup(key)
+    if built is None:
+        if not isinstance(function, Function):
+            function = Function.wrap(function)
+        built = type(function).wrap(optimize(function))
+        _store(key, built)
+    return built
+
+
+def cache_info() -> CacheInfo:
+    """Report statistics for the cache of built and interned expressions."""
+    return CacheInfo(_STATISTICS["hits"], _STATISTICS["misses"], len(_CACHE))
+
+
+def cache_clear():
+    """Clear the cache of built and interned expressions and statistics."""
+    _CACHE.clear()
+    _STATISTICS["hits"] = _STATISTICS["misses"] = 0
+
+
+def _lookup(key: Optional[Hashable]) -> Optional[Function]:
+    built = None
+    if key is not None:
+        with _LOCK:
+            built = _CACHE.get(key)
+            # Keep recently used expressions, evicting the least recent.
+            if built is not None:
+                _CACHE.move_to_end(key)
+    _STATISTICS["misses" if built is None else "hits"] += 1
+    return built
+
+
+def _store(key: Optional[Hashable], built: Function):
+    if key is None:
+        return
+    with _LOCK:
+        _CACHE[key] = built
+        if len(_CACHE) > MAXSIZE:
+            _CACHE.popitem(last=False)
+
+
+def _materialise(value: Any) -> Any:
+    """Build the Function recorded by a lazy node, or return a value."""
+    return value.materialise() if isinstance(value, Lazy) else value
+
+
+EXTENSIONS.update(lazy=lazy, intern=intern)
@@ -1,34 +1,246 @@
 from collections.abc import Mapping
-from functools import partial, reduce, update_wrapper
-import operator
-from typing import Callable, Union
+from functools import WRAPPER_ASSIGNMENTS, partial, update_wrapper
+from typing import Any, Callable, Dict, Optional, Type, TypeVar, Union
+
+from fungebra.batching import Batched
+from fungebra.caching import AsyncMemoize, Cache, Memoize
+from fungebra.combinators import SafeFilter, SafeMap
+from fungebra.compiler import compile_function
+from fungebra.helpers import WrappedAttribute, lookup, reference, structure
+from fungebra.nodes import (
+    Collect,
+    Compose,
+    Expand,
+    Filter,
+    Map,
+    Reduce,
+    RPartial,
+    Wrapper,
+    _identity,
+    compose,
+    is_async,
+    unwrap,
+)
+from fungebra.optimize import optimize
+from fungebra.parallel import ParallelMap, TreeReduce
+from fungebra.profiling import instrument
+from fungebra.staging import Staged
+from fungebra.vectorize import vectorize
+
+
+def _check_synchronous(method: str, *functions: Callable):
+    if any(map(is_async, functions)):
+        raise TypeError(f"{method}() does not support coroutine functions")
+
+
+# Callables of modules depending on this one, used by `Function` methods
+# and registered by those modules as they are imported: `AsyncFunction`
+# by `fungebra.aio`, and `lazy` and `intern` by `fungebra.lazy`.
+EXTENSIONS: Dict[str, Any] = {}
+
+
+# Function or any of its subclasses, returned by their class methods.
+AnyFunction = TypeVar("AnyFunction", bound="Function")
+
+
+class Strategies(Wrapper):
+    """Methods of `Function` choosing how its expression is executed.
+
+    Each returns a copy of the Function, compiled, optimised, vectorised,
+    run in parallel, in batches or in stages, leaving the Function itself
+    untouched.
+    """
+
+    __slots__ = ()
+
+    def compile(self):
+        """Compile this expression into a single generated function."""
+        _check_synchronous("compile", self)
+        return Function.wrap(compile_function(self))
+
+    def optimize(self):
+        """Apply optimisation passes, such as fusing map and filter chains."""
+        return Function.wrap(optimize(self))
+
+    def vectorize(self):
+        """Apply elementwise stages to whole NumPy arrays at once.
+
+        See `fungebra.vectorize`; other inputs are processed as before.
+        """
+        return Function.wrap(vectorize(self))
 
+    @property
+    def lazy(self):
+        """Return a lazy copy, built on first call, see `fungebra.lazy`."""
+        return EXTENSIONS["lazy"](self)
+
+    def intern(self):
+        """Return the optimised instance shared by structurally equal copies.
+
+        See `fungebra.lazy.intern`.
+        """
+        return EXTENSIONS["intern"](self)
+
+    def instrument(self, profile):
+        """Return a copy recording per-stage statistics into a profile.
+
+        See `fungebra.profiling`; this Function itself is left untouched.
+        """
+        return Function.wrap(instrument(self, profile))
+
+    def safe_map(
+        self,
+        policy: str = "skip",
+        exception_classes: Any = Exception,
+        default: Any = None,
+        errors: Optional[list] = None,
+    ):
+        """Map, skipping or defaulting elements for which this raises.
+
+        Failures may be collected into `errors`, see
+        `combinators.SafeNode`.
+        """
+        return Function.wrap(
+            SafeMap(self.func, policy, exception_classes, default, errors)
+        )
+
+    def safe_filter(
+        self,
+        policy: str = "skip",
+        exception_classes: Any = Exception,
+        default: Any = None,
+        errors: Optional[list] = None,
+    ):
+        """Filter, dropping or keeping elements for which this raises.
+
+        Failures may be collected into `errors`, see
+        `combinators.SafeNode`.
+        """
+        return Function.wrap(
+            SafeFilter(self.func, policy, exception_classes, default, errors)
+        )
+
+    def pmap(self, workers: Optional[int] = None, chunksize: int = 1):
+        """Map over iterables in parallel on a shared process pool.
+
+        The function must be picklable, see `fungebra.parallel`.
+        """
+        _check_synchronous("pmap", self)
+        return Function.wrap(
+            ParallelMap(self.func, "process", workers, chunksize)
+        )
+
+    def tmap(self, workers: Optional[int] = None, chunksize: int = 1):
+        """Map over iterables in parallel on a shared thread pool."""
+        _check_synchronous("tmap", self)
+        return Function.wrap(
+            ParallelMap(self.func, "thread", workers, chunksize)
+        )
+
+    def batched(self, size: int):
+        """Map over an iterable, passing items through in chunks of `size`.
+
+        Stages marked with `functions.batchwise` receive whole chunks, see
+        `fungebra.batching`.
+        """
+        _check_synchronous("batched", self)
+        return Function.wrap(Batched(self.func, size))
+
+    def staged(
+        self, *workers: int, queue_size: int = 16, ordered: bool = True
+    ):
+        """Map over an iterable, running each stage on its own threads.
+
+        `workers` gives the number of threads of each stage, in call
+        order, or of every stage if a single number is given. Stages are
+        connected by bounded queues, see `fungebra.staging`.
+        """
+        _check_synchronous("staged", self)
+        return Function.wrap(
+            Staged(
+                self.func,
+                workers[0] if len(workers) == 1 else workers or 1,
+                queue_size,
+                ordered,
+            )
+        )
+
+    def treduce(
+        self,
+        reduce_func: Optional[Callable] = None,
+        commutative: bool = False,
+        kind: str = "thread",
+        workers: Optional[int] = None,
+        chunksize: int = 1024,
+    ):
+        """Reduce with an associative function in parallel chunks.
+
+        As `reduce`, but chunks of items are reduced on a shared pool and
+        combined in a tree, see `fungebra.parallel.TreeReduce`.
+        """
+        _check_synchronous("treduce", self, *filter(None, [reduce_func]))
+        if reduce_func:
+            node = TreeReduce(
+                unwrap(reduce_func), commutative, kind, workers, chunksize
+            )
+            return Function.wrap(compose(node, self))
+        return Function.wrap(
+            TreeReduce(self.func, commutative, kind, workers, chunksize)
+        )
 
-def compose(*functions: Callable) -> Callable:
-    """Composes arbitrary number of functions."""
 
-    def _compose_pair(outer: Callable, inner: Callable) -> Callable:
-        return lambda *args, **kwargs: outer(inner(*args, **kwargs))
+class Function(Strategies):
+    """Function wrapper with composition methods."""
 
-    return reduce(_compose_pair, functions, lambda _: _)
+    __slots__ = ("__dict__", "__weakref__")
 
+    __doc__ = WrappedAttribute("__doc__", __doc__)
 
-class Function:
-    """Function wrapper with composition methods."""
+    # Nodes built by operators, replaced by asynchronous subclasses.
+    Compose: Callable[..., Callable] = Compose
+    Map: Callable[..., Callable] = Map
+    Filter: Callable[..., Callable] = Filter
+    Reduce: Callable[..., Callable] = Reduce
 
     def __init__(self, func: Union[Callable, "Function"]):
-        self._func: Callable = func.func if isinstance(func, Function) else func
+        self._func = func.func if isinstance(func, Function) else func
         update_wrapper(self, func)
 
-    @property
-    def func(self):
-        return self._func
-
-    def __call__(self, *args, **kwargs):
-        return self.func(*args, **kwargs)
-
-    def __hash__(self):
-        return hash(self.func)
+    @classmethod
+    def wrap(cls: Type[AnyFunction], func: Callable) -> AnyFunction:
+        """Wrap a callable without eagerly copying its metadata.
+
+        Used for the Functions built internally by operators and
+        combinators. Wrapper metadata such as `__name__` is looked up on
+        the wrapped callable on demand instead.
+        """
+        function = object.__new__(cls)
+        function._func = unwrap(func)
+        return function
+
+    def __getattr__(self, attr: str) -> Any:
+        if attr == "_func":
+            raise AttributeError(attr)
+        if attr == "__wrapped__":
+            return self._func
+        if attr in WRAPPER_ASSIGNMENTS:
+            return getattr(self._func, attr)
+        try:
+            return vars(self._func)[attr]
+        except (KeyError, TypeError):
+            raise AttributeError(
+                f"{type(self).__name__!r} object has no attribute {attr!r}"
+            ) from None
+
+    def _structure(self):
+        return structure(self._func)
+
+    def __reduce__(self):
+        metadata = vars(self)
+        module, name = map(metadata.get, ("__module__", "__qualname__"))
+        if lookup(module, name) is self:
+            return name
+        return type(self).wrap, (reference(self._func),), metadata or None
 
     def __repr__(self):
         return f"Function({repr(self.func)})"
@@ -38,30 +250,30 @@ class Function:
 
     @property
     def collect(self):
-        return Function(lambda *args: self.func(args))
+        return type(self).wrap(Collect(self._func))
 
     @property
     def expand(self):
-        return Function(lambda args: self.func(*args))
+        return type(self).wrap(Expand(self._func))
 
     def compose(self, *others):
-        return Function(compose(self, *others))
+        return self._expression(self, *others)
 
     def __add__(self, func):
         return self.compose(func)
 
     def __radd__(self, func):
-        return Function(func).compose(self)
+        return self._expression(func, self)
 
     def pipe(self, func):
-        return Function(func).compose(self)
+        return self._expression(func, self)
 
     def __or__(self, other):
         return self.pipe(other)
 
     def __ror__(self, other):
         if callable(other):
-            return Function(other).pipe(self)
+            return self._expression(self, other)
         if isinstance(other, Args):
             return self(*other.args, **other.kwargs)
         return self(other)
@@ -70,13 +282,17 @@ class Function:
         return self.pipe(other)
 
     def __rpow__(self, other):
-        return Function(other).pipe(self)
+        return self._expression(self, other)
 
     def partial(self, *args, **kwargs):
-        return Function(partial(self.func, *args, **kwargs))
+        if not args and not kwargs:
+            return self
+        return type(self).wrap(partial(self._func, *args, **kwargs))
 
     def rpartial(self, *args, **kwargs):
-        return Function(lambda *a, **kw: self.func(*a, *args, **kw, **kwargs))
+        if not args and not kwargs:
+            return self
+        return type(self).wrap(RPartial(self._func, *args, **kwargs))
 
     def __lshift__(self, input_args):
         return Function._as_args(self.partial, input_args)
@@ -84,30 +300,58 @@ class Function:
     def __rshift__(self, input_args):
         return Function._as_args(self.rpartial, input_args)
 
+    def memoize(
+        self,
+        maxsize: Optional[int] = 128,
+        ttl: Optional[float] = None,
+        key: Optional[Callable] = None,
+        policy: str = "lru",
+        thread_safe: bool = False,
+    ):
+        """Cache results by a key of the arguments, see `functions.memoize`.
+
+        The copy reports and clears its cache with `cache_info()` and
+        `cache_clear()`. Results of coroutine functions are cached once
+        awaited, and the copy is asynchronous.
+        """
+        cache = Cache(maxsize, ttl, policy, thread_safe)
+        node_type = AsyncMemoize if is_async(self._func) else Memoize
+        node: Callable = node_type(self._func, cache, key)
+        memoized = self._promote(node).wrap(node)
+        setattr(memoized, "cache_info", cache.info)
+        setattr(memoized, "cache_clear", cache.clear)
+        return memoized
+
     def decorate(self, decorator):
         return Function(decorator(self))
 
     @property
     def map(self):
-        return Function(map).partial(self)
+        cls = self._promote(self)
+        return cls.wrap(cls.Map(self._func))
 
     @property
     def lmap(self):
-        return self.map.pipe(list)
+        cls = self._promote(self)
+        return cls.wrap(cls.Compose(list, cls.Map(self._func)))
 
     def __neg__(self):
         return self.map
 
     def __sub__(self, other):
-        return self.pipe(Function(other).map)
+        cls = self._promote(self, other)
+        return cls.wrap(cls.Compose(cls.Map(other), self))
 
     def __rsub__(self, other):
-        return Function(other).pipe(self.map)
+        cls = self._promote(self, other)
+        return cls.wrap(cls.Compose(cls.Map(self._func), other))
 
-    def filter(self, filter_func: Callable = None):
+    def filter(self, filter_func: Optional[Callable] = None):
         if filter_func:
-            return self | Function(filter).partial(filter_func)
-        return Function(partial(filter, self))
+            cls = self._promote(self, filter_func)
+            return cls.wrap(cls.Compose(cls.Filter(filter_func), self))
+        cls = self._promote(self)
+        return cls.wrap(cls.Filter(self._func))
 
     def __lt__(self, other):
         return self.filter(other)
@@ -115,10 +359,12 @@ class Function:
     def __le__(self, other):
         return self.map.filter(other)
 
-    def reduce(self, reduce_func: Callable = None):
+    def reduce(self, reduce_func: Optional[Callable] = None):
         if reduce_func:
-            return self | Function(reduce).partial(reduce_func)
-        return Function(partial(reduce, self))
+            cls = self._promote(self, reduce_func)
+            return cls.wrap(cls.Compose(cls.Reduce(reduce_func), self))
+        cls = self._promote(self)
+        return cls.wrap(cls.Reduce(self._func))
 
     def __gt__(self, other):
         return self.reduce(other)
@@ -126,6 +372,21 @@ class Function:
     def __ge__(self, other):
         return self.map.reduce(other)
 
+    @classmethod
+    def _expression(cls, *functions: Callable) -> "Function":
+        function_type = cls._promote(*functions)
+        return function_type.wrap(function_type.Compose(*functions))
+
+    @classmethod
+    def _promote(cls, *functions: Callable) -> Type["Function"]:
+        """Return the Function class for an expression of `functions`.
+
+        Expressions involving coroutine functions are asynchronous.
+        """
+        if cls.asynchronous or not any(map(is_async, functions)):
+            return cls
+        return EXTENSIONS["AsyncFunction"]
+
     @staticmethod
     def _as_args(function, input_args):
         if isinstance(input_args, Args):
@@ -138,15 +399,17 @@ class Function:
 class Args:
     """Dataclass representing arguments passed to a function."""
 
+    __slots__ = ("args", "kwargs")
+
     def __init__(self, *args, **kwargs):
         self.args = args
         self.kwargs = kwargs
 
 
-identity: Callable = Function(lambda _: _)
+identity: Function = Function(_identity)
 
 
 @Function
 def pipeline(*funcs):
     """Construct a pipeline from passed functions."""
-    return reduce(operator.add, map(Function, reversed(funcs)), identity)
+    return Function.wrap(compose(*reversed(funcs)))
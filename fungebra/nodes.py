@@ -0,0 +1,310 @@
+"""Nodes of `Function` expressions, and functions inspecting them.
+
+Operators and combinators of `Function` build trees of these nodes, which
+are plain slotted callables, compared and hashed by structure. Nodes hold
+the functions they are given unwrapped, so calling an expression does not
+pass through a `Function` per stage.
+"""
+from functools import partial, reduce
+from inspect import iscoroutinefunction
+import operator
+from types import FunctionType, MethodType
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+from fungebra.helpers import Structural, reference
+
+
+def compose(*functions: Callable) -> Callable:
+    """Composes arbitrary number of functions."""
+    return Compose(*functions)
+
+
+# Types whose instances are safe to share between calls.
+IMMUTABLE_TYPES = frozenset(
+    (bool, bytes, complex, float, frozenset, int, str, type(None))
+)
+
+
+PURE_TYPES = frozenset((operator.attrgetter, operator.itemgetter))
+
+
+PURE_FUNCTIONS = frozenset(
+    [
+        *(
+            getattr(operator, name)
+            for name in (
+                "abs add and_ concat contains countOf eq floordiv ge gt "
+                "index indexOf inv invert is_ is_not le length_hint lshift "
+                "lt mod mul ne neg not_ or_ pos pow rshift sub truediv "
+                "truth xor"
+            ).split()
+        ),
+        abs,
+        bool,
+        bytes,
+        chr,
+        float,
+        frozenset,
+        hash,
+        int,
+        len,
+        ord,
+        repr,
+        round,
+        str,
+    ]
+)
+
+
+class Constantly(Structural):
+    """Callable returning a constant regardless of the arguments."""
+
+    __slots__ = ("const",)
+
+    def __init__(self, const: Any):
+        self.const = const
+
+    def __call__(self, *_a, **_kw):
+        return self.const
+
+    def __repr__(self):
+        return f"Constantly({self.const!r})"
+
+    def __reduce__(self):
+        return Constantly, (self.const,)
+
+
+class Compose(Structural):
+    """Flat composition of functions.
+
+    Nested compositions are spliced into a single tuple of stages, held in
+    call order, so that calling the composition runs one loop rather than
+    recursing through a frame per stage.
+    """
+
+    __slots__ = ("stages", "_first", "_rest")
+
+    stages: Tuple[Callable, ...]
+
+    def __init__(self, *functions: Callable):
+        stages: List[Callable] = []
+        for function in map(unwrap, reversed(functions)):
+            if isinstance(function, Compose):
+                for stage in function.stages:
+                    _add_stage(stages, stage)
+            else:
+                _add_stage(stages, function)
+        self.stages = tuple(stages)
+        self._first = stages[0] if stages else _identity
+        self._rest = tuple(stages[1:])
+
+    def __call__(self, *args, **kwargs):
+        result = self._first(*args, **kwargs)
+        for stage in self._rest:
+            result = stage(result)
+        return result
+
+    def __repr__(self):
+        return f"Compose({', '.join(map(repr, reversed(self.stages)))})"
+
+    def __reduce__(self):
+        return Compose, tuple(map(reference, reversed(self.stages)))
+
+
+def _add_stage(stages: List[Callable], function: Callable):
+    """Append a stage to a composition, simplifying it where possible.
+
+    Identity stages are dropped, and a pure stage following an immutable
+    constant is evaluated once, if it returns an immutable value without
+    raising. Mutable constants may change before the composition is called.
+    """
+    if function is _identity:
+        return
+    if (
+        stages
+        and isinstance(stages[-1], Constantly)
+        and type(stages[-1].const) in IMMUTABLE_TYPES
+        and is_pure(function)
+    ):
+        try:
+            value = function(stages[-1].const)
+        except Exception:  # pylint: disable=broad-except
+            pass
+        else:
+            if type(value) in IMMUTABLE_TYPES:
+                stages[-1] = Constantly(value)
+                return
+    stages.append(function)
+
+
+class RPartial(Structural):
+    """Right-handed partial application of a function."""
+
+    __slots__ = ("func", "args", "keywords")
+
+    func: Callable
+    args: tuple
+    keywords: Dict[str, Any]
+
+    def __init__(self, func: Callable, *args, **kwargs):
+        func = unwrap(func)
+        if isinstance(func, RPartial) and not kwargs.keys() & func.keywords:
+            # Splice stacked right-handed partials into one.
+            args = (*args, *func.args)
+            kwargs = {**kwargs, **func.keywords}
+            func = func.func
+        self.func = func
+        self.args = args
+        self.keywords = kwargs
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, *self.args, **kwargs, **self.keywords)
+
+    def __repr__(self):
+        return _node_repr(self, self.func, *self.args, **self.keywords)
+
+    def __reduce__(self):
+        return (
+            partial(RPartial, **self.keywords),
+            (reference(self.func), *self.args),
+        )
+
+
+class Node(Structural):
+    """Base class for nodes wrapping a single function."""
+
+    __slots__ = ("func",)
+
+    def __init__(self, func: Callable):
+        self.func = unwrap(func)
+
+    def __repr__(self):
+        return _node_repr(self, self.func)
+
+    def __reduce__(self):
+        return type(self), (reference(self.func),)
+
+
+class Collect(Node):
+    """Collect multiple arguments into a single tuple before passing."""
+
+    __slots__ = ()
+
+    def __call__(self, *args):
+        return self.func(args)
+
+
+class Expand(Node):
+    """Expand a single argument into positional arguments before passing."""
+
+    __slots__ = ()
+
+    def __call__(self, args):
+        return self.func(*args)
+
+
+class Map(Node):
+    """Lazily map a function over one or more iterables."""
+
+    __slots__ = ()
+
+    def __call__(self, *iterables):
+        return map(self.func, *iterables)
+
+
+class Filter(Node):
+    """Lazily filter an iterable on a predicate."""
+
+    __slots__ = ()
+
+    def __call__(self, iterable):
+        return filter(self.func, iterable)
+
+
+class Reduce(Node):
+    """Left-fold an iterable with a binary function."""
+
+    __slots__ = ()
+
+    def __call__(self, iterable, *initial):
+        return reduce(self.func, iterable, *initial)
+
+
+class Wrapper(Structural):
+    """Base class of callables wrapping a function, such as `Function`.
+
+    Nodes hold the wrapped functions rather than their wrappers, see
+    `unwrap`.
+    """
+
+    __slots__ = ("_func",)
+
+    _func: Callable
+
+    asynchronous = False
+
+    @property
+    def func(self) -> Callable:
+        return self._func
+
+    def __call__(self, *args, **kwargs):
+        return self._func(*args, **kwargs)
+
+
+def unwrap(func: Callable) -> Callable:
+    """Return the callable wrapped by a `Function`, or the callable itself."""
+    return func.func if isinstance(func, Wrapper) else func
+
+
+# Node types returning awaitables, registered by `fungebra.aio` and
+# `fungebra.caching`.
+ASYNC_NODES: Set[type] = set()
+
+
+def is_async(func: Callable) -> bool:
+    """Return whether calling a function returns an awaitable.
+
+    This is true of coroutine functions, partial applications of them and
+    asynchronous `Function` nodes.
+    """
+    if isinstance(func, Wrapper):
+        if func.asynchronous:
+            return True
+        func = func.func
+    if type(func) in ASYNC_NODES:
+        return True
+    if isinstance(func, FunctionType):
+        return iscoroutinefunction(func)
+    if isinstance(func, partial):
+        return is_async(func.func)
+    if isinstance(func, MethodType):
+        return is_async(func.__func__)
+    return False
+
+
+def is_pure(func: Callable) -> bool:
+    """Return whether a function is known to have no side effects.
+
+    This is true of the non-mutating `operator` functions, builtins such as
+    `len` and `str`, `operator.itemgetter` and `operator.attrgetter`, and
+    compositions and partial applications of these.
+    """
+    if type(func) in PURE_TYPES:
+        return True
+    if isinstance(func, (partial, RPartial)):
+        return is_pure(func.func)
+    if isinstance(func, Compose):
+        return all(map(is_pure, func.stages))
+    try:
+        return func in PURE_FUNCTIONS
+    except TypeError:
+        return False
+
+
+def _node_repr(node, *args, **kwargs) -> str:
+    arguments = [*map(repr, args), *(f"{k}={v!r}" for k, v in kwargs.items())]
+    return f"{type(node).__name__}({', '.join(arguments)})"
+
+
+def _identity(value):
+    return value
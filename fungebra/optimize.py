@@ -0,0 +1,317 @@
+"""Optimisation passes over the nodes of `Function` expressions."""
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from fungebra.batching import Batched, Batchwise
+from fungebra.compiler import compile_function, segments
+from fungebra.combinators import (
+    Duxt,
+    Iffy,
+    Juxt,
+    Not,
+    SafeFilter,
+    SafeMap,
+    Shared,
+    Suppress,
+)
+from fungebra.helpers import equality_key
+from fungebra.nodes import (
+    Collect,
+    Compose,
+    Expand,
+    Filter,
+    Map,
+    Reduce,
+    RPartial,
+    _identity,
+    unwrap,
+)
+from fungebra.parallel import (
+    ParallelDuxt,
+    ParallelJuxt,
+    ParallelMap,
+    TreeReduce,
+)
+from fungebra.staging import Staged
+
+
+Transform = Callable[[Callable], Callable]
+
+
+# Nodes returning one-shot iterators, which the first branch applied to
+# them would exhaust, so that they are never shared as the end of a prefix.
+ITERATOR_NODES = (
+    Batched,
+    Duxt,
+    Filter,
+    Juxt,
+    Map,
+    ParallelMap,
+    SafeFilter,
+    SafeMap,
+    Shared,
+    Staged,
+)
+
+
+def optimize(function: Callable) -> Callable:
+    """Apply all optimisation passes to an expression."""
+    return fuse(share(function))
+
+
+def share(function: Callable) -> Callable:
+    """Evaluate prefixes shared by the branches of `juxt` or `duxt` once.
+
+    Branches beginning with structurally equal stages are grouped, and the
+    stages common to each group are evaluated once per call, with the rest
+    of each branch applied to their result. Prefixes do not end in stages
+    returning one-shot iterators, see `ITERATOR_NODES`.
+
+    For example:
+    ```
+    share(juxt(itemgetter("x") | int | neg, itemgetter("x") | int | abs))
+    # Shared((Compose(int, itemgetter('x')),), ((neg, 0), (abs, 0)), None)
+    ```
+    """
+    function = unwrap(function)
+    if not isinstance(function, (Juxt, Duxt)):
+        return rebuild(function, share)
+    if isinstance(function, Duxt):
+        names: Optional[Tuple[str, ...]] = tuple(function.functions)
+        functions: Sequence[Callable] = tuple(function.functions.values())
+    else:
+        names, functions = None, function.functions
+    branches = [unwrap(share(branch)) for branch in functions]
+    prefixes, shared = _share_prefixes(branches)
+    if prefixes:
+        return Shared(prefixes, shared, names)
+    if names is None:
+        return Juxt(*branches)
+    return Duxt(**dict(zip(names, branches)))
+
+
+def _share_prefixes(branches: List[Callable]):
+    """Split branches into shared prefixes and the remaining stages."""
+    stages = [_stages(branch) for branch in branches]
+    keys = [[equality_key(stage) for stage in each] for each in stages]
+    groups: List[List[int]] = []
+    for position, key in enumerate(keys):
+        for group in groups:
+            if keys[group[0]][0] == key[0]:
+                group.append(position)
+                break
+        else:
+            groups.append([position])
+    prefixes: List[Callable] = []
+    shared: List[Tuple[Callable, Optional[int]]] = [
+        (branch, None) for branch in branches
+    ]
+    for group in groups:
+        if len(group) < 2:
+            continue
+        length = _common_length([keys[position] for position in group])
+        while length and isinstance(
+            stages[group[0]][length - 1], ITERATOR_NODES
+        ):
+            length -= 1
+        if not length:
+            continue
+        for position in group:
+            shared[position] = (
+                _compose(stages[position][length:]),
+                len(prefixes),
+            )
+        prefixes.append(_compose(stages[group[0]][:length]))
+    return tuple(prefixes), tuple(shared)
+
+
+def _stages(function: Callable) -> Tuple[Callable, ...]:
+    # A composition of no stages is the identity, with nothing to share.
+    if isinstance(function, Compose):
+        return function.stages or (_identity,)
+    return (function,)
+
+
+def _common_length(keys: List[list]) -> int:
+    length = 0
+    for column in zip(*keys):
+        if any(key != column[0] for key in column[1:]):
+            break
+        length += 1
+    return length
+
+
+def _compose(stages: Sequence[Callable]) -> Callable:
+    if len(stages) == 1:
+        return stages[0]
+    return Compose(*reversed(stages))
+
+
+def fuse(function: Callable) -> Callable:
+    """Fuse runs of map, filter and reduce stages into single loops.
+
+    Adjacent maps are applied as one composition per element, consecutive
+    filters are checked as one predicate, and a trailing reduce folds the
+    elements as they are produced, so each element passes through a single
+    generated loop instead of a stack of iterators.
+
+    For example:
+    ```
+    fuse((-F(increment) < even) > operator.add)
+    # Compiled(Compose(Reduce(add), Filter(even), Map(increment)))
+    ```
+    """
+    function = unwrap(function)
+    if not isinstance(function, Compose):
+        return rebuild(function, fuse)
+    stages: List[Callable] = []
+    for stage, run in segments(function.stages):
+        if isinstance(stage, Reduce) and run or len(run) > 1:
+            steps = [*run, stage] if isinstance(stage, Reduce) else run
+            stages.append(compile_function(Compose(*reversed(steps))))
+        else:
+            stages.append(rebuild(stage, fuse))
+    return Compose(*reversed(stages))
+
+
+def rebuild(node: Callable, transform: Transform) -> Callable:
+    """Rebuild a node with `transform` applied to the functions it wraps.
+
+    Callables which are not nodes, or which wrap no functions, are returned
+    unchanged.
+    """
+    node = unwrap(node)
+    rebuilder = REBUILDERS.get(type(node))
+    if rebuilder is None:
+        return node
+    return rebuilder(node, transform)
+
+
+def _rebuild_compose(node: Compose, transform: Transform):
+    return Compose(*reversed([transform(stage) for stage in node.stages]))
+
+
+def _rebuild_node(node, transform: Transform):
+    return type(node)(transform(node.func))
+
+
+def _rebuild_partial(node, transform: Transform):
+    return type(node)(transform(node.func), *node.args, **node.keywords)
+
+
+def _rebuild_not(node: Not, transform: Transform):
+    return Not(transform(node.function))
+
+
+def _rebuild_iffy(node: Iffy, transform: Transform):
+    return Iffy(*map(transform, (node.predicate, node.func, node.default)))
+
+
+def _rebuild_juxt(node: Juxt, transform: Transform):
+    return Juxt(*map(transform, node.functions))
+
+
+def _rebuild_duxt(node: Duxt, transform: Transform):
+    return Duxt(
+        **{name: transform(fn) for name, fn in node.functions.items()}
+    )
+
+
+def _rebuild_shared(node: Shared, transform: Transform):
+    return Shared(
+        tuple(map(transform, node.prefixes)),
+        tuple((transform(fn), index) for fn, index in node.branches),
+        node.names,
+    )
+
+
+def _rebuild_suppress(node: Suppress, transform: Transform):
+    return Suppress(
+        transform(node.function), node.exception_classes, node.default
+    )
+
+
+def _rebuild_safe(node, transform: Transform):
+    return type(node)(
+        transform(node.func),
+        node.policy,
+        node.exception_classes,
+        node.default,
+        node.errors,
+    )
+
+
+def _rebuild_parallel_map(node: ParallelMap, transform: Transform):
+    return ParallelMap(
+        transform(node.func), node.kind, node.workers, node.chunksize
+    )
+
+
+def _rebuild_parallel_juxt(node: ParallelJuxt, transform: Transform):
+    return ParallelJuxt(
+        *map(transform, node.functions), kind=node.kind, workers=node.workers
+    )
+
+
+def _rebuild_parallel_duxt(node: ParallelDuxt, transform: Transform):
+    functions = {name: transform(fn) for name, fn in node.functions.items()}
+    return ParallelDuxt(node.kind, node.workers, **functions)
+
+
+def _rebuild_tree_reduce(node: TreeReduce, transform: Transform):
+    return TreeReduce(
+        transform(node.func),
+        node.commutative,
+        node.kind,
+        node.workers,
+        node.chunksize,
+    )
+
+
+def _rebuild_batched(node: Batched, transform: Transform):
+    return Batched(transform(node.func), node.size)
+
+
+def _rebuild_staged(node: Staged, transform: Transform):
+    # Stages are transformed one by one, keeping one per worker count.
+    stages = node.func.stages if isinstance(node.func, Compose) else None
+    if stages is None:
+        return Staged(
+            transform(node.func), node.workers, node.queue_size, node.ordered
+        )
+    return Staged(
+        Compose(*reversed([transform(stage) for stage in stages])),
+        node.workers,
+        node.queue_size,
+        node.ordered,
+    )
+
+
+# Stateful nodes, such as memoized functions, are deliberately absent, so
+# that transformed expressions share their state rather than a copy. The
+# nodes of modules depending on this one are registered by them.
+REBUILDERS: Dict[type, Callable[[Any, Transform], Callable]] = {
+    Compose: _rebuild_compose,
+    Collect: _rebuild_node,
+    Expand: _rebuild_node,
+    Filter: _rebuild_node,
+    Map: _rebuild_node,
+    Reduce: _rebuild_node,
+    partial: _rebuild_partial,
+    RPartial: _rebuild_partial,
+    Not: _rebuild_not,
+    Iffy: _rebuild_iffy,
+    Juxt: _rebuild_juxt,
+    Duxt: _rebuild_duxt,
+    Shared: _rebuild_shared,
+    Suppress: _rebuild_suppress,
+    SafeMap: _rebuild_safe,
+    SafeFilter: _rebuild_safe,
+    ParallelMap: _rebuild_parallel_map,
+    ParallelJuxt: _rebuild_parallel_juxt,
+    ParallelDuxt: _rebuild_parallel_duxt,
+    TreeReduce: _rebuild_tree_reduce,
+    Batchwise: _rebuild_node,
+    Batched: _rebuild_batched,
+    Staged: _rebuild_staged,
+}
@@ -0,0 +1,352 @@
+"""Parallel execution of `Function` stages on thread and process pools.
+
+Work sent to a process pool must be pickled. `Function` expressions are
+trees of small nodes, each reducing to its constructor and the functions
+it wraps, so an expression pickles whenever the callables at its leaves
+do: module-level functions, builtins and `fungebra` combinators all do,
+while lambdas and locally defined closures do not.
+
+Parallel stages called from within a task already running on a pool run
+inline instead, as the task would otherwise hold a worker of the shared
+pool while waiting for work queued behind it on the same pool.
+"""
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    FIRST_EXCEPTION,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from functools import lru_cache, partial, reduce
+from itertools import islice
+import os
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from fungebra.helpers import Structural, reference
+
+
+EXECUTORS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+_WORKER = threading.local()
+
+
+@lru_cache(maxsize=None)
+def executor(kind: str = "thread", workers: Optional[int] = None) -> Executor:
+    """Return a shared executor of the given kind and number of workers.
+
+    Executors are created on first use and reused for the lifetime of the
+    interpreter, so repeated calls of parallel stages do not pay for
+    starting new workers.
+    """
+    return EXECUTORS[_check_kind(kind)](workers)
+
+
+class ParallelMap(Structural):
+    """Map a function over iterables using a pool of workers.
+
+    Items are submitted in chunks, with at most a few chunks per worker in
+    flight at once, so results are yielded in order and unbounded inputs
+    are consumed lazily.
+    """
+
+    __slots__ = ("func", "kind", "workers", "chunksize")
+
+    def __init__(
+        self,
+        func: Callable,
+        kind: str = "thread",
+        workers: Optional[int] = None,
+        chunksize: int = 1,
+    ):
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        self.func = func
+        self.kind = _check_kind(kind)
+        self.workers = workers
+        self.chunksize = chunksize
+
+    def __call__(self, *iterables: Iterable) -> Iterator:
+        if in_worker():
+            return map(self.func, *iterables)
+        return _ordered_map(
+            executor(self.kind, self.workers),
+            self.func,
+            zip(*iterables),
+            self.chunksize,
+            window=2 * (self.workers or os.cpu_count() or 1),
+        )
+
+    def __repr__(self):
+        return (
+            f"ParallelMap({self.func!r}, kind={self.kind!r}, "
+            f"workers={self.workers!r}, chunksize={self.chunksize!r})"
+        )
+
+    def __reduce__(self):
+        return (
+            ParallelMap,
+            (reference(self.func), self.kind, self.workers, self.chunksize),
+        )
+
+
+class ParallelJuxt(Structural):
+    """Call several functions with the same argument using a pool of workers.
+
+    Results are returned in order once every branch has finished. If any
+    branch raises, branches which have not yet started are cancelled and
+    the exception is raised.
+    """
+
+    __slots__ = ("functions", "kind", "workers")
+
+    def __init__(
+        self,
+        *functions: Callable,
+        kind: str = "thread",
+        workers: Optional[int] = None,
+    ):
+        self.functions = functions
+        self.kind = _check_kind(kind)
+        self.workers = workers
+
+    def __call__(self, arg) -> List:
+        if in_worker():
+            return [function(arg) for function in self.functions]
+        return _gather(executor(self.kind, self.workers), self.functions, arg)
+
+    def __repr__(self):
+        return (
+            f"ParallelJuxt({', '.join(map(repr, self.functions))}, "
+            f"kind={self.kind!r}, workers={self.workers!r})"
+        )
+
+    def __reduce__(self):
+        return (
+            partial(ParallelJuxt, kind=self.kind, workers=self.workers),
+            tuple(map(reference, self.functions)),
+        )
+
+
+class ParallelDuxt(Structural):
+    """Call several named functions with the same argument using a pool.
+
+    Named results are returned in order as key-value pairs, as for
+    `ParallelJuxt`.
+    """
+
+    __slots__ = ("functions", "kind", "workers")
+
+    def __init__(
+        self,
+        kind: str = "thread",
+        workers: Optional[int] = None,
+        **named_functions: Callable,
+    ):
+        self.functions = named_functions
+        self.kind = _check_kind(kind)
+        self.workers = workers
+
+    def __call__(self, arg) -> List[Tuple[str, Any]]:
+        if in_worker():
+            return [(name, fn(arg)) for name, fn in self.functions.items()]
+        results = _gather(
+            executor(self.kind, self.workers), self.functions.values(), arg
+        )
+        return list(zip(self.functions, results))
+
+    def __repr__(self):
+        arguments = (f"{name}={fn!r}" for name, fn in self.functions.items())
+        return (
+            f"ParallelDuxt({', '.join(arguments)}, "
+            f"kind={self.kind!r}, workers={self.workers!r})"
+        )
+
+    def __reduce__(self):
+        functions = {
+            name: reference(fn) for name, fn in self.functions.items()
+        }
+        return partial(ParallelDuxt, self.kind, self.workers, **functions), ()
+
+
+class TreeReduce(Structural):
+    """Reduce an iterable with an associative function using a pool.
+
+    Chunks of items are reduced in parallel, and their partial results are
+    combined pairwise in a tree, level by level. Unless the function is
+    also commutative, partial results are combined in their original
+    order; otherwise they are combined in the order they complete.
+
+    For pure Python functions, only a process pool avoids contention on
+    the global interpreter lock.
+    """
+
+    __slots__ = ("func", "commutative", "kind", "workers", "chunksize")
+
+    def __init__(
+        self,
+        func: Callable,
+        commutative: bool = False,
+        kind: str = "thread",
+        workers: Optional[int] = None,
+        chunksize: int = 1024,
+    ):
+        if chunksize < 1:
+            raise ValueError("chunksize must be at least 1")
+        self.func = func
+        self.commutative = commutative
+        self.kind = _check_kind(kind)
+        self.workers = workers
+        self.chunksize = chunksize
+
+    def __call__(self, iterable: Iterable, *initial):
+        if in_worker():
+            return reduce(self.func, iterable, *initial)
+        pool = executor(self.kind, self.workers)
+        window = 2 * (self.workers or os.cpu_count() or 1)
+        if self.commutative:
+            partials = _unordered_reduce(
+                pool, self.func, iterable, self.chunksize, window
+            )
+        else:
+            partials = list(
+                _ordered_map(
+                    pool,
+                    partial(reduce, self.func),
+                    ((chunk,) for chunk in chunks(iterable, self.chunksize)),
+                    1,
+                    window,
+                )
+            )
+        if not partials:
+            if initial:
+                return initial[0]
+            raise TypeError("reduce() of empty iterable with no initial value")
+        result = _combine(pool, self.func, partials)
+        return self.func(initial[0], result) if initial else result
+
+    def __repr__(self):
+        return (
+            f"TreeReduce({self.func!r}, commutative={self.commutative!r}, "
+            f"kind={self.kind!r}, workers={self.workers!r}, "
+            f"chunksize={self.chunksize!r})"
+        )
+
+    def __reduce__(self):
+        return (
+            TreeReduce,
+            (
+                reference(self.func),
+                self.commutative,
+                self.kind,
+                self.workers,
+                self.chunksize,
+            ),
+        )
+
+
+def chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    """Lazily split an iterable into lists of at most `size` items."""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def in_worker() -> bool:
+    """Return whether the current thread is running a task of a pool."""
+    return getattr(_WORKER, "active", False)
+
+
+def _run_as_worker(func: Callable, *args) -> Any:
+    previous = in_worker()
+    _WORKER.active = True
+    try:
+        return func(*args)
+    finally:
+        _WORKER.active = previous
+
+
+def _submit(pool: Executor, func: Callable, *args):
+    return pool.submit(_run_as_worker, func, *args)
+
+
+def _check_kind(kind: str) -> str:
+    if kind not in EXECUTORS:
+        raise ValueError(
+            f"Unknown executor kind {kind!r}, expected one of {list(EXECUTORS)}"
+        )
+    return kind
+
+
+def _apply_chunk(func: Callable, chunk: List[tuple]) -> List:
+    return [func(*args) for args in chunk]
+
+
+def _gather(pool: Executor, functions: Iterable[Callable], arg: Any) -> List:
+    futures = [_submit(pool, function, arg) for function in functions]
+    done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+    for future in pending:
+        future.cancel()
+    for future in futures:
+        if future in done and future.exception() is not None:
+            raise future.exception()
+    return [future.result() for future in futures]
+
+
+def _unordered_reduce(
+    pool: Executor,
+    func: Callable,
+    iterable: Iterable,
+    chunksize: int,
+    window: int,
+) -> List:
+    partials: List = []
+    pending: set = set()
+    try:
+        for chunk in chunks(iterable, chunksize):
+            pending.add(_submit(pool, reduce, func, chunk))
+            if len(pending) >= window:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                partials.extend(future.result() for future in done)
+        partials.extend(future.result() for future in pending)
+        pending = set()
+    finally:
+        for future in pending:
+            future.cancel()
+    return partials
+
+
+def _combine(pool: Executor, func: Callable, partials: List) -> Any:
+    while len(partials) > 1:
+        pairs = [
+            _submit(pool, func, left, right)
+            for left, right in zip(partials[::2], partials[1::2])
+        ]
+        odd = partials[-1:] if len(partials) % 2 else []
+        partials = [future.result() for future in pairs] + odd
+    return partials[0]
+
+
+def _ordered_map(
+    pool: Executor,
+    func: Callable,
+    arguments: Iterator[tuple],
+    chunksize: int,
+    window: int,
+) -> Iterator:
+    pending: deque = deque()
+    try:
+        for chunk in chunks(arguments, chunksize):
+            pending.append(_submit(pool, _apply_chunk, func, chunk))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
@@ -0,0 +1,273 @@
+"""Per-stage profiling of `Function` expressions.
+
+Profilers such as `cProfile` see a composed expression as a pile of
+anonymous frames inside `fungebra`. Instrumenting an expression instead
+returns a copy of it in which every node is wrapped in a probe, labelled
+by its position in the expression and the name of the function it wraps,
+recording the calls, time and elements passing through that stage.
+
+The original expression is left untouched, so profiling costs nothing
+unless the instrumented copy is called.
+
+For example:
+```
+profile = Profile()
+instrumented = (F(sorted) - increment > operator.add).instrument(profile)
+instrumented([3, 1, 2])
+print(profile.report())
+```
+"""
+from functools import partial
+from itertools import count
+import threading
+from time import perf_counter
+from typing import Callable, Iterable, Iterator, List
+
+from fungebra.batching import Batched
+from fungebra.nodes import Filter, Map, Reduce, is_async, unwrap
+from fungebra.optimize import REBUILDERS, rebuild
+from fungebra.parallel import (
+    ParallelDuxt,
+    ParallelJuxt,
+    ParallelMap,
+    TreeReduce,
+)
+
+
+class Stage:
+    """Statistics recorded for a single stage of an expression.
+
+    `cumulative` is the time spent in calls of the stage, including the
+    stages nested within it, and `own` excludes the time of those nested
+    stages. `elements` counts the items produced by map and filter stages,
+    and the items consumed by reduce stages.
+    """
+
+    __slots__ = ("position", "name", "calls", "elements", "cumulative", "own")
+
+    def __init__(self, position: str, name: str):
+        self.position = position
+        self.name = name
+        self.calls = 0
+        self.elements = 0
+        self.cumulative = 0.0
+        self.own = 0.0
+
+    @property
+    def label(self) -> str:
+        return f"{self.position} {self.name}"
+
+    def __repr__(self):
+        return (
+            f"Stage({self.label!r}, calls={self.calls}, "
+            f"elements={self.elements}, cumulative={self.cumulative:.6f}, "
+            f"own={self.own:.6f})"
+        )
+
+
+class Profile:
+    """Collection of the stage statistics of instrumented expressions."""
+
+    def __init__(self):
+        self.stages: List[Stage] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def __iter__(self) -> Iterator[Stage]:
+        return iter(self.stages)
+
+    def stage(self, position: str, name: str) -> Stage:
+        """Add and return statistics for a new stage."""
+        stage = Stage(position, name)
+        self.stages.append(stage)
+        return stage
+
+    def reset(self):
+        """Zero the statistics of every stage."""
+        with self._lock:
+            for stage in self.stages:
+                stage.calls = stage.elements = 0
+                stage.cumulative = stage.own = 0.0
+
+    def start(self) -> float:
+        """Start timing a stage on this thread, returning the start time."""
+        self._nested.append(0.0)
+        return perf_counter()
+
+    def stop(
+        self, stage: Stage, start: float, calls: int = 1, elements: int = 0
+    ):
+        """Record the time since `start` against a stage.
+
+        Time spent in stages started since is excluded from its own time,
+        and included in the own time of the stage it was started within.
+        """
+        elapsed = perf_counter() - start
+        nested = self._nested
+        own = elapsed - nested.pop()
+        if nested:
+            nested[-1] += elapsed
+        with self._lock:
+            stage.calls += calls
+            stage.elements += elements
+            stage.cumulative += elapsed
+            stage.own += own
+
+    def count(self, stage: Stage):
+        """Record an element passing through a stage."""
+        with self._lock:
+            stage.elements += 1
+
+    def report(self) -> str:
+        """Format the statistics of every stage as a table."""
+        rows = [("stage", "calls", "elements", "cumulative", "own")]
+        for stage in self.stages:
+            rows.append(
+                (
+                    stage.label,
+                    str(stage.calls),
+                    str(stage.elements),
+                    f"{stage.cumulative:.6f}",
+                    f"{stage.own:.6f}",
+                )
+            )
+        widths = [max(map(len, column)) for column in zip(*rows)]
+        return "\n".join(
+            "  ".join(
+                cell.ljust(width) if index == 0 else cell.rjust(width)
+                for index, (cell, width) in enumerate(zip(row, widths))
+            )
+            for row in rows
+        )
+
+    @property
+    def _nested(self) -> List[float]:
+        try:
+            return self._local.nested
+        except AttributeError:
+            self._local.nested = []
+            return self._local.nested
+
+
+class Probe:
+    """Callable recording the statistics of the function it wraps."""
+
+    __slots__ = ("func", "stage", "profile")
+
+    def __init__(self, func: Callable, stage: Stage, profile: Profile):
+        self.func = func
+        self.stage = stage
+        self.profile = profile
+
+    def __call__(self, *args, **kwargs):
+        start = self.profile.start()
+        try:
+            return self.func(*args, **kwargs)
+        finally:
+            self.profile.stop(self.stage, start)
+
+    def __repr__(self):
+        return f"Probe({self.func!r}, {self.stage.label!r})"
+
+
+class OutputProbe(Probe):
+    """Probe additionally timing and counting the elements a stage yields.
+
+    Lazy stages do their work as their elements are taken, so the time
+    taken to produce each element is recorded against the stage, rather
+    than against the stage consuming it.
+    """
+
+    __slots__ = ()
+
+    def __call__(self, *args, **kwargs):
+        return _timed(
+            super().__call__(*args, **kwargs), self.stage, self.profile
+        )
+
+
+class InputProbe(Probe):
+    """Probe additionally counting the elements a stage consumes."""
+
+    __slots__ = ()
+
+    def __call__(self, *args, **kwargs):
+        iterable, *rest = args
+        return super().__call__(
+            _counted(iterable, self.stage, self.profile), *rest, **kwargs
+        )
+
+
+def instrument(function: Callable, profile: Profile) -> Probe:
+    """Return a copy of an expression with every node wrapped in a probe.
+
+    Stages are labelled by their position in the expression, as the index
+    of each function within its parent joined by dots, and by the name of
+    the function. Asynchronous expressions cannot be instrumented, as
+    probes would time only the creation of their awaitables.
+    """
+    if is_async(function):
+        raise TypeError("instrument() does not support coroutine functions")
+    return _instrument(unwrap(function), "0", profile)
+
+
+def _instrument(func: Callable, position: str, profile: Profile) -> Probe:
+    stage = profile.stage(position, _name(func))
+    if _descend(func):
+        indices = count()
+        func = rebuild(
+            func,
+            lambda child: _instrument(
+                unwrap(child), f"{position}.{next(indices)}", profile
+            ),
+        )
+    if isinstance(func, (Map, Filter, ParallelMap)):
+        return OutputProbe(func, stage, profile)
+    if isinstance(func, (Reduce, TreeReduce)):
+        return InputProbe(func, stage, profile)
+    return Probe(func, stage, profile)
+
+
+def _descend(func: Callable) -> bool:
+    # Probes would hide which stages of batched pipelines are batchwise.
+    if isinstance(func, Batched):
+        return False
+    # Statistics recorded in worker processes would be lost, so stages run
+    # on a process pool are profiled as a whole.
+    if isinstance(
+        func, (ParallelMap, ParallelJuxt, ParallelDuxt, TreeReduce)
+    ):
+        return func.kind != "process"
+    return True
+
+
+def _name(func: Callable) -> str:
+    if isinstance(func, partial):
+        return f"partial({_name(func.func)})"
+    if type(func) in REBUILDERS:
+        return type(func).__name__
+    name = getattr(func, "__qualname__", None)
+    if isinstance(name, str):
+        return name
+    return repr(func)
+
+
+def _timed(iterable: Iterable, stage: Stage, profile: Profile) -> Iterator:
+    iterator = iter(iterable)
+    while True:
+        start = profile.start()
+        produced = 0
+        try:
+            element = next(iterator)
+            produced = 1
+        except StopIteration:
+            return
+        finally:
+            profile.stop(stage, start, calls=0, elements=produced)
+        yield element
+
+
+def _counted(iterable: Iterable, stage: Stage, profile: Profile) -> Iterator:
+    for element in iterable:
+        profile.count(stage)
+        yield element
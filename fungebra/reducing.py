@@ -0,0 +1,206 @@
+"""Reducing functions and the reducing steps built by transducers.
+
+A reducing function takes an accumulator and an item and returns the new
+accumulator. Reducing functions built here also have a `complete` method,
+called once with the final accumulator, which lets stateful steps such
+as that of `Partitioning` flush what they hold. A reducing function may
+stop the reduction early by returning a `Reduced` accumulator.
+
+See `fungebra.transducers` for the transducers building these steps.
+"""
+from functools import partial
+from typing import Any, Callable, Dict, Hashable, Iterable, List
+
+from fungebra.helpers import constant
+from fungebra.nodes import _identity
+
+
+NOTHING = constant("nothing")
+
+
+# Reducing functions with a `complete` method. Python 3.6 has no protocols
+# to describe callables with attributes, so these are typed loosely.
+Reducer = Any
+
+
+class Reduced:
+    """Accumulator wrapper signalling that a reduction should stop."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+    def __repr__(self):
+        return f"Reduced({self.value!r})"
+
+
+def completing(reducer: Callable) -> Reducer:
+    """Return a reducing function with a `complete` method."""
+    if hasattr(reducer, "complete"):
+        return reducer
+    # A partial has a `__dict__` for the method, and adds no Python frame.
+    return _step(partial(reducer), _identity)
+
+
+def transduce_items(
+    xform: Callable, reducer: Callable, initial: Any, iterable: Iterable
+) -> Any:
+    """Reduce an iterable through a transducer in a single loop.
+
+    See `transducers.transduce` for the curried form, taking the iterable
+    last.
+    """
+    step = xform(completing(reducer))
+    accumulator = initial
+    for item in iterable:
+        accumulator = step(accumulator, item)
+        if isinstance(accumulator, Reduced):
+            accumulator = accumulator.value
+            break
+    return step.complete(accumulator)
+
+
+# Reducing steps, built when a transducer is applied to a reducing function.
+# These are closures rather than slotted classes, as they are called once
+# per item and closures are the cheapest callables to call.
+
+
+def _step(step: Any, complete: Callable) -> Reducer:
+    step.complete = complete
+    return step
+
+
+def mapping_step(reducer: Reducer, func: Callable) -> Callable:
+    def step(accumulator, item):
+        return reducer(accumulator, func(item))
+
+    return _step(step, reducer.complete)
+
+
+def filtering_step(reducer: Reducer, predicate: Callable) -> Callable:
+    def step(accumulator, item):
+        if predicate(item):
+            return reducer(accumulator, item)
+        return accumulator
+
+    return _step(step, reducer.complete)
+
+
+def taking_while_step(reducer: Reducer, predicate: Callable) -> Callable:
+    def step(accumulator, item):
+        if predicate(item):
+            return reducer(accumulator, item)
+        return Reduced(accumulator)
+
+    return _step(step, reducer.complete)
+
+
+def taking_step(reducer: Reducer, count: int) -> Callable:
+    remaining = count
+
+    def step(accumulator, item):
+        nonlocal remaining
+        remaining -= 1
+        accumulator = reducer(accumulator, item)
+        if remaining > 0 or isinstance(accumulator, Reduced):
+            return accumulator
+        return Reduced(accumulator)
+
+    return _step(step, reducer.complete)
+
+
+def dropping_step(reducer: Reducer, count: int) -> Callable:
+    remaining = count
+
+    def step(accumulator, item):
+        nonlocal remaining
+        if remaining > 0:
+            remaining -= 1
+            return accumulator
+        return reducer(accumulator, item)
+
+    return _step(step, reducer.complete)
+
+
+def deduping_step(reducer: Reducer) -> Callable:
+    previous = NOTHING
+
+    def step(accumulator, item):
+        nonlocal previous
+        if item == previous:
+            return accumulator
+        previous = item
+        return reducer(accumulator, item)
+
+    return _step(step, reducer.complete)
+
+
+def distinct_step(
+    reducer: Reducer, key: Callable[[Any], Hashable]
+) -> Callable:
+    seen: set = set()
+
+    def step(accumulator, item):
+        item_key = key(item)
+        if item_key in seen:
+            return accumulator
+        seen.add(item_key)
+        return reducer(accumulator, item)
+
+    return _step(step, reducer.complete)
+
+
+def partitioning_step(reducer: Reducer, size: int) -> Callable:
+    chunk: List = []
+
+    def step(accumulator, item):
+        nonlocal chunk
+        chunk.append(item)
+        if len(chunk) < size:
+            return accumulator
+        full, chunk = chunk, []
+        return reducer(accumulator, full)
+
+    def complete(accumulator):
+        if chunk:
+            accumulator = reducer(accumulator, chunk)
+            if isinstance(accumulator, Reduced):
+                accumulator = accumulator.value
+        return reducer.complete(accumulator)
+
+    return _step(step, complete)
+
+
+def catting_step(reducer: Reducer) -> Callable:
+    def step(accumulator, items):
+        for item in items:
+            accumulator = reducer(accumulator, item)
+            if isinstance(accumulator, Reduced):
+                return accumulator
+        return accumulator
+
+    return _step(step, reducer.complete)
+
+
+def _append(accumulator: list, item: Any) -> list:
+    accumulator.append(item)
+    return accumulator
+
+
+def _add(accumulator: set, item: Hashable) -> set:
+    accumulator.add(item)
+    return accumulator
+
+
+def _setitem(accumulator: dict, item: tuple) -> dict:
+    key, value = item
+    accumulator[key] = value
+    return accumulator
+
+
+COLLECTORS: Dict[Callable, Callable] = {
+    list: _append,
+    set: _add,
+    dict: _setitem,
+}
@@ -0,0 +1,288 @@
+"""Staged execution of `Function` pipelines over streams of items.
+
+A staged pipeline maps a function over an iterable like `map`, but runs
+each stage of the function on its own threads, connected to the next
+stage by a bounded queue. Stages work on different items concurrently,
+so throughput is that of the slowest stage rather than the sum of all
+of them, and a slow stage can be given more workers than the others.
+
+Results are yielded in the order of their items, unless `ordered` is
+false, in which case they are yielded as they complete. The number of
+items in flight is bounded, so a slow consumer holds back reading the
+iterable rather than letting results pile up in memory, and unbounded
+iterators are processed in constant memory.
+
+An exception raised by a stage is raised by the iterator of results, in
+place of the result of its item, and stops the pipeline. The iterable is
+read on a separate thread.
+
+For example:
+```
+crawl = (F(fetch) | parse | enrich | store).staged(16, 2, 4, 1)
+for record in crawl(urls):
+    ...
+```
+"""
+import queue
+import threading
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from fungebra.helpers import Structural, constant, reference
+from fungebra.nodes import Compose, _identity, unwrap
+
+
+# Seconds between checks of whether a pipeline has been stopped, while
+# blocked on a full or empty queue.
+POLL_INTERVAL = 0.1
+
+
+# Passed along the queues after the last item.
+DONE = constant("done")
+
+
+class Staged(Structural):
+    """Map a function over an iterable, running its stages concurrently.
+
+    `workers` is a number of threads for each stage of the function, or
+    a single number for all of them. Stages are connected by queues of at
+    most `queue_size` items.
+    """
+
+    __slots__ = ("func", "workers", "queue_size", "ordered", "_stages")
+
+    def __init__(
+        self,
+        func: Callable,
+        workers: Union[int, Sequence[int]] = 1,
+        queue_size: int = 16,
+        ordered: bool = True,
+    ):
+        self.func = unwrap(func)
+        # A composition of no stages is the identity, run as one stage.
+        self._stages = (
+            self.func.stages or (_identity,)
+            if isinstance(self.func, Compose)
+            else (self.func,)
+        )
+        if isinstance(workers, int):
+            workers = (workers,) * len(self._stages)
+        workers = tuple(workers)
+        if len(workers) != len(self._stages):
+            raise ValueError(
+                f"Expected worker counts for {len(self._stages)} stages, "
+                f"got {len(workers)}"
+            )
+        if min(workers, default=1) < 1:
+            raise ValueError("workers must be at least 1")
+        if queue_size < 1:
+            raise ValueError("queue_size must be at least 1")
+        self.workers = workers
+        self.queue_size = queue_size
+        self.ordered = ordered
+
+    def __call__(self, iterable: Iterable) -> Iterator:
+        return _run(
+            self._stages, self.workers, iterable, self.queue_size, self.ordered
+        )
+
+    def __repr__(self):
+        return (
+            f"Staged({self.func!r}, workers={self.workers!r}, "
+            f"queue_size={self.queue_size!r}, ordered={self.ordered!r})"
+        )
+
+    def __reduce__(self):
+        return (
+            Staged,
+            (reference(self.func), self.workers, self.queue_size, self.ordered),
+        )
+
+
+class _Raised:
+    """Exception raised for an item, passed along in place of its value."""
+
+    __slots__ = ("exception",)
+
+    def __init__(self, exception: BaseException):
+        self.exception = exception
+
+
+def _run(
+    stages: Tuple[Callable, ...],
+    workers: Tuple[int, ...],
+    iterable: Iterable,
+    queue_size: int,
+    ordered: bool,
+) -> Iterator:
+    stop = threading.Event()
+    # Items in flight, between being read and their result being yielded.
+    window = threading.BoundedSemaphore(
+        queue_size * (len(stages) + 1) + sum(workers)
+    )
+    queues: List[queue.Queue] = [
+        queue.Queue(queue_size) for _ in range(len(stages) + 1)
+    ]
+    threads = [
+        threading.Thread(
+            target=_feed,
+            args=(iterable, queues[0], workers[0], window, stop),
+            daemon=True,
+        )
+    ]
+    for position, (stage, count) in enumerate(zip(stages, workers)):
+        successors = workers[position + 1] if position + 1 < len(stages) else 1
+        remaining = _Countdown(count, successors)
+        threads.extend(
+            threading.Thread(
+                target=_work,
+                args=(
+                    stage,
+                    queues[position],
+                    queues[position + 1],
+                    remaining,
+                    stop,
+                ),
+                daemon=True,
+            )
+            for _ in range(count)
+        )
+    try:
+        for thread in threads:
+            thread.start()
+        yield from _results(queues[-1], window, ordered)
+    finally:
+        # Stop the threads, if the results were not all taken.
+        stop.set()
+
+
+class _Countdown:
+    """Count the workers of a stage still running.
+
+    The last to finish passes `successors` DONE markers on, one for each
+    worker of the next stage.
+    """
+
+    __slots__ = ("count", "successors", "lock")
+
+    def __init__(self, count: int, successors: int):
+        self.count = count
+        self.successors = successors
+        self.lock = threading.Lock()
+
+    def finish(self) -> bool:
+        """Count a worker as finished, returning whether it was the last."""
+        with self.lock:
+            self.count -= 1
+            return not self.count
+
+
+def _put(out: queue.Queue, item: Any, stop: threading.Event) -> bool:
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=POLL_INTERVAL)
+        except queue.Full:
+            continue
+        return True
+    return False
+
+
+def _get(source: queue.Queue, stop: threading.Event) -> Any:
+    while not stop.is_set():
+        try:
+            return source.get(timeout=POLL_INTERVAL)
+        except queue.Empty:
+            continue
+    return DONE
+
+
+def _acquire(
+    window: threading.BoundedSemaphore, stop: threading.Event
+) -> bool:
+    while not window.acquire(timeout=POLL_INTERVAL):
+        if stop.is_set():
+            return False
+    return True
+
+
+def _feed(
+    iterable: Iterable,
+    out: queue.Queue,
+    successors: int,
+    window: threading.BoundedSemaphore,
+    stop: threading.Event,
+):
+    index = 0
+    try:
+        for item in iterable:
+            if not (_acquire(window, stop) and _put(out, (index, item), stop)):
+                return
+            index += 1
+    except BaseException as exception:
+        if not _acquire(window, stop):
+            return
+        if not _put(out, (index, _Raised(exception)), stop):
+            return
+    for _ in range(successors):
+        if not _put(out, DONE, stop):
+            return
+
+
+def _work(
+    stage: Callable,
+    source: queue.Queue,
+    out: queue.Queue,
+    remaining: _Countdown,
+    stop: threading.Event,
+):
+    while True:
+        item = _get(source, stop)
+        if item is DONE:
+            break
+        index, value = item
+        if not isinstance(value, _Raised):
+            try:
+                value = stage(value)
+            except BaseException as exception:
+                value = _Raised(exception)
+        if not _put(out, (index, value), stop):
+            return
+    if remaining.finish():
+        for _ in range(remaining.successors):
+            if not _put(out, DONE, stop):
+                return
+
+
+def _results(
+    source: queue.Queue, window: threading.BoundedSemaphore, ordered: bool
+) -> Iterator:
+    pending = {}
+    expected = 0
+    while True:
+        item = source.get()
+        if item is DONE:
+            return
+        if ordered:
+            index, value = item
+            pending[index] = value
+            while expected in pending:
+                value = pending.pop(expected)
+                expected += 1
+                window.release()
+                if isinstance(value, _Raised):
+                    raise value.exception
+                yield value
+        else:
+            value = item[1]
+            window.release()
+            if isinstance(value, _Raised):
+                raise value.exception
+            yield value
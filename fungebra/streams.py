@@ -0,0 +1,476 @@
+"""Streaming sources and sinks over files and byte buffers.
+
+Sources are callables taking the path of a file, or a `bytes`,
+`bytearray` or `mmap` buffer, and lazily yielding its records. Files are
+memory-mapped rather than read, and records are yielded as `memoryview`
+slices of the mapping, so no record is copied and files of any size are
+processed in constant memory. A slice stays valid after the source is
+exhausted, keeping the mapping open until the slice itself is released.
+
+Sinks are callables taking an iterable of records and writing them to a
+file in one `writelines` call through a large write buffer, so records
+are written in bulk without a Python-level loop.
+
+JSON lines are decoded a block of lines at a time, optionally on a pool
+of workers with a bounded number of blocks in flight, so that a slow
+consumer holds back reading rather than letting decoded records pile up
+in memory.
+
+The source and sink functions are re-exported by `fungebra.functions`.
+For example:
+```
+errors = read_lines() < (lambda line: line[:5] == b"ERROR")
+copy_errors = errors | write_lines("errors.log")
+copy_errors("service.log")
+```
+"""
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from itertools import chain, repeat, starmap
+import json
+import mmap
+import os
+from struct import Struct
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from fungebra.helpers import Structural
+from fungebra.model import Function
+from fungebra.parallel import ParallelMap, chunks
+
+
+BUFFER_SIZE = 1 << 20
+
+
+# Number of values encoded together by JSON lines sinks.
+BLOCK_RECORDS = 1024
+
+
+# Sources are paths of files to map, or buffers to read directly.
+Source = Union[str, os.PathLike, bytes, bytearray, mmap.mmap]
+
+
+BUFFER_TYPES = (bytes, bytearray, mmap.mmap)
+
+
+@contextmanager
+def mapped(source: Source):
+    """Context manager mapping a file into memory, read-only.
+
+    Buffers are used directly. The mapping is closed on exit, unless
+    slices of it are still in use, in which case it is closed once they
+    have been released.
+    """
+    if isinstance(source, BUFFER_TYPES):
+        yield source
+        return
+    with open(source, "rb") as file:
+        if not os.fstat(file.fileno()).st_size:
+            # Empty files cannot be mapped.
+            yield b""
+            return
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield data
+    finally:
+        try:
+            data.close()
+        except BufferError:
+            pass
+
+
+class Lines(Structural):
+    """Source yielding the delimited lines of a file, without delimiters."""
+
+    __slots__ = ("delimiter",)
+
+    def __init__(self, delimiter: bytes = b"\n"):
+        if not delimiter:
+            raise ValueError("delimiter must not be empty")
+        self.delimiter = delimiter
+
+    def __call__(self, source: Source) -> Iterator[memoryview]:
+        return _lines(source, self.delimiter)
+
+    def __repr__(self):
+        return f"Lines({self.delimiter!r})"
+
+    def __reduce__(self):
+        return Lines, (self.delimiter,)
+
+
+class Records(Structural):
+    """Source yielding the fixed-width records of a file."""
+
+    __slots__ = ("size",)
+
+    def __init__(self, size: int):
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        self.size = size
+
+    def __call__(self, source: Source) -> Iterator[memoryview]:
+        return _records(source, self.size)
+
+    def __repr__(self):
+        return f"Records({self.size!r})"
+
+    def __reduce__(self):
+        return Records, (self.size,)
+
+
+class Structs(Structural):
+    """Source yielding tuples unpacked from `struct`-packed records."""
+
+    __slots__ = ("fmt",)
+
+    def __init__(self, fmt: str):
+        self.fmt = fmt
+
+    def __call__(self, source: Source) -> Iterator[tuple]:
+        return _structs(source, Struct(self.fmt))
+
+    def __repr__(self):
+        return f"Structs({self.fmt!r})"
+
+    def __reduce__(self):
+        return Structs, (self.fmt,)
+
+
+class JsonLines(Structural):
+    """Source lazily decoding the JSON values of a JSON lines file.
+
+    Lines are decoded in blocks of about `blocksize` bytes, on a pool of
+    `workers` of the given `kind` if `kind` is given. Blank lines are
+    skipped.
+    """
+
+    __slots__ = ("kind", "workers", "blocksize")
+
+    def __init__(
+        self,
+        kind: Optional[str] = None,
+        workers: Optional[int] = None,
+        blocksize: int = BUFFER_SIZE,
+    ):
+        if blocksize < 1:
+            raise ValueError("blocksize must be at least 1")
+        self.kind = kind
+        self.workers = workers
+        self.blocksize = blocksize
+
+    def __call__(self, source: Source) -> Iterator:
+        blocks = _blocks(source, self.blocksize)
+        if self.kind is not None:
+            decode = ParallelMap(_decode_numbered, self.kind, self.workers)
+            return chain.from_iterable(decode(blocks))
+        return chain.from_iterable(map(_decode_numbered, blocks))
+
+    def __repr__(self):
+        return (
+            f"JsonLines(kind={self.kind!r}, workers={self.workers!r}, "
+            f"blocksize={self.blocksize!r})"
+        )
+
+    def __reduce__(self):
+        return JsonLines, (self.kind, self.workers, self.blocksize)
+
+
+def decode_block(block: bytes, first_line: int = 1) -> List:
+    """Decode a block of JSON lines, one value per line.
+
+    Blank lines are skipped. Invalid lines raise a `ValueError` giving
+    their number, counting from `first_line`.
+    """
+    values = []
+    for number, line in enumerate(block.split(b"\n"), first_line):
+        if not line.strip():
+            continue
+        try:
+            values.append(json.loads(line))
+        except ValueError as error:
+            raise ValueError(f"Line {number}: {error}") from error
+    return values
+
+
+def _decode_numbered(numbered: Tuple[int, bytes]) -> List:
+    first_line, block = numbered
+    return decode_block(block, first_line)
+
+
+def _blocks(source: Source, size: int) -> Iterator[Tuple[int, bytes]]:
+    """Lazily split a file into blocks of whole lines of about `size`.
+
+    Blocks are yielded with the number of their first line.
+    """
+    with mapped(source) as data:
+        start, end, line = 0, len(data), 1
+        while start < end:
+            stop = data.rfind(b"\n", start, start + size) + 1
+            if not stop:
+                stop = data.find(b"\n", start + size) + 1 or end
+            block = data[start:stop]
+            yield line, block
+            line += block.count(b"\n")
+            start = stop
+
+
+def _lines(source: Source, delimiter: bytes) -> Iterator[memoryview]:
+    with mapped(source) as data:
+        view = memoryview(data)
+        find, start, end = data.find, 0, len(data)
+        try:
+            while start < end:
+                stop = find(delimiter, start)
+                if stop < 0:
+                    yield view[start:]
+                    break
+                yield view[start:stop]
+                start = stop + len(delimiter)
+        finally:
+            view.release()
+
+
+def _records(source: Source, size: int) -> Iterator[memoryview]:
+    with mapped(source) as data:
+        if len(data) % size:
+            raise ValueError(
+                f"Length {len(data)} is not a multiple of the size {size}"
+            )
+        view = memoryview(data)
+        try:
+            for start in range(0, len(data), size):
+                yield view[start : start + size]
+        finally:
+            view.release()
+
+
+def _structs(source: Source, packer: Struct) -> Iterator[tuple]:
+    with mapped(source) as data:
+        yield from packer.iter_unpack(data)
+
+
+class Sink(Structural, ABC):
+    """Base class for sinks writing records to a file in bulk."""
+
+    __slots__ = ("path", "buffering")
+
+    def __init__(
+        self, path: Union[str, os.PathLike], buffering: int = BUFFER_SIZE
+    ):
+        self.path = path
+        self.buffering = buffering
+
+    def __call__(self, records: Iterable):
+        with open(self.path, "wb", buffering=self.buffering) as file:
+            file.writelines(self.chunks(records))
+
+    @abstractmethod
+    def chunks(self, records: Iterable) -> Iterable:
+        """Return the chunks of bytes to write for the records."""
+
+
+class WriteLines(Sink):
+    """Sink writing bytes-like records, each followed by a delimiter."""
+
+    __slots__ = ("delimiter",)
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        delimiter: bytes = b"\n",
+        buffering: int = BUFFER_SIZE,
+    ):
+        super().__init__(path, buffering)
+        self.delimiter = delimiter
+
+    def chunks(self, records: Iterable) -> Iterable:
+        return chain.from_iterable(zip(records, repeat(self.delimiter)))
+
+    def __repr__(self):
+        return f"WriteLines({self.path!r}, {self.delimiter!r})"
+
+    def __reduce__(self):
+        return WriteLines, (self.path, self.delimiter, self.buffering)
+
+
+class WriteRecords(Sink):
+    """Sink writing bytes-like records back to back."""
+
+    __slots__ = ()
+
+    def chunks(self, records: Iterable) -> Iterable:
+        return records
+
+    def __repr__(self):
+        return f"WriteRecords({self.path!r})"
+
+    def __reduce__(self):
+        return WriteRecords, (self.path, self.buffering)
+
+
+class WriteStructs(Sink):
+    """Sink packing tuples into `struct`-packed records."""
+
+    __slots__ = ("fmt",)
+
+    def __init__(
+        self,
+        path: Union[str, os.PathLike],
+        fmt: str,
+        buffering: int = BUFFER_SIZE,
+    ):
+        super().__init__(path, buffering)
+        self.fmt = fmt
+
+    def chunks(self, records: Iterable) -> Iterable:
+        return starmap(Struct(self.fmt).pack, records)
+
+    def __repr__(self):
+        return f"WriteStructs({self.path!r}, {self.fmt!r})"
+
+    def __reduce__(self):
+        return WriteStructs, (self.path, self.fmt, self.buffering)
+
+
+class WriteJsonLines(Sink):
+    """Sink encoding values as JSON lines, a block of values at a time."""
+
+    __slots__ = ()
+
+    encode = json.JSONEncoder(ensure_ascii=False).encode
+
+    def chunks(self, records: Iterable[Any]) -> Iterable:
+        for block in chunks(records, BLOCK_RECORDS):
+            yield ("\n".join(map(self.encode, block)) + "\n").encode()
+
+    def __repr__(self):
+        return f"WriteJsonLines({self.path!r})"
+
+    def __reduce__(self):
+        return WriteJsonLines, (self.path, self.buffering)
+
+
+@Function
+def read_lines(delimiter: bytes = b"\n") -> Callable:
+    """Source lazily yielding the lines of a file, as `memoryview` slices.
+
+    Files are memory-mapped, see `fungebra.streams`. Lines exclude their
+    delimiter.
+
+    For example:
+    ```
+    (read_lines() - bytes | list)(b"a\nb\n") == [b"a", b"b"]
+    ```
+    """
+    return Function.wrap(Lines(delimiter))
+
+
+@Function
+def read_records(size: int) -> Callable:
+    """Source lazily yielding fixed-width records, as `memoryview` slices.
+
+    For example:
+    ```
+    (read_records(2) - bytes | list)(b"aabb") == [b"aa", b"bb"]
+    ```
+    """
+    return Function.wrap(Records(size))
+
+
+@Function
+def read_structs(fmt: str) -> Callable:
+    """Source lazily unpacking `struct`-packed records into tuples.
+
+    For example:
+    ```
+    (read_structs("<hh") | list)(b"\x01\x00\x02\x00") == [(1, 2)]
+    ```
+    """
+    return Function.wrap(Structs(fmt))
+
+
+@Function
+def read_jsonl(
+    kind: Optional[str] = None,
+    workers: Optional[int] = None,
+    blocksize: int = BUFFER_SIZE,
+) -> Callable:
+    """Source lazily decoding the values of a JSON lines file.
+
+    Lines are decoded in blocks of about `blocksize` bytes, in parallel on
+    a shared pool if `kind` is `"thread"` or `"process"`, with at most a
+    few blocks per worker in flight.
+
+    For example:
+    ```
+    adults = read_jsonl(kind="process") < (itemgetter("age") | greater(17))
+    names = adults - itemgetter("name") | list
+    ```
+    """
+    return Function.wrap(JsonLines(kind, workers, blocksize))
+
+
+@Function
+def write_lines(
+    path: str, delimiter: bytes = b"\n", buffering: int = BUFFER_SIZE
+) -> Callable[[Iterable], None]:
+    """Sink writing bytes-like records to a file, each followed by a delimiter.
+
+    For example:
+    ```
+    copy_errors = (read_lines() < is_error) | write_lines("errors.log")
+    copy_errors("service.log")
+    ```
+    """
+    return Function.wrap(WriteLines(path, delimiter, buffering))
+
+
+@Function
+def write_records(
+    path: str, buffering: int = BUFFER_SIZE
+) -> Callable[[Iterable], None]:
+    """Sink writing bytes-like records to a file back to back.
+
+    For example:
+    ```
+    (read_records(16) < is_valid) | write_records("valid.dat")
+    ```
+    """
+    return Function.wrap(WriteRecords(path, buffering))
+
+
+@Function
+def write_structs(
+    path: str, fmt: str, buffering: int = BUFFER_SIZE
+) -> Callable[[Iterable], None]:
+    """Sink packing tuples into `struct`-packed records in a file.
+
+    For example:
+    ```
+    (read_structs("<ii") - swap) | write_structs("swapped.dat", "<ii")
+    ```
+    """
+    return Function.wrap(WriteStructs(path, fmt, buffering))
+
+
+@Function
+def write_jsonl(
+    path: str, buffering: int = BUFFER_SIZE
+) -> Callable[[Iterable], None]:
+    """Sink encoding values as JSON lines in a file.
+
+    For example:
+    ```
+    (read_jsonl() - itemgetter("user")) | write_jsonl("users.jsonl")
+    ```
+    """
+    return Function.wrap(WriteJsonLines(path, buffering))
@@ -0,0 +1,381 @@
+"""Transducers: composable transformations of reducing functions.
+
+A transducer takes a reducing function and returns another, which
+transforms, drops or groups items before passing them on. Chains of
+transducers therefore run in a single loop over the input, with no
+intermediate iterators, into any reducing function. See
+`fungebra.reducing` for reducing functions, their `complete` method and
+stopping early with `Reduced`.
+
+Transducers are `Function` callables, composed in data order with `+`:
+`mapping(f) + filtering(g)` maps items with `f` before filtering them on
+`g`. The functions building them are re-exported by `fungebra.functions`.
+"""
+from typing import Any, Callable, ClassVar, Hashable, Iterable
+
+from fungebra.helpers import Structural, reference
+from fungebra.model import Function, identity
+from fungebra.nodes import Node, unwrap
+from fungebra.optimize import REBUILDERS, Transform, _rebuild_node
+from fungebra.reducing import (
+    COLLECTORS,
+    Reduced,
+    _append,
+    catting_step,
+    deduping_step,
+    distinct_step,
+    dropping_step,
+    filtering_step,
+    mapping_step,
+    partitioning_step,
+    taking_step,
+    taking_while_step,
+    transduce_items,
+)
+
+
+# Transducers, applied to a reducing function to build a reducing step.
+
+
+class Mapping(Node):
+    """Transducer applying a function to each item."""
+
+    __slots__ = ()
+
+    def __call__(self, reducer: Callable) -> Callable:
+        return mapping_step(reducer, self.func)
+
+
+class Filtering(Node):
+    """Transducer keeping the items satisfying a predicate."""
+
+    __slots__ = ()
+
+    def __call__(self, reducer: Callable) -> Callable:
+        return filtering_step(reducer, self.func)
+
+
+class TakingWhile(Node):
+    """Transducer stopping at the first item not satisfying a predicate."""
+
+    __slots__ = ()
+
+    def __call__(self, reducer: Callable) -> Callable:
+        return taking_while_step(reducer, self.func)
+
+
+class Distinct(Node):
+    """Transducer dropping items whose key has been seen before."""
+
+    __slots__ = ()
+
+    def __call__(self, reducer: Callable) -> Callable:
+        return distinct_step(reducer, self.func)
+
+
+class Counted(Structural):
+    """Base class for transducers parametrised by a count."""
+
+    __slots__ = ("count",)
+
+    step: ClassVar[Callable]
+
+    def __init__(self, count: int):
+        if count < 1:
+            raise ValueError("count must be at least 1")
+        self.count = count
+
+    def __call__(self, reducer: Callable) -> Callable:
+        return self.step(reducer, self.count)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.count!r})"
+
+    def __reduce__(self):
+        return type(self), (self.count,)
+
+
+class Taking(Counted):
+    """Transducer stopping after a number of items."""
+
+    __slots__ = ()
+
+    step = staticmethod(taking_step)
+
+
+class Dropping(Counted):
+    """Transducer dropping a number of leading items."""
+
+    __slots__ = ()
+
+    step = staticmethod(dropping_step)
+
+
+class Partitioning(Counted):
+    """Transducer grouping items into lists of a given size.
+
+    The last list may be shorter.
+    """
+
+    __slots__ = ()
+
+    step = staticmethod(partitioning_step)
+
+
+class Stateless(Structural):
+    """Base class for transducers without parameters."""
+
+    __slots__ = ()
+
+    step: ClassVar[Callable]
+
+    def __call__(self, reducer: Callable) -> Callable:
+        return self.step(reducer)
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+    def __reduce__(self):
+        return type(self), ()
+
+
+class Deduping(Stateless):
+    """Transducer dropping items equal to the previous item."""
+
+    __slots__ = ()
+
+    step = staticmethod(deduping_step)
+
+
+class Catting(Stateless):
+    """Transducer passing on each item of iterable items."""
+
+    __slots__ = ()
+
+    step = staticmethod(catting_step)
+
+
+# Transductions, running a transducer over an iterable.
+
+
+class Transduce(Structural):
+    """Callable reducing an iterable through a transducer."""
+
+    __slots__ = ("xform", "reducer", "initial")
+
+    def __init__(self, xform: Callable, reducer: Callable, initial: Any):
+        self.xform = unwrap(xform)
+        self.reducer = unwrap(reducer)
+        self.initial = initial
+
+    def __call__(self, iterable: Iterable) -> Any:
+        return transduce_items(
+            self.xform, self.reducer, self.initial, iterable
+        )
+
+    def __repr__(self):
+        return (
+            f"Transduce({self.xform!r}, {self.reducer!r}, {self.initial!r})"
+        )
+
+    def __reduce__(self):
+        return (
+            Transduce,
+            (reference(self.xform), reference(self.reducer), self.initial),
+        )
+
+
+class Into(Structural):
+    """Callable collecting the items of a transduction into a collection.
+
+    Lists, sets and dicts, of key-value pairs, are built directly. Other
+    collection types are built from a list of the items.
+    """
+
+    __slots__ = ("target", "xform")
+
+    def __init__(self, target: Callable, xform: Callable):
+        self.target = target
+        self.xform = unwrap(xform)
+
+    def __call__(self, iterable: Iterable) -> Any:
+        reducer = COLLECTORS.get(self.target)
+        if reducer is not None:
+            return transduce_items(
+                self.xform, reducer, self.target(), iterable
+            )
+        items = transduce_items(self.xform, _append, [], iterable)
+        return self.target(items)
+
+    def __repr__(self):
+        return f"Into({self.target!r}, {self.xform!r})"
+
+    def __reduce__(self):
+        return Into, (self.target, reference(self.xform))
+
+
+def _rebuild_transduce(node: Transduce, transform: Transform):
+    return Transduce(
+        transform(node.xform), transform(node.reducer), node.initial
+    )
+
+
+def _rebuild_into(node: Into, transform: Transform):
+    return Into(node.target, transform(node.xform))
+
+
+REBUILDERS.update(
+    {
+        Mapping: _rebuild_node,
+        Filtering: _rebuild_node,
+        TakingWhile: _rebuild_node,
+        Distinct: _rebuild_node,
+        Transduce: _rebuild_transduce,
+        Into: _rebuild_into,
+    }
+)
+
+
+@Function
+def mapping(function: Callable) -> Callable:
+    """Transducer applying a function to each item.
+
+    Transducers compose in data order with `+`, and run with `transduce`
+    or `into` in a single loop, see `fungebra.transducers`.
+
+    For example:
+    ```
+    into(list, mapping(str) + filtering(str.isdigit))([1, "a", 2]) == ["1", "2"]
+    ```
+    """
+    return Function.wrap(Mapping(function))
+
+
+@Function
+def filtering(predicate: Callable[[Any], Any]) -> Callable:
+    """Transducer keeping the items satisfying a predicate.
+
+    For example:
+    ```
+    into(list, filtering(less(2)))(range(4)) == [0, 1]
+    ```
+    """
+    return Function.wrap(Filtering(predicate))
+
+
+@Function
+def taking_while(predicate: Callable[[Any], Any]) -> Callable:
+    """Transducer stopping at the first item not satisfying a predicate.
+
+    For example:
+    ```
+    into(list, taking_while(less(2)))(itertools.count()) == [0, 1]
+    ```
+    """
+    return Function.wrap(TakingWhile(predicate))
+
+
+@Function
+def taking(count: int) -> Callable:
+    """Transducer stopping after a number of items.
+
+    For example:
+    ```
+    into(list, taking(2))(itertools.count()) == [0, 1]
+    ```
+    """
+    return Function.wrap(Taking(count))
+
+
+@Function
+def dropping(count: int) -> Callable:
+    """Transducer dropping a number of leading items.
+
+    For example:
+    ```
+    into(list, dropping(2))(range(4)) == [2, 3]
+    ```
+    """
+    return Function.wrap(Dropping(count))
+
+
+@Function
+def distinct(key: Callable[[Any], Hashable] = identity) -> Callable:
+    """Transducer dropping items whose key has been seen before.
+
+    For example:
+    ```
+    into(list, distinct())([1, 2, 1, 3]) == [1, 2, 3]
+    ```
+    """
+    return Function.wrap(Distinct(key))
+
+
+@Function
+def partitioning(size: int) -> Callable:
+    """Transducer grouping items into lists of a given size.
+
+    For example:
+    ```
+    into(list, partitioning(2))(range(5)) == [[0, 1], [2, 3], [4]]
+    ```
+    """
+    return Function.wrap(Partitioning(size))
+
+
+# Transducer dropping items equal to the previous item.
+deduping: Callable = Function.wrap(Deduping())
+
+
+# Transducer passing on each item of iterable items.
+catting: Callable = Function.wrap(Catting())
+
+
+@Function
+def transduce(
+    xform: Callable, reducer: Callable[[Any, Any], Any], initial: Any
+) -> Callable[[Iterable], Any]:
+    """Return a function reducing an iterable through a transducer.
+
+    The reducer is called with the accumulator, starting from `initial`,
+    and each item passed on by the transducer. It may stop the reduction
+    early by returning `reduced(accumulator)`.
+
+    For example:
+    ```
+    transduce(mapping(len), operator.add, 0)(["a", "bc"]) == 3
+    write_lines = transduce(
+        mapping(str) + mapping(lambda line: line + "\\n"),
+        lambda file, line: file.write(line) and file,
+        open("out.txt", "w"),
+    )
+    ```
+    """
+    return Function.wrap(Transduce(xform, reducer, initial))
+
+
+@Function
+def into(target: Callable, xform: Callable) -> Callable[[Iterable], Any]:
+    """Return a function collecting the items of a transducer.
+
+    For example:
+    ```
+    into(dict, mapping(juxt(len, identity) | tuple))(["a"]) == {1: "a"}
+    into(tuple, taking(2))(itertools.count()) == (0, 1)
+    ```
+    """
+    return Function.wrap(Into(target, xform))
+
+
+def reduced(value: Any) -> Reduced:
+    """Wrap an accumulator to stop a transduction early.
+
+    For example:
+    ```
+    first_over = lambda limit: lambda acc, item: (
+        reduced(item) if item > limit else acc
+    )
+    transduce(identity, first_over(2), None)([1, 3, 4]) == 3
+    ```
+    """
+    return Reduced(value)
@@ -0,0 +1,246 @@
+"""Vectorised execution of `Function` expressions over NumPy arrays.
+
+`vectorize` rewrites the `map`, `filter` and `reduce` stages of an
+expression whose functions are known to be elementwise: the `operator`
+functions re-exported by `fungebra`, `less`, `greater`, `equals`, `fnot`,
+`iffy` and compositions and partial applications of these. When such a
+stage is called with NumPy arrays, its function is applied to the whole
+array at once, filters become boolean masks, and reductions use the
+`reduce` method of the corresponding ufunc. Given any other input, or
+for functions which are not known to be elementwise, stages run element
+by element as before.
+
+NumPy is an optional dependency. Without it there can be no arrays, and
+`vectorize` returns expressions unchanged.
+
+For example:
+```
+total = (op.mul.rpartial(2).map < greater(3)) > op.add
+total.vectorize()(numpy.arange(10)) == total(range(10)) == 88
+```
+"""
+from functools import partial, reduce
+import operator
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union, cast
+
+from fungebra.combinators import Iffy, Not
+from fungebra.helpers import Structural
+from fungebra.nodes import (
+    Compose,
+    Filter,
+    Map,
+    Reduce,
+    RPartial,
+    _identity,
+    unwrap,
+)
+from fungebra.optimize import rebuild
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None  # type: ignore[assignment]
+
+
+# Names of the `operator` functions and their equivalent NumPy ufuncs.
+UFUNC_NAMES = {
+    "abs": "absolute",
+    "add": "add",
+    "and_": "bitwise_and",
+    "eq": "equal",
+    "floordiv": "floor_divide",
+    "ge": "greater_equal",
+    "gt": "greater",
+    "invert": "invert",
+    "le": "less_equal",
+    "lshift": "left_shift",
+    "lt": "less",
+    "mod": "remainder",
+    "mul": "multiply",
+    "ne": "not_equal",
+    "neg": "negative",
+    "not_": "logical_not",
+    "or_": "bitwise_or",
+    "pos": "positive",
+    "pow": "power",
+    "rshift": "right_shift",
+    "sub": "subtract",
+    "truediv": "true_divide",
+    "xor": "bitwise_xor",
+}
+
+
+UFUNCS: Dict[Callable, Callable] = (
+    {
+        getattr(operator, name): getattr(numpy, ufunc)
+        for name, ufunc in UFUNC_NAMES.items()
+    }
+    if numpy is not None
+    else {}
+)
+
+
+def vectorize(function: Callable) -> Callable:
+    """Vectorise the elementwise map, filter and reduce stages of a function.
+
+    For example:
+    ```
+    vectorize(F(op.neg).map)  # VectorMap(neg)
+    ```
+    """
+    function = unwrap(function)
+    if numpy is None:
+        return function
+    if isinstance(function, (Map, Filter, Reduce)):
+        vectorized = elementwise(function.func)
+        if vectorized is not None:
+            node = VECTOR_NODES[type(function)]
+            return node(function.func, vectorized)
+    return rebuild(function, vectorize)
+
+
+def elementwise(func: Callable) -> Optional[Callable]:
+    """Return the equivalent of a function over whole arrays, if known."""
+    func = unwrap(func)
+    ufunc = _ufunc(func)
+    if ufunc is not None:
+        return ufunc
+    if func is _identity:
+        return func
+    convert = ELEMENTWISE.get(type(func))
+    return None if convert is None else convert(func)
+
+
+def _elementwise_partial(func: Union[partial, RPartial]) -> Optional[Callable]:
+    if func.keywords:
+        return None
+    ufunc = _ufunc(func.func)
+    return None if ufunc is None else type(func)(ufunc, *func.args)
+
+
+def _elementwise_not(func: Not) -> Optional[Callable]:
+    inner = elementwise(func.function)
+    return None if inner is None else Compose(numpy.logical_not, inner)
+
+
+def _elementwise_iffy(func: Iffy) -> Optional[Callable]:
+    branches = [
+        elementwise(branch)
+        for branch in (func.predicate, func.func, func.default)
+    ]
+    if None in branches:
+        return None
+    return VectorWhere(*cast(List[Callable], branches))
+
+
+def _elementwise_compose(func: Compose) -> Optional[Callable]:
+    stages = [elementwise(stage) for stage in func.stages]
+    return None if None in stages else Compose(*reversed(stages))
+
+
+# Nodes with an equivalent over whole arrays, if the functions they hold
+# have one.
+ELEMENTWISE: Dict[type, Callable[[Any], Optional[Callable]]] = {
+    partial: _elementwise_partial,
+    RPartial: _elementwise_partial,
+    Not: _elementwise_not,
+    Iffy: _elementwise_iffy,
+    Compose: _elementwise_compose,
+}
+
+
+def _ufunc(func: Callable) -> Optional[Callable]:
+    try:
+        return UFUNCS.get(func)
+    except TypeError:
+        return None
+
+
+class VectorWhere(Structural):
+    """Elementwise choice between two functions based on a predicate."""
+
+    __slots__ = ("predicate", "func", "default")
+
+    def __init__(self, predicate: Callable, func: Callable, default: Callable):
+        self.predicate = predicate
+        self.func = func
+        self.default = default
+
+    def __call__(self, array):
+        return numpy.where(
+            self.predicate(array), self.func(array), self.default(array)
+        )
+
+    def __repr__(self):
+        return (
+            f"VectorWhere({self.predicate!r}, {self.func!r}, "
+            f"{self.default!r})"
+        )
+
+
+class VectorNode(Structural):
+    """Base class for stages applying a function to whole arrays."""
+
+    __slots__ = ("func", "vectorized")
+
+    def __init__(self, func: Callable, vectorized: Callable):
+        self.func = func
+        self.vectorized = vectorized
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.func!r})"
+
+    def __reduce__(self):
+        return vectorize, (ELEMENTWISE_NODES[type(self)](self.func),)
+
+
+class VectorMap(VectorNode):
+    """Map applying the function to whole arrays at once."""
+
+    __slots__ = ()
+
+    def __call__(self, *iterables: Iterable):
+        arrays = [each for each in iterables if isinstance(each, numpy.ndarray)]
+        if len(arrays) == len(iterables) and (
+            len({array.shape for array in arrays}) == 1
+        ):
+            return self.vectorized(*arrays)
+        return map(self.func, *iterables)
+
+
+class VectorFilter(VectorNode):
+    """Filter masking one-dimensional arrays with the predicate."""
+
+    __slots__ = ()
+
+    def __call__(self, iterable: Iterable):
+        if isinstance(iterable, numpy.ndarray) and iterable.ndim == 1:
+            return iterable[numpy.asarray(self.vectorized(iterable), bool)]
+        return filter(self.func, iterable)
+
+
+class VectorReduce(VectorNode):
+    """Reduce folding arrays with the `reduce` method of a ufunc."""
+
+    __slots__ = ()
+
+    def __call__(self, iterable: Iterable, *initial):
+        reducer = getattr(self.vectorized, "reduce", None)
+        if not isinstance(iterable, numpy.ndarray) or reducer is None:
+            return reduce(self.func, iterable, *initial)
+        if len(iterable) == 0:
+            if initial:
+                return initial[0]
+            raise TypeError("reduce() of empty iterable with no initial value")
+        result = reducer(iterable)
+        return self.func(initial[0], result) if initial else result
+
+
+VECTOR_NODES: Dict[type, Callable[[Callable, Callable], Callable]] = {
+    Map: VectorMap,
+    Filter: VectorFilter,
+    Reduce: VectorReduce,
+}
+
+
+ELEMENTWISE_NODES = {node: base for base, node in VECTOR_NODES.items()}
@@ -39,7 +39,8 @@ setup(
         "Intended Audience :: Developers",
         "Programming Language :: Python :: 3.6",
     ],
-    packages=find_packages(exclude=["contrib", "docs", "tests"]),
+    packages=find_packages(exclude=["benchmarks", "contrib", "docs", "tests"]),
     install_requires=REQUIREMENTS_FILE,
+    extras_require={"numpy": ["numpy"]},
     dependency_links=[],
 )
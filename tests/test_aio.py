@@ -0,0 +1,152 @@
+# False positive on overloaded operators.
+# pylint: disable=comparison-with-callable
+import asyncio
+import operator
+import pickle
+
+import pytest
+
+from fungebra import F
+from fungebra.aio import AsyncFunction, aduxt, ajuxt
+from fungebra.model import Function
+from fungebra.profiling import Profile
+
+
+async def double(number):
+    await asyncio.sleep(0)
+    return number * 2
+
+
+async def is_even(number):
+    await asyncio.sleep(0)
+    return not number % 2
+
+
+def increment(number):
+    return number + 1
+
+
+def run(awaitable):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(awaitable)
+    finally:
+        loop.close()
+
+
+def test_synchronous_expressions_stay_synchronous():
+    func = F(increment) | increment
+    assert isinstance(func, Function)
+    assert not isinstance(func, AsyncFunction)
+    assert func(1) == 3
+
+
+@pytest.mark.parametrize(
+    "func,arg,expected",
+    [
+        (F(increment) | double, 1, 4),
+        (F(double) | increment, 1, 3),
+        (F(increment) + double, 1, 3),
+        (F(increment) ** double | increment, 1, 5),
+        (F(range) - double | list, 3, [0, 2, 4]),
+        (F(double).map | sum, [1, 2, 3], 12),
+        (F(range) < is_even, 5, [0, 2, 4]),
+        ((F(range) - double) > operator.add, 4, 12),
+        (F(double).lmap, [1, 2], [2, 4]),
+    ],
+)
+def test_operators_with_coroutine_functions(func, arg, expected):
+    assert isinstance(func, AsyncFunction)
+    assert run(func(arg)) == expected
+
+
+def test_async_reduce_awaits_each_step():
+    async def add(left, right):
+        await asyncio.sleep(0)
+        return left + right
+
+    assert run((F(range) > add)(5)) == 10
+
+
+def test_async_map_accepts_async_iterables():
+    async def numbers():
+        for number in range(3):
+            yield number
+
+    assert run((F(double).map)(numbers())) == [0, 2, 4]
+
+
+def test_async_map_bounds_concurrency():
+    running, peak = [0], [0]
+
+    async def track(number):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.001)
+        running[0] -= 1
+        return number
+
+    assert run(AsyncFunction(track).amap(3)(range(20))) == list(range(20))
+    assert peak[0] == 3
+
+
+def test_async_map_propagates_errors():
+    async def fail(number):
+        raise ValueError(number)
+
+    with pytest.raises(ValueError):
+        run(F(fail).map(range(5)))
+
+
+def test_ajuxt_gathers_concurrently():
+    async def slow(number):
+        await asyncio.sleep(0.05)
+        return number
+
+    loop = asyncio.new_event_loop()
+    start = loop.time()
+    result = loop.run_until_complete(ajuxt(slow, slow, increment)(1))
+    elapsed = loop.time() - start
+    loop.close()
+    assert result == [1, 1, 2]
+    assert elapsed < 0.1
+
+
+def test_aduxt():
+    assert run((aduxt(double=double, plus=increment) | dict)(2)) == {
+        "double": 4,
+        "plus": 3,
+    }
+
+
+@pytest.mark.parametrize(
+    "func,arg",
+    [
+        (F(increment) | double, 1),
+        (F(range) - double < is_even, 4),
+        (ajuxt(double, increment), 2),
+        (aduxt(double=double), 2),
+    ],
+)
+def test_async_expressions_pickle(func, arg):
+    unpickled = pickle.loads(pickle.dumps(func))
+    assert repr(unpickled) == repr(func)
+    assert run(unpickled(arg)) == run(func(arg))
+
+
+@pytest.mark.parametrize(
+    "method",
+    [
+        lambda func: func.compile(),
+        lambda func: func.pmap(),
+        lambda func: func.tmap(),
+        lambda func: func.treduce(operator.add),
+        lambda func: F(operator.add).treduce(func),
+        lambda func: func.batched(2),
+        lambda func: func.staged(2),
+        lambda func: func.instrument(Profile()),
+    ],
+)
+def test_synchronous_strategies_reject_coroutine_functions(method):
+    with pytest.raises(TypeError):
+        method(F(double))
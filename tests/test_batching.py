@@ -0,0 +1,58 @@
+from itertools import count, islice
+import pickle
+
+import pytest
+
+from fungebra import F
+from fungebra.functions import batchwise
+
+
+def increment(number):
+    return number + 1
+
+
+def double(number):
+    return number * 2
+
+
+def doubles(chunk):
+    return [number * 2 for number in chunk]
+
+
+def test_batched_maps_like_map():
+    func = (F(increment) | double).batched(3)
+    assert list(func(range(10))) == list((F(increment) | double).map(range(10)))
+
+
+def test_batchwise_stages_receive_whole_chunks():
+    sizes = []
+
+    def record(chunk):
+        sizes.append(len(chunk))
+        return chunk
+
+    func = (F(increment) | batchwise(record) | double).batched(4)
+    assert list(func(range(10))) == [2 * (n + 1) for n in range(10)]
+    assert sizes == [4, 4, 2]
+
+
+def test_batchwise_stages_may_return_iterators():
+    func = batchwise(lambda chunk: map(double, chunk)) | batchwise(doubles)
+    assert list(func.batched(2)([1, 2, 3])) == [4, 8, 12]
+
+
+def test_batched_consumes_unbounded_iterators_lazily():
+    results = F(double).batched(100)(count())
+    assert list(islice(results, 5)) == [0, 2, 4, 6, 8]
+
+
+def test_batched_rejects_invalid_size():
+    with pytest.raises(ValueError):
+        F(double).batched(0)
+
+
+def test_batched_pickles():
+    func = (F(increment) | batchwise(doubles)).batched(2)
+    unpickled = pickle.loads(pickle.dumps(func))
+    assert repr(unpickled) == repr(func)
+    assert list(unpickled(range(3))) == [2, 4, 6]
@@ -0,0 +1,18 @@
+import pytest
+
+from benchmarks.__main__ import compare
+from benchmarks.cases import CASES
+
+
+@pytest.mark.parametrize(
+    "case", CASES, ids=[f"{case.group}/{case.name}" for case in CASES]
+)
+def test_benchmark_case_matches_its_baseline(case):
+    assert case.build()(*case.args) == case.baseline(*case.args)
+
+
+def test_compare_reports_regressions_over_threshold():
+    previous = {"results": [{"group": "g", "name": "n", "call_ns": 100.0}]}
+    results = [{"group": "g", "name": "n", "call_ns": 130.0}]
+    assert compare(results, previous, 1.2) == ["g/n: 100ns -> 130ns"]
+    assert not compare(results, previous, 1.5)
@@ -0,0 +1,114 @@
+from enum import IntEnum
+import operator
+import pickle
+from types import SimpleNamespace
+
+import pytest
+
+from fungebra import F, Function, pipeline
+from fungebra.functions import (
+    attrgetter,
+    constantly,
+    equals,
+    fnot,
+    iffy,
+    itemgetter,
+    less,
+    methodcaller,
+)
+
+
+def increment(number):
+    return number + 1
+
+
+def even(number):
+    return not number % 2
+
+
+class Color(IntEnum):
+    RED = 1
+    GREEN = 2
+
+
+KEYWORDS = SimpleNamespace(**{"class": 1, "if": lambda: 2})
+
+
+def test_compiled_expression_is_a_function():
+    compiled = (F(increment) | str).compile()
+    assert isinstance(compiled, Function)
+    assert (compiled | int)(1) == 2
+
+
+def test_compiled_pipeline_inlines_known_stages():
+    func = itemgetter("age") | fnot(less(3))
+    compiled = func.compile()
+    assert "_a['age']" in compiled.func.source
+    assert "(3 > " in compiled.func.source
+    assert [compiled({"age": age}) for age in range(5)] == [
+        False,
+        False,
+        False,
+        True,
+        True,
+    ]
+
+
+@pytest.mark.parametrize(
+    "func,arg",
+    [
+        (F(increment).map.filter(even) | list, [1, 2, 3]),
+        (F(increment).map.filter(even).reduce(operator.add), [1, 2, 3]),
+        (-F(increment) > operator.add, [1, 2, 3]),
+        (F(sorted) >> {"key": operator.neg}, [1, 3, 2]),
+        (F(sorted) << {"key": operator.neg}, [1, 3, 2]),
+        (iffy(less(0), constantly(0)).lmap, [-1, 2, 4]),
+        (F(len).collect | str, (1, 2)),
+        (F(operator.add).expand | str, (1, 2)),
+        (attrgetter("real") | increment, 1),
+        (attrgetter("imag", None) | str, 1),
+        (methodcaller("split", "2"), "123"),
+        (pipeline(str, F(operator.itemgetter(0, -1)), "".join), 1234),
+        (F(int).map.filter(equals(Color.RED)) | list, ["1", "2"]),
+        (attrgetter("class"), KEYWORDS),
+        (methodcaller("if"), KEYWORDS),
+        (F(dict).partial(**{"lambda": 1}), [("a", 0)]),
+        (F(dict).rpartial(**{"lambda": 1}), [("a", 0)]),
+    ],
+)
+def test_compiled_expression_matches_original(func, arg):
+    assert func.compile()(arg) == func(arg)
+
+
+def test_overridden_keywords_match_original():
+    def keywords(value, **kwargs):
+        return value, kwargs
+
+    func = F(keywords).partial(x=1, y=2).rpartial(x=3)
+    assert func.compile()(0) == func(0) == (0, {"x": 3, "y": 2})
+
+
+@pytest.mark.parametrize(
+    "func", [operator.methodcaller("upper"), methodcaller("upper")]
+)
+def test_method_callers_without_keywords_are_inlined(func):
+    compiled = F(func).compile()
+    assert ".upper()" in compiled.func.source
+    assert compiled("a") == "A"
+
+
+def test_compiled_reduce_of_empty_iterable_raises():
+    with pytest.raises(TypeError):
+        (-F(increment) > operator.add).compile()([])
+
+
+def test_compiled_expression_falls_back_for_multiple_arguments():
+    compiled = (F(operator.add) | increment).compile()
+    assert compiled(1, 2) == 4
+
+
+def test_compiled_expression_pickles():
+    compiled = (itemgetter("age") | fnot(less(3))).compile()
+    unpickled = pickle.loads(pickle.dumps(compiled))
+    assert unpickled.func.source == compiled.func.source
+    assert unpickled({"age": 4}) is True
@@ -1,30 +1,49 @@
+import asyncio
 from collections import namedtuple
 import functools
-from itertools import chain
+import io
+from itertools import chain, count
 import json
+import operator
+import pickle
 
 import pytest
 
+from fungebra import F
+import fungebra.caching
 from fungebra.functions import (
     attrgetter,
     caller,
+    catting,
     collect,
     constantly,
+    deduping,
+    distinct,
+    dropping,
     duxt,
     equals,
     expand,
+    filtering,
     fnot,
     greater,
     identity,
     iffy,
+    into,
     is_,
     itemgetter,
     juxt,
     less,
+    mapping,
+    memoize,
     methodcaller,
+    partitioning,
     raiser,
+    reduced,
     suppress,
     taker,
+    taking,
+    taking_while,
+    transduce,
 )
 
 
@@ -118,6 +137,25 @@ class TestItemGetter:
     def test_itemgetter_returns_default_with_no_key():
         assert itemgetter("foo", None)({"bar": "baz"}) is None
 
+    @staticmethod
+    def test_itemgetter_without_default_uses_builtin_getter():
+        assert isinstance(itemgetter("foo").func, operator.itemgetter)
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "getter", [itemgetter(["foo", "bar"]), itemgetter(["foo", "bar"], 0)]
+    )
+    def test_itemgetter_with_multiple_keys(getter):
+        assert getter({"foo": 1, "bar": 2}) == (1, 2)
+
+    @staticmethod
+    def test_itemgetter_with_multiple_keys_and_default():
+        assert itemgetter(["foo", "bar"], None)({"bar": 2}) == (None, 2)
+
+    @staticmethod
+    def test_itemgetter_with_single_key_list_returns_tuple():
+        assert itemgetter(["foo"])({"foo": 1}) == (1,)
+
 
 class TestAttrGetter:
     @staticmethod
@@ -137,6 +175,23 @@ class TestAttrGetter:
     def test_attrgetter_returns_default_with_no_key():
         assert attrgetter("map", None)(functools) is None
 
+    @staticmethod
+    @pytest.mark.parametrize(
+        "getter",
+        [attrgetter("reduce.__name__"), attrgetter("reduce.__name__", None)],
+    )
+    def test_attrgetter_with_dotted_path(getter):
+        assert getter(functools) == "reduce"
+
+    @staticmethod
+    def test_attrgetter_with_dotted_path_returns_default():
+        assert attrgetter("reduce.missing", None)(functools) is None
+
+    @staticmethod
+    def test_attrgetter_with_multiple_attributes():
+        getter = attrgetter(["reduce", "partial.__name__"])
+        assert getter(functools) == (functools.reduce, "partial")
+
 
 def test_methodcaller():
     assert methodcaller("split", "2")("123") == ["1", "3"]
@@ -166,3 +221,279 @@ class TestRaiser:
 def test_suppress():
     validate = iffy(equals(2), raiser(ValueError))
     assert suppress(ValueError)(validate).lmap([1, 2, 3]) == [1, None, 3]
+
+
+class TestSafeMapAndFilter:
+    @staticmethod
+    def test_skip_policy_drops_failed_elements():
+        assert list(F(int).safe_map()(["1", "x", "3"])) == [1, 3]
+
+    @staticmethod
+    def test_default_policy_replaces_failed_elements():
+        parse = F(int).safe_map("default", ValueError, default=0)
+        assert list(parse(["1", "x"])) == [1, 0]
+
+    @staticmethod
+    def test_collect_policy_records_failures():
+        errors = []
+        parse = F(int).safe_map("collect", errors=errors) | list
+        assert parse(["1", "x"]) == [1]
+        assert len(errors) == 1
+        item, exception = errors[0]
+        assert item == "x"
+        assert isinstance(exception, ValueError)
+
+    @staticmethod
+    def test_whole_mapped_pipeline_is_guarded():
+        errors = []
+        func = (F(str.strip) | int | _half).safe_map("collect", errors=errors)
+        assert list(func([" 4", None, "x"])) == [2]
+        assert [failure.item for failure in errors] == [None, "x"]
+
+    @staticmethod
+    def test_multiple_iterables_are_guarded_as_tuples():
+        errors = []
+        func = F(pow).safe_map(errors=errors)
+        assert list(func([2, 3], [2, "a"])) == [4]
+        assert errors[0].item == (3, "a")
+
+    @staticmethod
+    def test_unhandled_exceptions_propagate():
+        with pytest.raises(TypeError):
+            list(F(int).safe_map(exception_classes=ValueError)([None]))
+
+    @staticmethod
+    def test_safe_filter_policies():
+        errors = []
+        check = F(int)
+        assert list(check.safe_filter()(["1", "x", "0"])) == ["1"]
+        keep = check.safe_filter("default", default=True, errors=errors)
+        assert list(keep(["1", "x", "0"])) == ["1", "x"]
+        assert len(errors) == 1
+
+    @staticmethod
+    def test_invalid_policies_raise():
+        with pytest.raises(ValueError):
+            F(int).safe_map("ignore")
+        with pytest.raises(ValueError):
+            F(int).safe_map("collect")
+
+
+def _half(number):
+    return number / 2
+
+
+@pytest.mark.parametrize(
+    "func,arg",
+    [
+        (collect(sum), 1),
+        (expand(max), (1, 3, 2)),
+        (caller(2) | str, abs),
+        (constantly(1), None),
+        (juxt(str, _half) | list, 4),
+        (duxt(text=str, half=_half) | dict, 4),
+        (is_(None), None),
+        (equals(2), 2),
+        (fnot(less(2)), 1),
+        (greater(2), 3),
+        (itemgetter("foo"), {"foo": 1}),
+        (itemgetter("foo", None), {}),
+        (attrgetter("real"), 1),
+        (attrgetter("foo", None), 1),
+        (methodcaller("split", "2"), "123"),
+        (taker(less(3)) | list, range(6)),
+        (iffy(less(0), constantly(0)), -1),
+        (suppress(ValueError)(raiser(ValueError, "message")), 1),
+        (memoize(maxsize=2)(_half), 4),
+        (F(_half).safe_map("default") | list, [2, None]),
+    ],
+)
+def test_combinators_pickle(func, arg):
+    unpickled = pickle.loads(pickle.dumps(func))
+    assert repr(unpickled) == repr(func)
+    assert unpickled(arg) == func(arg)
+
+
+def test_compositions_of_combinators_pickle():
+    greater_or_equal = pickle.loads(pickle.dumps(less | fnot))
+    assert greater_or_equal(2).lmap([1, 2, 3]) == [False, True, True]
+
+
+def test_raiser_pickles():
+    with pytest.raises(ValueError, match="message"):
+        pickle.loads(pickle.dumps(raiser(ValueError, "message")))()
+
+
+class TestMemoize:
+    @staticmethod
+    def counting(function):
+        calls = []
+
+        def counted(*args, **kwargs):
+            calls.append(args)
+            return function(*args, **kwargs)
+
+        return counted, calls
+
+    def test_memoize_caches_results(self):
+        func, calls = self.counting(lambda x: x * 2)
+        memoized = memoize()(func)
+        assert memoized.lmap([1, 2, 1, 1]) == [2, 4, 2, 2]
+        assert calls == [(1,), (2,)]
+        assert memoized.cache_info() == (2, 2, 2)
+
+    def test_memoize_accepts_unhashable_arguments(self):
+        func, calls = self.counting(len)
+        memoized = memoize()(func)
+        assert memoized({"a": [1, 2]}) == memoized({"a": [1, 2]}) == 1
+        assert memoized([1, 2]) == memoized((1, 2)) == 2
+        assert calls == [({"a": [1, 2]},), ([1, 2],), ((1, 2),)]
+
+    def test_memoize_with_key_function(self):
+        func, calls = self.counting(itemgetter("name"))
+        memoized = itemgetter("user") | memoize(key=itemgetter("id"))(func)
+        assert memoized({"user": {"id": 1, "name": "a"}}) == "a"
+        assert memoized({"user": {"id": 1, "name": "b"}}) == "a"
+        assert len(calls) == 1
+
+    @pytest.mark.parametrize("policy,evicted", [("lru", 2), ("fifo", 1)])
+    def test_memoize_eviction_policy(self, policy, evicted):
+        func, calls = self.counting(identity)
+        memoized = memoize(maxsize=2, policy=policy)(func)
+        memoized.lmap([1, 2, 1, 3])
+        del calls[:]
+        memoized(evicted)
+        assert calls == [(evicted,)]
+
+    def test_memoize_entries_expire(self, monkeypatch):
+        now = [0.0]
+        monkeypatch.setattr(fungebra.caching, "monotonic", lambda: now[0])
+        func, calls = self.counting(identity)
+        memoized = F(func).memoize(ttl=10)
+        memoized(1)
+        now[0] = 5.0
+        memoized(1)
+        now[0] = 10.0
+        memoized(1)
+        assert len(calls) == 2
+
+    def test_memoize_thread_safe(self):
+        memoized = F(operator.neg).memoize(maxsize=10, thread_safe=True)
+        assert list(memoized.tmap(workers=4)(range(100))) == [
+            -value for value in range(100)
+        ]
+        assert memoized.cache_info().currsize == 10
+
+    def test_memoize_cache_clear(self):
+        memoized = memoize()(operator.neg)
+        memoized(1)
+        memoized.cache_clear()
+        assert memoized.cache_info() == (0, 0, 0)
+
+    def test_memoize_separates_keyword_arguments(self):
+        func, calls = self.counting(lambda *args, **kwargs: (args, kwargs))
+        memoized = memoize()(func)
+        assert memoized(1, a=1) == ((1,), {"a": 1})
+        assert memoized((1,), frozenset({("a", 1)})) == (
+            ((1,), frozenset({("a", 1)})),
+            {},
+        )
+        assert len(calls) == 2
+
+    def test_memoize_caches_awaited_results(self):
+        calls = []
+
+        async def fetch(value):
+            calls.append(value)
+            return value * 2
+
+        memoized = F(fetch).memoize()
+        assert memoized.asynchronous
+
+        async def fetch_twice():
+            return [await memoized(1), await memoized(1)]
+
+        loop = asyncio.new_event_loop()
+        try:
+            assert loop.run_until_complete(fetch_twice()) == [2, 2]
+        finally:
+            loop.close()
+        assert calls == [1]
+        assert memoized.cache_info() == (1, 1, 1)
+
+    def test_memoize_rejects_invalid_options(self):
+        with pytest.raises(ValueError):
+            F(identity).memoize(maxsize=0)
+        with pytest.raises(ValueError):
+            F(identity).memoize(policy="random")
+
+
+class TestTransducers:
+    def test_transducers_compose_in_data_order(self):
+        xform = mapping(str) + filtering(str.isdigit)
+        assert into(list, xform)([1, "a", 2]) == ["1", "2"]
+
+    def test_transducers_run_in_single_pass(self):
+        seen = []
+        xform = mapping(seen.append) + taking(2)
+        into(list, xform)(range(10))
+        assert seen == [0, 1]
+
+    def test_taking_stops_unbounded_input(self):
+        assert into(list, taking(3))(count()) == [0, 1, 2]
+
+    def test_taking_while(self):
+        assert into(list, taking_while(less(3)))(count()) == [0, 1, 2]
+
+    def test_dropping(self):
+        assert into(list, dropping(2))(range(4)) == [2, 3]
+
+    def test_deduping_and_distinct(self):
+        assert into(list, deduping)([1, 1, 2, 1]) == [1, 2, 1]
+        assert into(list, distinct())([1, 1, 2, 1]) == [1, 2]
+        assert into(list, distinct(abs))([1, -1, 2]) == [1, 2]
+
+    def test_partitioning_flushes_last_partition(self):
+        assert into(list, partitioning(2))(range(5)) == [[0, 1], [2, 3], [4]]
+
+    def test_partitioning_before_taking(self):
+        xform = partitioning(2) + taking(2)
+        assert into(list, xform)(count()) == [[0, 1], [2, 3]]
+
+    def test_catting(self):
+        assert into(tuple, catting)([[1], [], [2, 3]]) == (1, 2, 3)
+
+    @pytest.mark.parametrize(
+        "target,xform,expected",
+        [
+            (set, mapping(abs), {1, 2}),
+            (dict, mapping(juxt(abs, identity) | tuple), {1: -1, 2: 2}),
+            (tuple, mapping(abs), (1, 1, 2)),
+        ],
+    )
+    def test_into_collections(self, target, xform, expected):
+        assert into(target, xform)([1, -1, 2]) == expected
+
+    def test_transduce_into_reducer(self):
+        assert transduce(mapping(len), operator.add, 0)(["a", "bc"]) == 3
+
+    def test_transduce_into_writer(self):
+        output = io.StringIO()
+        write = transduce(
+            mapping(str) + mapping("{}\n".format),
+            lambda file, line: file.write(line) and file,
+            output,
+        )
+        write([1, 2])
+        assert output.getvalue() == "1\n2\n"
+
+    def test_reducer_may_stop_early(self):
+        def first_over(limit):
+            return lambda acc, item: reduced(item) if item > limit else acc
+
+        assert transduce(identity, first_over(2), None)(count()) == 3
+
+    def test_transducers_pickle(self):
+        xform = mapping(abs) + filtering(less(3)) + partitioning(2)
+        func = pickle.loads(pickle.dumps(into(list, xform)))
+        assert func([-1, 2, 5, -2]) == [[1, 2], [2]]
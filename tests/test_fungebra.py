@@ -1,9 +1,14 @@
 # False positive on overloaded operators.
 # pylint: disable=comparison-with-callable
 from collections import namedtuple
+import functools
 import operator
+import pickle
+
+import pytest
 
 from fungebra import Args, F, Function, identity, pipeline
+from fungebra.functions import constantly
 
 
 def add(*args):
@@ -88,6 +93,25 @@ class TestPartialApplication:
         func = F(sorted) >> Args([1, 2, 3], key=operator.neg)
         assert func() == [3, 2, 1]
 
+    @staticmethod
+    def test_stacked_rpartials_are_merged():
+        func = F(pow).rpartial(5).rpartial(2)
+        assert func.func.func is pow
+        assert func.func.args == (2, 5)
+        assert func(3) == 4
+
+    @staticmethod
+    def test_stacked_rpartials_with_keywords_are_merged():
+        func = F(sorted).rpartial(key=operator.neg).rpartial(reverse=True)
+        assert func.func.func is sorted
+        assert func([3, 1, 2]) == [1, 2, 3]
+
+    @staticmethod
+    def test_empty_partial_application_returns_self():
+        func = F(add)
+        assert func.partial() is func
+        assert func.rpartial() is func
+
 
 class TestFunctionComposition:
     @staticmethod
@@ -135,6 +159,52 @@ class TestFunctionComposition:
         double_sum = double ** F(sum)
         assert double_sum([1, 2, 3]) == 12
 
+    @staticmethod
+    def test_nested_compositions_are_flattened():
+        func = (F(increment) | double) | (F(increment) | double)
+        assert len(func.func.stages) == 4
+        assert func(0) == 6
+
+    @staticmethod
+    def test_identity_stages_are_dropped():
+        func = identity | F(increment) | identity | double
+        assert func.func.stages == (increment, double)
+
+    @staticmethod
+    def test_pure_stages_after_a_constant_are_folded():
+        func = F(add) | constantly("abc") | len | operator.neg
+        assert func.func.stages[-1].const == -3
+        assert len(func.func.stages) == 2
+        assert func(1, 2) == -3
+
+    @staticmethod
+    def test_impure_or_mutable_stages_are_not_folded():
+        func = constantly("ab") | F(list) | len
+        assert func.func.stages[1:] == (list, len)
+        assert func() == 2
+
+    @staticmethod
+    def test_stages_after_a_mutable_constant_are_not_folded():
+        values = []
+        func = constantly(values) | len
+        values.append(1)
+        assert func() == 1
+
+    @staticmethod
+    def test_raising_stages_are_not_folded():
+        func = constantly("a") | F(int)
+        with pytest.raises(ValueError):
+            func()
+
+    @staticmethod
+    def test_long_composition_does_not_recurse():
+        func = functools.reduce(operator.or_, [F(increment)] * 5000)
+        assert func(0) == 5000
+
+    @staticmethod
+    def test_long_pipeline_does_not_recurse():
+        assert pipeline(*[increment] * 5000)(0) == 5000
+
 
 class TestMapFilterReduce:
     @staticmethod
@@ -210,6 +280,39 @@ def test_hash_of_wrapped_function_is_the_same():
     assert hash(F(sum)) == hash(sum)
 
 
+class TestWrapperMetadata:
+    @staticmethod
+    def test_metadata_is_copied_from_wrapped_function():
+        assert F(increment).__name__ == "increment"
+        assert F(increment).__wrapped__ is increment
+
+    @staticmethod
+    def test_metadata_is_looked_up_lazily_for_internal_functions():
+        function = Function.wrap(increment)
+        assert not vars(function)
+        assert function.__name__ == "increment"
+        assert function.__qualname__ == "increment"
+        assert function.__doc__ is None
+        assert function.__wrapped__ is increment
+
+    @staticmethod
+    def test_class_docstring_is_unaffected():
+        assert Function.__doc__ == "Function wrapper with composition methods."
+
+    @staticmethod
+    def test_missing_attributes_raise_attribute_error():
+        with pytest.raises(AttributeError):
+            _ = Function.wrap(increment).missing
+
+    @staticmethod
+    def test_operators_do_not_copy_metadata():
+        assert not vars(F(increment) | double)
+
+    @staticmethod
+    def test_args_are_slotted():
+        assert not hasattr(Args(1, key=2), "__dict__")
+
+
 def test_repr_of_wrapped_function_is_as_expected():
     assert repr(F(sum)) == "Function(<built-in function sum>)"
 
@@ -283,3 +386,8 @@ def test_requests_example():
     )
 
     assert get_total_record_values("/posts") == 45
+
+
+def test_function_expressions_pickle():
+    func = (F(add) >> (1,)).map.filter(even).reduce(operator.add) | increment
+    assert pickle.loads(pickle.dumps(func))([1, 2, 3]) == func([1, 2, 3])
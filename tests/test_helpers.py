@@ -1,6 +1,9 @@
 import operator as original_operator
 
+import pytest
+
 from fungebra import operator, F, ModuleWrapper
+from fungebra.helpers import cache_key, structure
 
 
 def test_that_operator_module_functions_are_reexported():
@@ -14,3 +17,63 @@ def test_can_access_wrapped_object():
 
 def test_default_module_wrapper_does_not_decorate():
     assert not isinstance(ModuleWrapper(original_operator).add, F)
+
+
+def test_module_wrapper_returns_same_decorated_object():
+    first = operator.add
+    assert operator.add is first
+
+
+def test_module_wrapper_reports_cache_statistics():
+    wrapper = ModuleWrapper(original_operator, F)
+    _ = wrapper.add, wrapper.add, wrapper.sub
+    assert wrapper.cache_info() == (1, 2, 2)
+    wrapper.cache_clear()
+    assert wrapper.cache_info() == (0, 0, 0)
+
+
+def test_eager_module_wrapper_decorates_public_attributes_up_front():
+    wrapper = ModuleWrapper(original_operator, F, eager=True)
+    hits, misses, currsize = wrapper.cache_info()
+    assert hits == 0 and misses == currsize > 0
+    assert isinstance(wrapper.add, F)
+    assert wrapper.cache_info().hits == 1
+
+
+def test_missing_attributes_are_not_cached():
+    wrapper = ModuleWrapper(original_operator, F)
+    with pytest.raises(AttributeError):
+        _ = wrapper.missing
+    assert wrapper.cache_info().currsize == 0
+
+
+def test_equivalent_expressions_are_equal_and_hash_equal():
+    first = F(original_operator.itemgetter("x")) | int | operator.neg
+    second = F(original_operator.itemgetter("x")) | int | operator.neg
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first != F(original_operator.itemgetter("y")) | int | operator.neg
+
+
+def test_structure_distinguishes_equal_values_of_other_types():
+    assert structure(operator.pow.rpartial(1)) != structure(
+        operator.pow.rpartial(True)
+    )
+    assert F(len).partial(1) != F(len).partial(2)
+    assert F(len).partial(0.0) != F(len).partial(-0.0)
+
+
+def test_expressions_with_mutable_arguments_compare_by_identity():
+    first = F(original_operator.add) << ([1], {"a": 1})
+    assert first == first  # pylint: disable=comparison-with-itself
+    assert hash(first) == hash(first)
+    assert first != F(original_operator.add) << ([1], {"a": 1})
+    assert cache_key(first) is None
+    assert cache_key(F(original_operator.add) << (1,)) is not None
+
+
+def test_expressions_with_arrays_compare_without_raising():
+    numpy = pytest.importorskip("numpy")
+    first = F(original_operator.add) << (numpy.arange(3),)
+    assert first == first  # pylint: disable=comparison-with-itself
+    assert first != F(original_operator.add) << (numpy.arange(3),)
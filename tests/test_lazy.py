@@ -0,0 +1,147 @@
+# False positive on overloaded operators.
+# pylint: disable=comparison-with-callable
+import operator
+import pickle
+
+import pytest
+
+import fungebra.lazy
+from fungebra import F, Args
+from fungebra.functions import constantly, itemgetter, less
+from fungebra.lazy import Lazy, cache_clear, cache_info, intern, lazy
+
+
+def increment(number):
+    return number + 1
+
+
+def double(number):
+    return number * 2
+
+
+def even(number):
+    return not number % 2
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache_clear()
+    yield
+    cache_clear()
+
+
+@pytest.mark.parametrize(
+    "build,arg",
+    [
+        (lambda f: f(increment) | double, 1),
+        (lambda f: f(increment) + double, 1),
+        (lambda f: double + f(increment), 1),
+        (lambda f: f(increment) ** double, 1),
+        (lambda f: increment ** f(double), 1),
+        (lambda f: f(increment).compose(double, abs), -1),
+        (lambda f: f(operator.sub) << (10,), 3),
+        (lambda f: f(operator.sub) >> (10,), 3),
+        (lambda f: f(sorted) << {"key": operator.neg} | list, [1, 3, 2]),
+        (lambda f: -f(increment) | list, [1, 2]),
+        (lambda f: f(sorted) - increment | list, [2, 1]),
+        (lambda f: (f(sorted) < even) | list, [1, 2, 4]),
+        (lambda f: (f(increment) <= even) | list, [1, 2, 3]),
+        (lambda f: f(sorted) > operator.add, [1, 2, 3]),
+        (lambda f: f(double) >= operator.add, [1, 2, 3]),
+        (lambda f: f(increment).lmap, [1, 2]),
+        (lambda f: f(sum).collect, 1),
+        (lambda f: f(max).expand, (1, 3, 2)),
+    ],
+)
+def test_lazy_operators_match_eager_operators(build, arg):
+    expression = build(lazy)
+    assert isinstance(expression, Lazy)
+    assert expression(arg) == build(F)(arg)
+
+
+def test_operators_only_record_nodes():
+    expression = lazy(increment) | double | str
+    assert expression.op == "pipe"
+    assert expression.args == (Lazy("wrap", (increment,)), double, str)
+
+
+def test_value_piped_into_lazy_expression_is_applied():
+    assert 1 | (lazy(increment) | double) == 4
+    assert Args(1) | lazy(increment) == 2
+
+
+def test_expression_is_built_once_and_cached_by_structure():
+    def handler(record):
+        pipeline = lazy(itemgetter("x")) - increment > operator.add
+        return pipeline(record)
+
+    assert handler({"x": [1, 2]}) == 5
+    assert handler({"x": [3]}) == 4
+    # The first build misses both the lazy and the interned expression.
+    assert cache_info() == (1, 2, 2)
+
+
+def test_explicit_build_returns_optimised_function():
+    expression = lazy(increment).map.filter(even) | list
+    built = expression.build()
+    assert isinstance(built, F)
+    assert expression.build() is built
+    assert built([1, 2, 3]) == [2, 4]
+
+
+def test_unhashable_arguments_are_built_without_caching():
+    expression = lazy(operator.add) << ([1],)
+    assert expression([2]) == [1, 2]
+    assert cache_info().currsize == 0
+
+
+def test_least_recently_used_expressions_are_evicted(monkeypatch):
+    monkeypatch.setattr(fungebra.lazy, "MAXSIZE", 2)
+    first, second, third = (F(operator.add) << (number,) for number in "abc")
+    interned = first.intern()
+    evicted = second.intern()
+    assert first.intern() is interned
+    third.intern()
+    assert first.intern() is interned
+    assert second.intern() is not evicted
+    assert cache_info().currsize == 2
+
+
+def test_long_lazy_chains_are_flat():
+    expression = lazy(increment)
+    for _ in range(5000):
+        expression = expression | increment
+    assert len(expression.args) == 5001
+    assert expression(0) == 5001
+
+
+def test_function_lazy_property():
+    assert (F(increment).lazy | double)(1) == 4
+
+
+def test_lazy_expressions_pickle():
+    expression = lazy(increment) | double
+    assert pickle.loads(pickle.dumps(expression))(1) == 4
+
+
+def test_structurally_equal_expressions_are_interned_once():
+    first = intern(itemgetter("a") | less(3))
+    assert first is (itemgetter("a") | less(3)).intern()
+    assert first is not intern(itemgetter("a") | less(4))
+    assert first({"a": 2}) is True
+
+
+def test_lazy_builds_are_interned():
+    built = (lazy(itemgetter("a")) | less(3)).build()
+    assert built is intern(itemgetter("a") | less(3))
+
+
+def test_expressions_with_mutable_arguments_are_not_interned():
+    first = intern(F(operator.add) << ([1],))
+    assert first is not intern(F(operator.add) << ([1],))
+    assert first([2]) == [1, 2]
+
+
+def test_signed_zeros_are_interned_apart():
+    assert str(constantly(0.0).intern()(None)) == "0.0"
+    assert str(constantly(-0.0).intern()(None)) == "-0.0"
@@ -0,0 +1,152 @@
+# False positive on overloaded operators.
+# pylint: disable=comparison-with-callable
+from enum import IntEnum
+import operator
+
+import pytest
+
+from fungebra import F
+from fungebra.combinators import Shared
+from fungebra.compiler import Compiled
+from fungebra.functions import duxt, equals, itemgetter, juxt
+from fungebra.nodes import Compose, Map
+from fungebra.optimize import fuse, optimize, share
+from fungebra.profiling import Profile, instrument
+from fungebra.vectorize import vectorize
+
+
+def increment(number):
+    return number + 1
+
+
+def double(number):
+    return number * 2
+
+
+def even(number):
+    return not number % 2
+
+
+class Color(IntEnum):
+    RED = 1
+    GREEN = 2
+
+
+def test_map_filter_reduce_chain_is_fused_into_one_stage():
+    func = F(increment).map.filter(even).reduce(operator.add)
+    fused = fuse(func)
+    assert isinstance(fused, Compose)
+    assert len(fused.stages) == 1
+    assert isinstance(fused.stages[0], Compiled)
+    assert fused([1, 2, 3]) == func([1, 2, 3]) == 6
+
+
+def test_adjacent_maps_are_fused_after_leading_stage():
+    func = F(sorted) - increment - double | list
+    fused = fuse(func)
+    assert len(fused.stages) == 3
+    assert fused([3, 2, 1]) == [4, 6, 8]
+
+
+def test_single_map_stage_is_left_alone():
+    func = F(sorted) - increment
+    assert isinstance(fuse(func).stages[-1], Map)
+
+
+def test_nested_chains_are_fused():
+    func = (F(increment).map.filter(even) | list).map | list
+    fused = fuse(func)
+    assert isinstance(fused.stages[0].func.stages[0], Compiled)
+    assert fused([[1, 2], [3]]) == [[2], [4]]
+
+
+@pytest.mark.parametrize(
+    "func",
+    [
+        (-F(increment) < even) > operator.add,
+        F(double).map.filter(even).filter(F(operator.lt) << (2,)) | list,
+        (F(increment) <= even) | list,
+        F(int).map.filter(equals(Color.RED)) | list,
+    ],
+)
+def test_optimized_function_matches_original(func):
+    assert func.optimize()(range(1, 8)) == func(range(1, 8))
+
+
+def test_fused_reduce_of_empty_iterable_raises():
+    with pytest.raises(TypeError):
+        fuse(-F(increment) > operator.add)([])
+
+
+def test_shared_juxt_prefixes_are_evaluated_once():
+    calls = []
+
+    def parse(value):
+        calls.append(value)
+        return int(value)
+
+    func = juxt(
+        itemgetter("x") | F(parse) | double,
+        itemgetter("x") | F(parse) | increment,
+        itemgetter("y"),
+    )
+    shared = share(func)
+    assert isinstance(shared, Shared)
+    assert len(shared.prefixes) == 1
+    assert list(shared({"x": "3", "y": 1})) == [6, 4, 1]
+    assert calls == ["3"]
+
+
+def test_shared_duxt_prefixes_keep_names():
+    func = duxt(
+        a=itemgetter("x") | F(str) | len,
+        b=itemgetter("x") | F(str),
+    )
+    assert dict(share(func)({"x": 123})) == {"a": 3, "b": "123"}
+
+
+def test_juxt_without_shared_prefixes_is_unchanged():
+    func = juxt(F(increment) | double, F(double) | increment)
+    assert share(func) == func.func
+
+
+def test_branches_with_distinct_mutable_arguments_are_not_shared():
+    first, second = [1], [1]
+    func = juxt(
+        F(operator.add) << (first,) | len,
+        F(operator.add) << (second,) | sum,
+    )
+    shared = share(func)
+    assert not isinstance(shared, Shared)
+    second.append(2)
+    assert list(shared([0])) == [2, 3]
+
+
+def test_prefixes_returning_iterators_are_not_shared():
+    func = juxt(F(increment).map | list, F(increment).map | sum)
+    assert not isinstance(share(func), Shared)
+    assert tuple(func.optimize()([1, 2])) == ([2, 3], 5)
+
+
+def test_shared_prefixes_returning_iterators_are_evaluated_per_branch():
+    func = juxt(F(iter) | list, F(iter) | sum)
+    assert isinstance(share(func), Shared)
+    assert tuple(share(func)([1, 2])) == ([1, 2], 3)
+
+
+def test_optimize_shares_prefixes_in_nested_expressions():
+    func = F(list) | juxt(F(sum) | double, F(sum) | increment) | list
+    optimized = func.optimize()
+    assert isinstance(optimized.func.stages[1], Shared)
+    assert optimized([1, 2]) == func([1, 2]) == [6, 4]
+
+
+@pytest.mark.parametrize(
+    "transform",
+    [optimize, vectorize, lambda func: instrument(func, Profile())],
+)
+def test_transforms_keep_memoized_caches(transform):
+    memoized = F(double).memoize()
+    transformed = transform(F(increment).map - memoized | list)
+    assert transformed([1, 1]) == [4, 4]
+    assert memoized.cache_info() == (1, 1, 1)
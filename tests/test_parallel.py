@@ -0,0 +1,188 @@
+import operator
+import pickle
+import threading
+import time
+
+import pytest
+
+from fungebra import F
+from fungebra.functions import duxt, fnot, itemgetter, juxt, less
+from fungebra.parallel import ParallelMap, chunks, executor
+
+
+def increment(number):
+    return number + 1
+
+
+def double(number):
+    return number * 2
+
+
+def slow_identity(value):
+    time.sleep(0.01 * (value % 3))
+    return value
+
+
+def test_chunks_split_lazily():
+    assert list(chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_executors_are_shared():
+    assert executor("thread", 2) is executor("thread", 2)
+
+
+def test_unknown_executor_kind_raises():
+    with pytest.raises(ValueError):
+        ParallelMap(increment, kind="fibre")
+
+
+@pytest.mark.parametrize("chunksize", [1, 3])
+def test_thread_map_preserves_order(chunksize):
+    func = F(slow_identity).tmap(workers=4, chunksize=chunksize) | list
+    assert func(range(10)) == list(range(10))
+
+
+def test_process_map_runs_composed_function():
+    func = (F(increment) | double).pmap(workers=2, chunksize=2) | list
+    assert func(range(5)) == [2, 4, 6, 8, 10]
+
+
+def test_parallel_map_composes_like_map():
+    func = F(sorted) | F(increment).tmap(workers=2) | sum
+    assert func([3, 2, 1]) == 9
+
+
+def test_parallel_map_accepts_multiple_iterables():
+    func = F(pow).tmap(workers=2) | list
+    assert func([1, 2, 3], [2, 2, 2]) == [1, 4, 9]
+
+
+def test_parallel_map_consumes_unbounded_input_lazily():
+    func = F(increment).tmap(workers=2)
+    results = func(iter(int, 1))
+    assert next(results) == 1
+
+
+def test_parallel_map_pickles():
+    func = (F(increment) | double).pmap(workers=2)
+    assert list(pickle.loads(pickle.dumps(func))([1])) == [4]
+
+
+def test_process_map_runs_combinators():
+    func = (itemgetter("age") | fnot(less(3))).pmap(workers=2) | list
+    assert func([{"age": 2}, {"age": 3}]) == [False, True]
+
+
+def slow_double(number):
+    time.sleep(0.05)
+    return number * 2
+
+
+def fail(_):
+    raise ValueError("branch failed")
+
+
+def test_parallel_juxt_returns_results_in_order():
+    func = juxt.parallel(slow_double, increment, slow_identity, workers=3)
+    assert func(4) == [8, 5, 4]
+
+
+def test_parallel_juxt_runs_branches_concurrently():
+    func = juxt.parallel(slow_double, slow_double, slow_double, workers=3)
+    start = time.perf_counter()
+    assert func(1) == [2, 2, 2]
+    assert time.perf_counter() - start < 0.12
+
+
+def test_parallel_duxt_returns_named_results():
+    func = duxt.parallel(double=slow_double, plus=increment) | dict
+    assert func(3) == {"double": 6, "plus": 4}
+
+
+def test_parallel_juxt_raises_and_cancels_remaining_branches():
+    calls = []
+
+    def record(value):
+        time.sleep(0.05)
+        calls.append(value)
+
+    func = juxt.parallel(fail, *[record] * 4, workers=1)
+    with pytest.raises(ValueError, match="branch failed"):
+        func(1)
+    time.sleep(0.1)
+    assert len(calls) <= 1
+
+
+def test_parallel_juxt_on_process_pool():
+    func = juxt.parallel(increment, double, kind="process", workers=2)
+    assert func(3) == [4, 6]
+
+
+@pytest.mark.parametrize(
+    "func",
+    [
+        juxt.parallel(increment, double),
+        duxt.parallel(plus=increment, kind="process") | dict,
+    ],
+)
+def test_parallel_juxt_and_duxt_pickle(func):
+    unpickled = pickle.loads(pickle.dumps(func))
+    assert repr(unpickled) == repr(func)
+    assert unpickled(2) == func(2)
+
+
+def concat(left, right):
+    return left + right
+
+
+@pytest.mark.parametrize("commutative", [False, True])
+@pytest.mark.parametrize("chunksize", [1, 7, 1000])
+def test_tree_reduce_matches_reduce(commutative, chunksize):
+    func = F(increment).map.treduce(
+        operator.add, commutative=commutative, workers=4, chunksize=chunksize
+    )
+    assert func(range(100)) == sum(range(1, 101))
+
+
+def test_tree_reduce_preserves_order_of_non_commutative_reducer():
+    func = F(str).map.treduce(concat, workers=4, chunksize=3)
+    assert func(range(20)) == "".join(map(str, range(20)))
+
+
+def test_tree_reduce_with_initial_value():
+    func = F(concat).treduce(chunksize=2)
+    assert func(["b", "c", "d"], "a") == "abcd"
+    assert func([], "a") == "a"
+
+
+def test_tree_reduce_of_empty_iterable_raises():
+    with pytest.raises(TypeError):
+        F(concat).treduce()([])
+
+
+def test_tree_reduce_on_process_pool():
+    func = F(operator.add).treduce(
+        commutative=True, kind="process", workers=2, chunksize=10
+    )
+    assert func(range(1000)) == sum(range(1000))
+
+
+def test_tree_reduce_pickles():
+    func = F(double).map.treduce(operator.add, chunksize=4)
+    unpickled = pickle.loads(pickle.dumps(func))
+    assert repr(unpickled) == repr(func)
+    assert unpickled(range(10)) == 90
+
+
+def test_nested_parallel_stages_do_not_exhaust_the_pool(monkeypatch):
+    # A window larger than the pool used to fill it with outer tasks
+    # blocked on inner tasks queued behind them.
+    monkeypatch.setattr("os.cpu_count", lambda: 16)
+    func = F(juxt.parallel(increment, double) | tuple).tmap() | list
+    results = []
+    thread = threading.Thread(
+        target=lambda: results.append(func(range(200))), daemon=True
+    )
+    thread.start()
+    thread.join(timeout=10)
+    assert results == [[(n + 1, n * 2) for n in range(200)]]
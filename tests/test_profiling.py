@@ -0,0 +1,108 @@
+# False positive on overloaded operators.
+# pylint: disable=comparison-with-callable
+import operator
+import time
+
+from fungebra import F
+from fungebra.functions import iffy, juxt
+from fungebra.profiling import Probe, Profile
+
+
+def increment(number):
+    return number + 1
+
+
+def even(number):
+    return not number % 2
+
+
+def stages(profile):
+    return {stage.label: stage for stage in profile}
+
+
+def test_instrumented_function_returns_same_result():
+    func = (F(sorted) - increment < even) > operator.add
+    instrumented = func.instrument(Profile())
+    assert instrumented([3, 1, 2, 4]) == func([3, 1, 2, 4]) == 6
+
+
+def test_original_function_is_not_instrumented():
+    func = F(sorted) - increment
+    func.instrument(Profile())
+    assert not isinstance(func.func.stages[0], Probe)
+
+
+def test_stages_are_labelled_by_position_and_name():
+    profile = Profile()
+    (F(sorted) - increment > operator.add).instrument(profile)
+    assert [stage.label for stage in profile] == [
+        "0 Compose",
+        "0.0 sorted",
+        "0.1 Map",
+        "0.1.0 increment",
+        "0.2 Reduce",
+        "0.2.0 add",
+    ]
+
+
+def test_calls_and_elements_are_recorded():
+    profile = Profile()
+    instrumented = ((F(sorted) - increment) < even).instrument(profile)
+    assert list(instrumented([3, 1, 2, 4])) == [2, 4]
+    recorded = stages(profile)
+    assert recorded["0 Compose"].calls == 1
+    assert recorded["0.1.0 increment"].calls == 4
+    assert recorded["0.1 Map"].elements == 4
+    assert recorded["0.2.0 even"].calls == 4
+    assert recorded["0.2 Filter"].elements == 2
+
+
+def test_reduce_counts_consumed_elements():
+    profile = Profile()
+    (F(operator.add).reduce()).instrument(profile)([1, 2, 3])
+    assert stages(profile)["0 Reduce"].elements == 3
+
+
+def test_nested_combinators_are_instrumented():
+    profile = Profile()
+    func = F(juxt(increment, iffy(even, increment))) | tuple
+    assert func.instrument(profile)(2) == (3, 3)
+    recorded = stages(profile)
+    assert recorded["0.0.0 increment"].calls == 1
+    assert recorded["0.0.1.0 even"].calls == 1
+
+
+def test_own_time_excludes_nested_stages():
+    profile = Profile()
+    (F(sorted) - increment | list).instrument(profile)(range(100))
+    for stage in profile:
+        assert 0 <= stage.own <= stage.cumulative
+    root = stages(profile)["0 Compose"]
+    assert root.own < root.cumulative
+
+
+def test_report_and_reset():
+    profile = Profile()
+    F(increment).instrument(profile)(1)
+    assert "0 increment" in profile.report()
+    profile.reset()
+    assert profile.stages[0].calls == 0
+
+
+def test_lazy_stages_are_charged_for_producing_elements():
+    def pause(number):
+        time.sleep(0.02)
+        return number
+
+    profile = Profile()
+    (F(pause).map | list).instrument(profile)(range(5))
+    recorded = stages(profile)
+    assert recorded["0.0 Map"].cumulative >= 0.1
+    assert recorded["0.1 list"].own < 0.05
+
+
+def test_probes_record_from_several_threads():
+    profile = Profile()
+    instrumented = (F(increment).tmap(workers=4) | list).instrument(profile)
+    assert instrumented(range(1000)) == list(range(1, 1001))
+    assert stages(profile)["0.0.0 increment"].calls == 1000
@@ -0,0 +1,130 @@
+from itertools import count
+import pickle
+import threading
+import time
+
+import pytest
+
+from fungebra import F, pipeline
+from fungebra.optimize import optimize
+from fungebra.profiling import Profile
+from fungebra.staging import Staged
+
+
+def increment(number):
+    return number + 1
+
+
+def double(number):
+    return number * 2
+
+
+def pause(number):
+    time.sleep(0.02)
+    return number
+
+
+def test_staged_maps_like_map():
+    func = (F(increment) | double | str).staged(2, 1, 3)
+    assert list(func(range(50))) == list(
+        (F(increment) | double | str).map(range(50))
+    )
+
+
+def test_single_worker_count_applies_to_every_stage():
+    func = (F(increment) | double).staged(3)
+    assert func.func.workers == (3, 3)
+    assert list(func(range(5))) == [2, 4, 6, 8, 10]
+
+
+def test_empty_pipeline_yields_items_unchanged():
+    assert list(pipeline().staged()(range(5))) == [0, 1, 2, 3, 4]
+    assert list(pipeline().staged(2)(range(5))) == [0, 1, 2, 3, 4]
+
+
+def test_unordered_results_are_yielded_as_they_complete():
+    def delay(number):
+        time.sleep(0.05 if number == 0 else 0)
+        return number
+
+    results = list(F(delay).staged(4, ordered=False)(range(8)))
+    assert sorted(results) == list(range(8))
+    assert results[-1] == 0
+
+
+def test_stages_run_concurrently():
+    func = (F(pause) | pause | pause).staged(4, 4, 4)
+    start = time.perf_counter()
+    assert list(func(range(20))) == list(range(20))
+    # Sequentially, the 60 calls would take over a second.
+    assert time.perf_counter() - start < 0.6
+
+
+def test_exceptions_are_raised_in_place_of_results():
+    def fail(number):
+        if number == 3:
+            raise KeyError(number)
+        return number
+
+    results = (F(fail) | double).staged(2)(range(10))
+    assert [next(results) for _ in range(3)] == [0, 2, 4]
+    with pytest.raises(KeyError):
+        next(results)
+
+
+def test_exceptions_raised_by_the_iterable_are_raised():
+    def numbers():
+        yield 1
+        raise ValueError("broken")
+
+    results = F(double).staged(2)(numbers())
+    assert next(results) == 2
+    with pytest.raises(ValueError, match="broken"):
+        next(results)
+
+
+def test_unbounded_iterables_are_read_lazily():
+    read = []
+
+    def source():
+        for number in count():
+            read.append(number)
+            yield number
+
+    results = F(increment).staged(1, queue_size=2)(source())
+    assert next(results) == 1
+    time.sleep(0.05)
+    assert len(read) < 20
+    results.close()
+
+
+def test_threads_stop_when_results_are_abandoned():
+    before = set(threading.enumerate())
+    results = (F(increment) | double).staged(2)(count())
+    next(results)
+    results.close()
+    time.sleep(0.3)
+    assert set(threading.enumerate()) <= before
+
+
+@pytest.mark.parametrize(
+    "workers,queue_size", [((1,), 16), ((1, 2, 3), 16), ((0, 1), 16), (1, 0)]
+)
+def test_invalid_arguments_are_rejected(workers, queue_size):
+    with pytest.raises(ValueError):
+        Staged(F(increment) | double, workers, queue_size)
+
+
+def test_optimize_and_instrument_keep_stages():
+    func = (F(increment) | double).staged(1, 2)
+    assert list(optimize(func)(range(3))) == [2, 4, 6]
+    profile = Profile()
+    assert list(func.instrument(profile)(range(3))) == [2, 4, 6]
+    assert [stage.calls for stage in profile][-2:] == [3, 3]
+
+
+def test_staged_pickles():
+    func = (F(increment) | double).staged(1, 2, ordered=False)
+    unpickled = pickle.loads(pickle.dumps(func))
+    assert unpickled == func
+    assert sorted(unpickled(range(4))) == [2, 4, 6, 8]
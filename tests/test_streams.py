@@ -0,0 +1,166 @@
+# False positive on overloaded operators.
+# pylint: disable=comparison-with-callable
+import operator
+import pickle
+import struct
+
+import pytest
+
+from fungebra.functions import (
+    greater,
+    itemgetter,
+    read_jsonl,
+    read_lines,
+    read_records,
+    read_structs,
+    write_jsonl,
+    write_lines,
+    write_records,
+    write_structs,
+)
+from fungebra.streams import Sink
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / "service.log"
+    path.write_bytes(b"INFO start\nERROR disk\nINFO ok\nERROR net")
+    return path
+
+
+def is_error(line):
+    return line[:5] == b"ERROR"
+
+
+def test_read_lines_yields_memoryview_slices(log):
+    lines = list(read_lines()(log))
+    assert all(isinstance(line, memoryview) for line in lines)
+    assert [bytes(line) for line in lines] == [
+        b"INFO start",
+        b"ERROR disk",
+        b"INFO ok",
+        b"ERROR net",
+    ]
+
+
+def test_read_lines_plugs_into_map_filter_and_reduce(log):
+    total_length = (read_lines() < is_error) - len > operator.add
+    assert total_length(log) == 19
+
+
+def test_read_lines_with_delimiter_from_buffer():
+    lines = read_lines(b"\r\n")(b"a\r\nbc\r\n\r\nd")
+    assert [bytes(line) for line in lines] == [b"a", b"bc", b"", b"d"]
+
+
+def test_read_lines_of_empty_file(tmp_path):
+    path = tmp_path / "empty.log"
+    path.write_bytes(b"")
+    assert not list(read_lines()(path))
+
+
+def test_slices_outlive_the_source(log):
+    first = next(iter(read_lines()(log)))
+    assert bytes(first) == b"INFO start"
+
+
+def test_read_records_yields_fixed_width_slices():
+    records = read_records(3)(b"abcdefghi")
+    assert [bytes(record) for record in records] == [b"abc", b"def", b"ghi"]
+
+
+def test_read_records_rejects_truncated_data():
+    with pytest.raises(ValueError):
+        list(read_records(3)(b"abcd"))
+
+
+def test_read_structs_unpacks_records(tmp_path):
+    path = tmp_path / "points.dat"
+    path.write_bytes(struct.pack("<hh", 1, 2) + struct.pack("<hh", 3, 4))
+    assert list(read_structs("<hh")(path)) == [(1, 2), (3, 4)]
+
+
+def test_write_lines_round_trips(log, tmp_path):
+    path = tmp_path / "errors.log"
+    ((read_lines() < is_error) | write_lines(path))(log)
+    assert path.read_bytes() == b"ERROR disk\nERROR net\n"
+
+
+def test_write_records_and_structs(tmp_path):
+    records = tmp_path / "records.dat"
+    write_records(records)([b"ab", memoryview(b"cd")])
+    assert records.read_bytes() == b"abcd"
+    packed = tmp_path / "packed.dat"
+    write_structs(packed, "<hh")([(1, 2), (3, 4)])
+    assert list(read_structs("<hh")(packed)) == [(1, 2), (3, 4)]
+
+
+def test_sinks_must_define_chunks(tmp_path):
+    with pytest.raises(TypeError):
+        # pylint: disable=abstract-class-instantiated
+        Sink(tmp_path / "out.dat")
+
+
+@pytest.mark.parametrize(
+    "func", [read_lines(b";"), read_records(2), read_structs("<h")]
+)
+def test_sources_pickle(func):
+    unpickled = pickle.loads(pickle.dumps(func))
+    assert repr(unpickled) == repr(func)
+    assert list(map(tuple, unpickled(b"a;bc"))) == list(
+        map(tuple, func(b"a;bc"))
+    )
+
+
+@pytest.fixture
+def people(tmp_path):
+    path = tmp_path / "people.jsonl"
+    path.write_text(
+        '{"name": "A", "age": 30}\n'
+        "\n"
+        '{"name": "B", "age": 12}\r\n'
+        '{"name": "C", "age": 45}'
+    )
+    return path
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        read_jsonl(),
+        read_jsonl(blocksize=8),
+        read_jsonl(kind="thread", workers=2, blocksize=8),
+        read_jsonl(kind="process", workers=2, blocksize=8),
+    ],
+)
+def test_read_jsonl_feeds_map_and_filter(people, source):
+    adults = source < (itemgetter("age") | greater(17))
+    assert (adults - itemgetter("name") | list)(people) == ["A", "C"]
+
+
+def test_read_jsonl_reports_invalid_lines():
+    with pytest.raises(ValueError, match="Expecting"):
+        list(read_jsonl()(b'{"a": 1}\n{"a": \n'))
+
+
+@pytest.mark.parametrize(
+    "data,line",
+    [(b"[1\n2]\n", 1), (b"1, 2\n3\n", 1), (b"1\n\n2 3\n", 3)],
+)
+@pytest.mark.parametrize("blocksize", [1, 1024])
+def test_read_jsonl_rejects_values_not_on_one_line(data, line, blocksize):
+    with pytest.raises(ValueError, match=f"^Line {line}: "):
+        list(read_jsonl(blocksize=blocksize)(data))
+
+
+def test_read_jsonl_is_lazy():
+    data = b"\n".join(b"%d" % number for number in range(10000))
+    values = read_jsonl(blocksize=64)(data)
+    assert next(values) == 0
+
+
+def test_write_jsonl_round_trips(people, tmp_path):
+    path = tmp_path / "copy.jsonl"
+    (read_jsonl() | write_jsonl(path))(people)
+    assert list(read_jsonl()(path)) == list(read_jsonl()(people))
+    assert path.read_text().count("\n") == 3
@@ -0,0 +1,79 @@
+import pickle
+
+import pytest
+
+from fungebra import F, operator as op
+from fungebra.functions import equals, fnot, greater, iffy, less
+
+
+EXPRESSIONS = [
+    op.neg.map,
+    op.mul.rpartial(2).map,
+    (op.mul.rpartial(2).map < greater(3)) > op.add,
+    F(op.add).reduce(),
+    op.truediv.partial(1.0).map,
+    fnot(less(4)).filter(),
+    equals(2).map,
+    iffy(less(3), op.neg).map,
+    (op.add.rpartial(1) | op.mul.rpartial(3)).map,
+]
+
+
+@pytest.mark.parametrize("func", EXPRESSIONS)
+def test_vectorized_expressions_accept_iterables(func):
+    values = [1, 2, 3, 4, 5]
+    assert list_or_value(func.vectorize()(values)) == list_or_value(
+        func(values)
+    )
+
+
+def list_or_value(result):
+    try:
+        return [
+            item.item() if hasattr(item, "item") else item for item in result
+        ]
+    except TypeError:
+        return result
+
+
+class TestWithNumpy:
+    @pytest.fixture(autouse=True)
+    def numpy(self):
+        return pytest.importorskip("numpy")
+
+    @pytest.mark.parametrize("func", EXPRESSIONS)
+    def test_vectorized_expressions_match_elementwise(self, func, numpy):
+        array = numpy.arange(1, 11)
+        assert list_or_value(func.vectorize()(array)) == list_or_value(
+            func(array)
+        )
+
+    def test_map_is_applied_to_whole_array(self, numpy):
+        result = op.neg.map.vectorize()(numpy.arange(3))
+        assert isinstance(result, numpy.ndarray)
+        assert result.tolist() == [0, -1, -2]
+
+    def test_filter_uses_boolean_mask(self, numpy):
+        result = greater(1).filter().vectorize()(numpy.arange(4))
+        assert isinstance(result, numpy.ndarray)
+        assert result.tolist() == [2, 3]
+
+    def test_reduce_uses_ufunc_reduce(self, numpy):
+        assert F(op.add).reduce().vectorize()(numpy.arange(5)) == 10
+
+    def test_reduce_of_empty_array_raises(self, numpy):
+        with pytest.raises(TypeError):
+            F(op.add).reduce().vectorize()(numpy.array([]))
+
+    def test_map_over_several_arrays(self, numpy):
+        func = F(op.add).map.vectorize()
+        assert func(numpy.arange(3), numpy.arange(3)).tolist() == [0, 2, 4]
+
+    def test_unknown_functions_fall_back_to_elementwise(self, numpy):
+        func = F(lambda value: value * 2).map.vectorize()
+        assert list(func(numpy.arange(3))) == [0, 2, 4]
+
+    def test_vectorized_expressions_pickle(self, numpy):
+        func = (op.mul.rpartial(2).map < greater(3)).vectorize()
+        unpickled = pickle.loads(pickle.dumps(func))
+        assert unpickled(numpy.arange(4)).tolist() == [4, 6]